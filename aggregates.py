@@ -0,0 +1,259 @@
+"""Aggregate cubes: indicator totals, means and rankings per continent, region and income group.
+
+Continents come from world_population.csv's Continent column (through the
+panel's CountryCatalog), and their cubes are computed here: for every
+continent and year the sum, mean and member count (for rate indicators
+such as life expectancy also the population-weighted mean), plus each
+year's members ranked by value, so "top N in Asia in 2020" is a slice
+rather than a sort. All groups of one indicator are reduced at once with
+a membership matrix product.
+
+World Bank regions and income groups cannot be recomputed (the files do
+not say which countries belong to them), but gdp.csv already carries
+them as aggregate rows ('SSF', 'HIC', ...); those rows are served as the
+'region' and 'income' groupings, and are left out of continent members.
+
+Cubes are keyed on the source Dataset objects, so when one file reloads
+only the cubes of indicators that changed are rebuilt.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+CONTINENT = "continent"
+REGION = "region"
+INCOME = "income"
+GROUPINGS = (CONTINENT, REGION, INCOME)
+STATS = ("sum", "mean", "weighted_mean", "count")
+WEIGHT = "population"
+# Indicators measured per person, the only ones a population-weighted mean means anything for.
+RATE_INDICATORS = frozenset(("life_expectancy",))
+
+# World Bank aggregate rows in gdp.csv, by code.
+REGION_CODES = {
+    "EAS": "East Asia & Pacific",
+    "ECS": "Europe & Central Asia",
+    "LCN": "Latin America & Caribbean",
+    "MEA": "Middle East & North Africa",
+    "NAC": "North America",
+    "SAS": "South Asia",
+    "SSF": "Sub-Saharan Africa",
+    "AFE": "Africa Eastern and Southern",
+    "AFW": "Africa Western and Central",
+    "WLD": "World",
+}
+INCOME_CODES = {
+    "HIC": "High income",
+    "UMC": "Upper middle income",
+    "MIC": "Middle income",
+    "LMC": "Lower middle income",
+    "LMY": "Low & middle income",
+    "LIC": "Low income",
+}
+# Other World Bank aggregates (lending groups, demographic and statistical groupings).
+OTHER_AGGREGATE_CODES = frozenset((
+    "ARB", "CEB", "CSS", "EAP", "EAR", "ECA", "EMU", "EUU", "FCS", "HPC", "IBD", "IBT", "IDA", "IDB", "IDX",
+    "INX", "LAC", "LDC", "LTE", "MNA", "OED", "OSS", "PRE", "PSS", "PST", "SSA", "SST", "TEA", "TEC", "TLA",
+    "TMN", "TSA", "TSS",
+))
+AGGREGATE_CODES = frozenset(REGION_CODES) | frozenset(INCOME_CODES) | OTHER_AGGREGATE_CODES
+
+
+def is_aggregate(code):
+    return code in AGGREGATE_CODES
+
+
+class Grouping:
+    """Groups of catalog IDs: labels, member IDs per label and a (groups x countries) 0/1 matrix."""
+
+    def __init__(self, name, labels, members, country_count):
+        self.name = name
+        self.labels = tuple(labels)
+        self.members = tuple(np.asarray(ids, dtype=np.int64) for ids in members)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.matrix = np.zeros((len(self.labels), country_count))
+        for i, ids in enumerate(self.members):
+            self.matrix[i, ids] = 1.0
+        # Hashable description, used to tell whether a cached cube is still valid.
+        self.signature = (name, self.labels, tuple(ids.tobytes() for ids in self.members))
+
+
+def continent_grouping(catalog):
+    """Every continent in the catalog's metadata, aggregate rows excluded."""
+    members = []
+    for continent in catalog.continents():
+        ids = catalog.ids_in_continent(continent)
+        members.append([country_id for country_id in ids.tolist() if not is_aggregate(catalog.code(country_id))])
+    return Grouping(CONTINENT, catalog.continents(), members, len(catalog))
+
+
+class AggregateCube:
+    """One indicator reduced over one grouping, on the panel's yearly axis.
+
+    ``sum``, ``mean``, ``weighted_mean`` and ``count`` are (groups x years)
+    arrays; ``ranked[g]`` holds group g's member IDs ordered by value for
+    every year (members x years, largest first, missing values last).
+    """
+
+    def __init__(self, values, years, grouping, weights=None):
+        self.years = years
+        self.labels = grouping.labels
+        self.index = grouping.index
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        self.count = grouping.matrix @ present
+        self.sum = np.where(self.count > 0, grouping.matrix @ filled, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.mean = self.sum / self.count
+            self.weighted_mean = None
+            if weights is not None:
+                weighted = present & ~np.isnan(weights)
+                w = np.where(weighted, weights, 0.0)
+                self.weighted_mean = (grouping.matrix @ (filled * w)) / (grouping.matrix @ w)
+                self.weighted_mean[~np.isfinite(self.weighted_mean)] = np.nan
+        self.ranked = []
+        for ids in grouping.members:
+            # argsort puts NaN last, and negating keeps it there while ordering largest first.
+            order = np.argsort(-values[ids], axis=0, kind="stable")
+            self.ranked.append(ids[order])
+        self._values = values
+        for array in (self.count, self.sum, self.mean):
+            array.setflags(write=False)
+
+    def stat(self, name):
+        if name == "weighted_mean" and self.weighted_mean is None:
+            raise KeyError(f"weighted_mean needs a rate indicator ({', '.join(sorted(RATE_INDICATORS))}) "
+                           "and population data")
+        table = getattr(self, name) if name in STATS else None
+        if table is None:
+            raise KeyError(f"no {name!r} in this cube")
+        return table
+
+    def series(self, label, stat="sum"):
+        """(years, values) of one group's statistic, or None."""
+        group = self.index.get(label)
+        if group is None:
+            return None
+        values = self.stat(stat)[group]
+        present = ~np.isnan(values)
+        if not present.any():
+            return None
+        return self.years[present], values[present]
+
+    def top(self, label, year, n=10):
+        """[(country_id, value), ...] of the group's n largest values in `year` (already ranked)."""
+        group = self.index.get(label)
+        column = int(year) - int(self.years[0]) if len(self.years) else -1
+        if group is None or not 0 <= column < len(self.years):
+            return []
+        ids = self.ranked[group][:n, column]
+        values = self._values[ids, column]
+        keep = ~np.isnan(values)
+        return list(zip(ids[keep].tolist(), values[keep].tolist()))
+
+
+# Cubes shared between panels:
+# (indicator, source dataset, weight dataset, catalog keys, year axis, grouping) -> cube.
+_cubes = OrderedDict()
+_cubes_lock = threading.Lock()
+MAX_CUBES = 32
+
+
+class AggregateCubes:
+    """Every aggregate view of one AlignedPanel, built on first use (or all at once by build())."""
+
+    def __init__(self, panel, weight=WEIGHT):
+        self.panel = panel
+        self.catalog = panel.catalog
+        self.weight = weight if weight in panel.filled else None
+        self._grouping = None
+        self._lock = threading.Lock()
+
+    @property
+    def continents(self):
+        if self._grouping is None:
+            with self._lock:
+                if self._grouping is None:
+                    self._grouping = continent_grouping(self.catalog)
+        return self._grouping
+
+    def reported(self, grouping):
+        """{label: catalog ID} of the aggregate rows the data files carry for 'region' or 'income'."""
+        codes = REGION_CODES if grouping == REGION else INCOME_CODES
+        rows = {}
+        for code, label in codes.items():
+            country_id = self.catalog.id_of_key.get(code)
+            if country_id is not None:
+                rows[label] = country_id
+        return rows
+
+    def labels(self, grouping=CONTINENT):
+        if grouping == CONTINENT:
+            return self.continents.labels
+        return tuple(self.reported(grouping))
+
+    def grouping_of(self, label):
+        """Which grouping a label belongs to, or None."""
+        for grouping in GROUPINGS:
+            if label in self.labels(grouping):
+                return grouping
+        return None
+
+    def cube(self, indicator):
+        """AggregateCube of `indicator` over continents (reused across panels while its inputs are unchanged)."""
+        if indicator not in self.panel.filled:
+            raise KeyError(f"unknown indicator {indicator!r}")
+        grouping = self.continents
+        sources = self.panel.sources
+        weighted = self.weight is not None and indicator in RATE_INDICATORS
+        years = self.panel.years
+        key = (indicator, id(sources.get(indicator)), id(sources.get(self.weight)) if weighted else None,
+               self.catalog.keys, (int(years[0]), len(years)) if len(years) else (), grouping.signature)
+        inputs = (sources.get(indicator), sources.get(self.weight) if weighted else None)
+        with _cubes_lock:
+            entry = _cubes.get(key)
+            if entry is not None and entry[0][0] is inputs[0] and entry[0][1] is inputs[1]:
+                _cubes.move_to_end(key)
+                return entry[1]
+        weights = self.panel.filled[self.weight] if weighted else None
+        cube = AggregateCube(self.panel.filled[indicator], self.panel.years, grouping, weights)
+        with _cubes_lock:
+            _cubes[key] = (inputs, cube)
+            while len(_cubes) > MAX_CUBES:
+                _cubes.popitem(last=False)
+        return cube
+
+    def build(self):
+        """Precompute every indicator's cube (called from the loader thread when data arrives)."""
+        for indicator in self.panel.indicators:
+            self.cube(indicator)
+        return self
+
+    def series(self, indicator, label, stat="sum"):
+        """(years, values) for a continent's statistic or a region/income group's reported row, or None."""
+        grouping = self.grouping_of(label)
+        if grouping == CONTINENT:
+            return self.cube(indicator).series(label, stat)
+        if grouping is not None:
+            return self.panel.series(indicator, self.catalog.code(self.reported(grouping)[label]), interpolated=False)
+        return None
+
+    def top(self, indicator, continent, year, n=10):
+        """[(country name, value), ...] of the n largest values in a continent in one year."""
+        return [(self.catalog.name(country_id), value)
+                for country_id, value in self.cube(indicator).top(continent, year, n)]
+
+
+_by_panel = weakref.WeakKeyDictionary()
+_by_panel_lock = threading.Lock()
+
+
+def aggregate_cubes(panel):
+    """Shared AggregateCubes for a panel."""
+    with _by_panel_lock:
+        cubes = _by_panel.get(panel)
+        if cubes is None:
+            cubes = _by_panel[panel] = AggregateCubes(panel)
+    return cubes
@@ -0,0 +1,635 @@
+"""Benchmarks for startup and for the code paths behind the windows, the viewer and the CLI.
+
+`startup` imports main.py in fresh interpreters under `-X importtime` and
+reports the median. `suite` generates synthetic wide and long datasets at
+several multiples of the bundled gdp.csv and times what the application
+runs on them: parsing and the disk cache, the chart line builders through
+series_cache into a PlotManager (Agg), the dataset viewer's read, paging,
+queries (in memory and streamed) and CSV export, plus lookups and search.
+The `cli.main` commands are timed once on the bundled files. With a
+display, the plot window (open, load, plot) and the viewer window are
+timed too; without one those cases are skipped.
+
+Results are compared with a baseline kept outside the repository, at
+$GDA_CACHE_DIR/benchmarks/baseline-<fingerprint>.json (GDA_CACHE_DIR
+defaults to ~/.cache/global_data_analyzer), or wherever --baseline points.
+The fingerprint covers the CPU model and count, OS, Python and library
+versions but not the hostname, so CI runners and containers of one image
+share a baseline; CI should keep that directory between runs (or pass
+--baseline) and use --require-baseline, which fails the run when there is
+no baseline to compare with. A baseline from another fingerprint is never
+compared against and always fails. Each run also times a fixed
+calibration loop, and baseline timings are scaled by how much faster or
+slower that loop ran, so a busier or throttled machine does not read as a
+regression.
+
+    python benchmarks.py startup --runs 5 --out startup.json
+    python benchmarks.py suite --save-baseline       # record this machine's baseline
+    python benchmarks.py suite                       # 1x and 100x, compare with it
+    python benchmarks.py suite --require-baseline --baseline ci/baseline.json
+    python benchmarks.py suite --scales 1 100 10000 --only parse_wide query
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from dataset_locator import default_cache_dir
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Modules whose presence at startup means a deferred import regressed.
+HEAVY_MODULES = ("matplotlib", "pandas", "numpy", "openpyxl")
+
+_WINDOW_SCRIPT = """
+import time
+started = time.perf_counter()
+import tkinter as tk
+import main
+root = tk.Tk()
+main.TheDataAnalyser(root)
+root.update()
+print(time.perf_counter() - started)
+root.destroy()
+"""
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if self_us.isdigit():
+            modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(module="main"):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    modules = parse_importtime(result.stderr)
+    return {"wall_s": wall,
+            "import_us": modules.get(module, (0, 0))[1],
+            "modules": len(modules),
+            "heavy": sorted(name for name in modules if name in HEAVY_MODULES),
+            "slowest": sorted(((name, self_us) for name, (self_us, _) in modules.items()),
+                              key=lambda item: -item[1])[:10]}
+
+
+def measure_window():
+    """Seconds from interpreter start to the first drawn main window, or None without a display."""
+    result = subprocess.run([sys.executable, "-c", _WINDOW_SCRIPT], cwd=HERE, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def startup_benchmark(runs=5):
+    samples = [measure_import() for _ in range(runs)]
+    median = sorted(samples, key=lambda sample: sample["import_us"])[len(samples) // 2]
+    windows = [seconds for seconds in (measure_window() for _ in range(runs)) if seconds is not None]
+    return {
+        "python": platform.python_version(),
+        "runs": runs,
+        "import_main_ms": median["import_us"] / 1000,
+        "interpreter_wall_ms": statistics.median(sample["wall_s"] for sample in samples) * 1000,
+        "window_ms": statistics.median(windows) * 1000 if windows else None,
+        "modules_imported": median["modules"],
+        "heavy_modules": median["heavy"],
+        "slowest_modules_us": median["slowest"],
+    }
+
+
+BASELINE_DIR = os.path.join(default_cache_dir(), "benchmarks")
+DEFAULT_SCALES = (1, 100)
+# Shape of the bundled gdp.csv that the synthetic files are multiples of.
+GDP_ROWS, GDP_FIRST_YEAR, GDP_LAST_YEAR = 266, 1960, 2020
+# How much slower (or bigger) than the baseline a result may be before it counts as a regression.
+# Timings are normalized by the calibration loop first, so this only has to absorb run-to-run noise.
+TIME_TOLERANCE = 0.3
+MEMORY_TOLERANCE = 0.25
+# Timings below this are dominated by noise and are only compared on memory.
+MIN_COMPARED_SECONDS = 0.005
+
+
+def synthetic_names(rows):
+    return [f"Country {row:07d}" for row in range(rows)], [f"C{row:06d}" for row in range(rows)]
+
+
+def make_wide_csv(path, scale, seed=0):
+    """gdp.csv-shaped file ('Country Name', 'Code', one column per year) with scale x the rows."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    years = [str(year) for year in range(GDP_FIRST_YEAR, GDP_LAST_YEAR + 1)]
+    rows = GDP_ROWS * scale
+    names, codes = synthetic_names(rows)
+    chunk = 100_000
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        for start in range(0, rows, chunk):
+            stop = min(start + chunk, rows)
+            values = rng.lognormal(22, 2, size=(stop - start, len(years)))
+            # Roughly the share of blank cells gdp.csv has, mostly in early years.
+            values[rng.random(values.shape) < np.linspace(0.5, 0.02, len(years))] = np.nan
+            frame = pd.DataFrame(values, columns=years)
+            frame.insert(0, "Code", codes[start:stop])
+            frame.insert(0, "Country Name", names[start:stop])
+            frame.to_csv(out, index=False, header=start == 0, float_format="%.10g")
+
+
+def make_long_csv(path, scale, seed=0):
+    """Life expectancy.csv-shaped file ('Entity', 'Code', 'Year', value) with scale x gdp.csv's rows."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    years = np.arange(GDP_FIRST_YEAR, GDP_LAST_YEAR + 1)
+    rows = GDP_ROWS * scale
+    names, codes = synthetic_names(rows)
+    chunk = 20_000
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        for start in range(0, rows, chunk):
+            stop = min(start + chunk, rows)
+            count = stop - start
+            frame = pd.DataFrame({
+                "Entity": np.repeat(names[start:stop], len(years)),
+                "Code": np.repeat(codes[start:stop], len(years)),
+                "Year": np.tile(years, count),
+                "Value": rng.normal(65, 10, size=count * len(years)),
+            })
+            frame.to_csv(out, index=False, header=start == 0, float_format="%.6g")
+
+
+def synthetic_files(data_dir, scale):
+    """Paths of the wide and long files for a scale, generated once and reused."""
+    os.makedirs(data_dir, exist_ok=True)
+    files = {}
+    for layout, make in (("wide", make_wide_csv), ("long", make_long_csv)):
+        path = os.path.join(data_dir, f"{layout}_{scale}x.csv")
+        if not os.path.exists(path):
+            partial = path + ".part"
+            make(partial, scale)
+            os.replace(partial, path)
+        files[layout] = path
+    return files
+
+
+def _measure(fn, repeats):
+    """(median seconds, peak traced bytes) of fn(); memory comes from one extra traced run."""
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+_TK = {}
+
+
+def tk_root():
+    """Hidden Tk root shared by the window cases, or None without a display."""
+    if "root" not in _TK:
+        import tkinter as tk
+
+        try:
+            root = tk.Tk()
+            root.withdraw()
+        except tk.TclError:
+            root = None
+        _TK["root"] = root
+    return _TK["root"]
+
+
+def _pump(root, finished, timeout=300):
+    """Run the Tk loop until finished() is true (loads report back through root.after polling)."""
+    deadline = time.perf_counter() + timeout
+    while not finished():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("window did not finish loading")
+        root.update()
+        time.sleep(0.001)
+
+
+def suite_cases(files):
+    """{name: callable} for one scale's files; shared setup is done here, outside the timings."""
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    import charts
+    import dataset_cache
+    from chunked_reader import CsvRowIndex
+    from dataset_registry import read_long_csv, read_wide_csv
+    from exporter import write_table
+    from explore import read_dataset, stream_query
+    from loader_service import LoadTask
+    from panel_alignment import AlignedPanel
+    from plot_manager import PlotManager
+    from query_engine import QueryEngine
+    from search_index import IncrementalSearch, SearchIndex
+    from series_cache import series_cache
+    from virtual_table import DataFrameSource
+
+    def parse_wide():
+        return read_wide_csv(files["wide"], "Country Name", code_column="Code")
+
+    def parse_long():
+        return read_long_csv(files["long"], "Entity", "Year", "Value", code_column="Code")
+
+    wide, long = parse_wide(), parse_long()
+    cache_key = "benchmarks.parse_wide"
+    dataset_cache.write(files["wide"], cache_key, wide)
+    rng = np.random.default_rng(1)
+    picks = [wide.names[row] for row in rng.integers(0, len(wide), 1000)]
+    index = SearchIndex(wide.names)
+    typed = ["c", "co", "cou", "coun", "count", "countr", "country", "country 0", "country 00"]
+    year = GDP_LAST_YEAR - 5
+
+    # The GDP window's panel, with the synthetic file standing in for gdp.csv.
+    panel = AlignedPanel({"gdp": wide})
+    figure = Figure(figsize=(6, 4))
+    FigureCanvasAgg(figure)
+    plots = PlotManager(figure.add_subplot(), figure.canvas)
+    plot_names = list(wide.names[:5])
+
+    frame = read_dataset(files["wide"], LoadTask("benchmark"))
+    table = DataFrameSource(frame)
+    row_index = CsvRowIndex(files["wide"])
+    row_index.build()
+    pages = rng.integers(0, max(len(table) - 40, 1), 50)
+    export_path = os.path.join(os.path.dirname(files["wide"]), "export.csv")
+
+    def cache_load():
+        parts = dataset_cache.read(files["wide"], cache_key)
+        return parts["arrays"]["values"].sum()
+
+    def lookup_wide():
+        return [wide.series(name) for name in picks]
+
+    def lookup_long():
+        return [long.series(name) for name in picks]
+
+    def search():
+        # What SearchableComboBox does while someone types a name letter by letter.
+        typing = IncrementalSearch(index)
+        return [index.labels(typing.search(query), 200) for query in typed]
+
+    def search_index_build():
+        return SearchIndex(wide.names)
+
+    def filter_rows():
+        column = wide.column(year)
+        rows = np.flatnonzero(column > np.nanmedian(column))
+        return wide.values[rows].mean(axis=1)
+
+    def chart():
+        # The "Plot GDP" button: line builders (series_cache hits after the first run), PlotManager, a draw.
+        plots.show(charts.gdp_lines(panel, plot_names), **charts.GDP_CHART)
+        figure.canvas.draw()
+        plots.clear()
+
+    def chart_cold():
+        series_cache.invalidate(panel)
+        chart()
+
+    def table_read():
+        return read_dataset(files["wide"], LoadTask("benchmark"))
+
+    def table_pages():
+        return [table.rows(start, start + 40) for start in pages]
+
+    def query():
+        # A fresh engine each time so the result cache doesn't hide the work.
+        engine = QueryEngine(frame)
+        low = engine.run(f"`{year}` > 1000 | sort `{year}` desc")
+        high = engine.run(f"`{year}` >= 1000000 and `{year}` < 1000000000")
+        return low.rows(0, 40), high.rows(0, 40)
+
+    def query_streamed():
+        # The query bar of a file opened in streaming mode.
+        result = stream_query(files["wide"], f"`{year}` > 1e12 | sort `{year}` desc", row_index.columns,
+                              task=LoadTask("benchmark"))
+        return result.rows(0, 40)
+
+    def export_csv():
+        return write_table(table, export_path, task=LoadTask("benchmark"))
+
+    def stream_index():
+        fresh = CsvRowIndex(files["wide"])
+        fresh.build()
+        fresh.close()
+
+    def stream_pages():
+        return [row_index.rows(int(start), int(start) + 40) for start in pages]
+
+    cases = {
+        "parse_wide": parse_wide,
+        "parse_long": parse_long,
+        "cache_load": cache_load,
+        "lookup_wide": lookup_wide,
+        "lookup_long": lookup_long,
+        "search_index_build": search_index_build,
+        "search": search,
+        "filter": filter_rows,
+        "chart": chart,
+        "chart_cold": chart_cold,
+        "table_read": table_read,
+        "table_pages": table_pages,
+        "query": query,
+        "query_streamed": query_streamed,
+        "export_csv": export_csv,
+        "stream_index": stream_index,
+        "stream_pages": stream_pages,
+    }
+
+    root = tk_root()
+    if root is not None:
+        from tkinter import ttk
+
+        from explore import display_dataset
+
+        def viewer_window():
+            # Open → background read → virtual table on screen, as File > Open does.
+            before = set(root.winfo_children())
+            display_dataset(root, files["wide"], streaming=False)
+            window = next(child for child in root.winfo_children() if child not in before)
+            _pump(root, lambda: any(isinstance(widget, ttk.Treeview)
+                                    for child in window.winfo_children() for widget in child.winfo_children()))
+            window.destroy()
+
+        cases["viewer_window"] = viewer_window
+    return cases
+
+
+def bundled_cases(out_dir):
+    """{name: callable} on the bundled CSVs: cli.main commands, and the plot window with a display.
+
+    Everything runs in this process, so the dataset registry is warm after
+    the first call; `startup` covers a cold interpreter.
+    """
+    import io
+
+    import cli
+
+    def command(*argv):
+        def run():
+            status = cli.main(list(argv), out=io.StringIO())
+            if status:
+                raise RuntimeError(f"main.py {' '.join(argv)} exited with {status}")
+        return run
+
+    chart_path = os.path.join(out_dir, "cli_chart.png")
+    cases = {
+        "cli_series": command("series", "gdp", "Germany"),
+        "cli_stats": command("stats", "population", "--start", "2000", "--end", "2020"),
+        "cli_top": command("top", "population", "2022", "--continent", "Asia"),
+        "cli_groups": command("groups", "gdp", "2020"),
+        "cli_chart": command("chart", "population_gdp", "India", "Asia", "--out", chart_path),
+    }
+
+    root = tk_root()
+    if root is not None:
+        import tkinter as tk
+
+        from data_downloader import PopulationApp
+
+        def open_app():
+            toplevel = tk.Toplevel(root)
+            app = PopulationApp(toplevel)
+            _pump(root, lambda: app.catalog is not None or str(app.status_label.cget("text")).startswith("Could not"))
+            if app.catalog is None:
+                raise RuntimeError(app.status_label.cget("text"))
+            return toplevel, app
+
+        def window_open():
+            toplevel, _ = open_app()
+            toplevel.destroy()
+
+        _, app = open_app()
+        for entry, name in zip(app.entries, ("India", "China", "United States", "Brazil", "Asia")):
+            entry.insert(0, name)
+        app.update_selected_countries()
+
+        def window_plot():
+            app.plots.clear()
+            app.plot_gdp()
+            app.plot_population_and_gdp()
+            root.update()  # the draw_idle redraw happens here
+
+        cases["window_open"] = window_open
+        cases["window_plot"] = window_plot
+    return cases
+
+
+def run_suite(scales=DEFAULT_SCALES, data_dir=None, repeats=3, only=None, log=print):
+    """{"<case>@<scale>x" or "<case>@bundled": {"seconds": ..., "peak_bytes": ...}} for every case."""
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), "gda_benchmarks")
+    os.makedirs(data_dir, exist_ok=True)
+    results = {}
+
+    def measure(cases, label, case_repeats, warm_up=False):
+        for name, fn in cases.items():
+            if only and name not in only:
+                continue
+            if warm_up:
+                fn()
+            seconds, peak = _measure(fn, case_repeats)
+            results[f"{name}@{label}"] = {"seconds": seconds, "peak_bytes": peak}
+            log(f"  {name:<20} {seconds * 1000:10.2f} ms {peak / 2 ** 20:10.1f} MB")
+
+    log("bundled files")
+    # One untimed call first: the first command of a process pays for imports and font loading.
+    measure(bundled_cases(data_dir), "bundled", repeats, warm_up=True)
+    for scale in scales:
+        log(f"scale {scale}x: preparing data")
+        files = synthetic_files(data_dir, scale)
+        # The largest files are too slow to time more than once.
+        measure(suite_cases(files), f"{scale}x", repeats if scale < 1000 else 1)
+    if tk_root() is None:
+        log("no display: window cases skipped")
+    return results
+
+
+def calibrate(repeats=5):
+    """Median seconds of a fixed NumPy + interpreter workload, the yardstick for this machine's speed today."""
+    import numpy as np
+
+    values = np.random.default_rng(0).random(1_000_000)
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        np.sort(values)
+        total = 0
+        for i in range(300_000):
+            total += i % 7
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def cpu_model():
+    """The CPU's model name where the OS reports one (platform.processor() is empty on most Linux boxes)."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def machine_fingerprint():
+    """(short id, details) of what the timings depend on: CPU, OS, Python and the numeric libraries."""
+    import matplotlib
+    import numpy as np
+    import pandas as pd
+
+    details = {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": cpu_model(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+    digest = hashlib.sha1(json.dumps(details, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return digest, details
+
+
+def baseline_path(fingerprint):
+    return os.path.join(BASELINE_DIR, f"baseline-{fingerprint}.json")
+
+
+def compare(results, baseline, speed=1.0, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """Regression messages for results that are slower or bigger than the baseline allows.
+
+    `speed` is this run's calibration time over the baseline's: baseline
+    timings are scaled by it before the tolerance is applied.
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        expected = base["seconds"] * speed
+        if base["seconds"] >= MIN_COMPARED_SECONDS and result["seconds"] > expected * (1 + time_tolerance):
+            regressions.append(f"{key}: {result['seconds'] * 1000:.1f} ms vs baseline "
+                               f"{expected * 1000:.1f} ms (calibrated)")
+        if result["peak_bytes"] > base["peak_bytes"] * (1 + memory_tolerance) + 2 ** 20:
+            regressions.append(f"{key}: peak {result['peak_bytes'] / 2 ** 20:.1f} MB vs baseline "
+                               f"{base['peak_bytes'] / 2 ** 20:.1f} MB")
+    return regressions
+
+
+def load_baseline(path):
+    """The stored baseline ({"fingerprint", "details", "calibration_s", "results"}), or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_baseline(results, path, fingerprint, details, calibration):
+    # Merge, so saving one scale keeps the others; they were timed on this same fingerprint.
+    stored = load_baseline(path)
+    merged = dict(stored["results"] if stored and stored.get("fingerprint") == fingerprint else {}, **results)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump({"fingerprint": fingerprint, "details": details, "calibration_s": calibration,
+                   "results": dict(sorted(merged.items()))}, out, indent=2)
+        out.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    startup = commands.add_parser("startup", help="import-time benchmark for main.py")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--out", help="write the result as JSON here")
+    suite = commands.add_parser("suite", help="chart/viewer/query/export/CLI benchmarks on synthetic data")
+    suite.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                       help="multiples of gdp.csv's rows (default: 1 100; 10000 writes several GB)")
+    suite.add_argument("--repeats", type=int, default=3)
+    suite.add_argument("--only", nargs="+", metavar="CASE", help="run just these cases")
+    suite.add_argument("--data-dir", help="where the synthetic files are kept between runs")
+    suite.add_argument("--baseline", help=f"baseline file (default: one per machine under {BASELINE_DIR})")
+    suite.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    suite.add_argument("--require-baseline", action="store_true",
+                       help="fail (exit 2) when there is no baseline for this machine, as CI should")
+    suite.add_argument("--tolerance", type=float, default=TIME_TOLERANCE,
+                       help=f"allowed slowdown after calibration, as a fraction (default: {TIME_TOLERANCE})")
+    suite.add_argument("--out", help="also write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.command == "suite":
+        return run_suite_command(args)
+    result = startup_benchmark(args.runs)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out:
+            out.write(text + "\n")
+    print(text)
+    return 1 if result["heavy_modules"] else 0
+
+
+def run_suite_command(args):
+    fingerprint, details = machine_fingerprint()
+    path = args.baseline or baseline_path(fingerprint)
+    baseline = None if args.save_baseline else load_baseline(path)
+    # Checked before running, so a CI job without a usable baseline fails in seconds, not after the suite.
+    if not args.save_baseline:
+        if baseline is None and args.require_baseline:
+            print(f"error: no baseline for this machine ({fingerprint}) at {path}; "
+                  "run with --save-baseline to create one", file=sys.stderr)
+            return 2
+        if baseline is not None and baseline.get("fingerprint") != fingerprint:
+            changed = sorted(key for key, value in details.items() if baseline.get("details", {}).get(key) != value)
+            print(f"error: {path} was recorded on a different setup ({', '.join(changed) or 'unknown'} differ); "
+                  "not comparing. Record a baseline here with --save-baseline.", file=sys.stderr)
+            return 2
+    calibration = calibrate()
+    results = run_suite(args.scales, args.data_dir, args.repeats, args.only)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out:
+            json.dump({"fingerprint": fingerprint, "details": details, "calibration_s": calibration,
+                       "results": results}, out, indent=2)
+    if args.save_baseline:
+        save_baseline(results, path, fingerprint, details, calibration)
+        print(f"baseline saved to {path}")
+        return 0
+    if baseline is None:
+        print(f"no baseline for this machine ({fingerprint}) at {path}; run with --save-baseline to create one")
+        return 0
+    speed = calibration / baseline["calibration_s"]
+    regressions = compare(results, baseline["results"], speed=speed, time_tolerance=args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    print(f"{len(results)} results, {len(regressions)} regressions "
+          f"(calibration loop at {speed:.2f}x the baseline's time)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import tkinter as tk
+from tkinter import ttk
+from dataset_locator import find_dataset
+from dataset_registry import Dataset, load_gdp, load_population
+from exporter import ask_and_export
+from figures import embed_figure
+from panel_alignment import aligned_panel
+from perf import attach_overlay, timed
+from loader_service import loader_service
+from plot_manager import LineSpec, PlotManager
+
+
+def find_csv_file(filename, root_folder=None):
+    return find_dataset(filename, root_folder)
+
+
+class BothDataApp:
+    """Class to view both GDP and Population for a single country"""
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("GDP and Population for a Country")
+        
+        # Frame to hold widgets
+        self.main_frame = ttk.Frame(self.root, padding="10")
+        self.main_frame.pack(fill="both", expand=True)
+
+        # Country selection input
+        self.country_label = tk.Label(self.main_frame, text="Select a Country:")
+        self.country_label.pack(pady=5)
+
+        self.country_entry = tk.Entry(self.main_frame)
+        self.country_entry.pack(pady=5)
+
+        # Button to fetch both GDP and Population data
+        self.plot_button = tk.Button(self.main_frame, text="Plot GDP and Population", command=self.plot_data)
+        self.plot_button.pack(pady=5)
+        self.export_button = tk.Button(self.main_frame, text="Export...", command=self.export)
+        self.export_button.pack(pady=5)
+
+        # Loading state until the background load finishes
+        self.status_label = tk.Label(self.main_frame, text="Loading data...")
+        self.status_label.pack()
+
+        # Create matplotlib figure for plotting
+        self.figure, self.ax, self.canvas = embed_figure(self.main_frame, figsize=(6, 4))
+        self.canvas.get_tk_widget().pack(pady=10)
+        self.plots = PlotManager(self.ax, self.canvas, number_format=None)
+
+        # Shared GDP and Population datasets (see dataset_registry)
+        self.population_data = Dataset.empty()
+        self.gdp_data = Dataset.empty()
+        self.panel = None
+
+        self.overlay = attach_overlay(self.root)
+        self.load_data()
+
+    def load_data(self):
+        # Load both datasets on the loader thread so the window shows up right away
+        self.load_task = loader_service.submit(self.read_datasets, description="GDP and Population")
+        loader_service.watch(self.root, self.load_task, self.on_data_loaded, on_error=self.on_load_error,
+                             on_progress=lambda task: self.status_label.config(text=task.progress_text()))
+
+    @timed
+    def read_datasets(self, task):
+        # Load Population data from the process-wide registry
+        task.report(message="Reading population")
+        pop_path = find_csv_file("world_population.csv")
+        population_data = load_population(pop_path) if pop_path else Dataset.empty()
+        task.check_cancelled()
+
+        # Load GDP data from the process-wide registry
+        task.report(message="Reading GDP")
+        gdp_path = find_csv_file("gdp.csv")
+        gdp_data = load_gdp(gdp_path) if gdp_path else Dataset.empty()
+
+        # Join both on one yearly axis (country names matched through codes)
+        task.report(message="Aligning years")
+        panel = aligned_panel(population=population_data, gdp=gdp_data)
+        return population_data, gdp_data, panel
+
+    def release(self):
+        # Window closed: stop loading, empty the plot and let go of the datasets
+        self.load_task.cancel()
+        self.plots.clear()
+        self.country_entry.delete(0, tk.END)
+        self.population_data = Dataset.empty()
+        self.gdp_data = Dataset.empty()
+        self.panel = None
+
+    def reopen(self):
+        # Window reused from the pool: the registry serves the data again without re-parsing
+        self.status_label.config(text="Loading data...")
+        if self.overlay is None:
+            self.overlay = attach_overlay(self.root)
+        self.load_data()
+
+    @timed
+    def on_data_loaded(self, result):
+        self.population_data, self.gdp_data, self.panel = result
+        self.status_label.config(text="")
+
+    def on_load_error(self, exc):
+        self.status_label.config(text=f"Could not load data: {exc}")
+
+    def export(self):
+        """Save the chart or its series in the background (format from the file extension)."""
+        ask_and_export(self.root, self.status_label, figure=self.figure, plots=self.plots)
+
+    @timed
+    def plot_data(self):
+        country = self.country_entry.get().strip()
+        lines = []
+
+        # Population data
+        pop_series = self.panel.series("population", country, interpolated=False) if self.panel else None
+        if pop_series:
+            years, population_values = pop_series
+            lines.append(LineSpec("population", years, population_values, marker='o', label="Population", color="blue"))
+
+        # GDP data
+        gdp_series = self.panel.series("gdp", country, interpolated=False) if self.panel else None
+        if gdp_series:
+            years, gdp_values = gdp_series
+            lines.append(LineSpec("gdp", years, gdp_values, marker='o', label="GDP", color="green"))
+
+        # Update only the lines that changed and redraw
+        title = f"GDP and Population Over Time: {country}" if country else "GDP and Population Over Time"
+        self.plots.show(lines, title=title, xlabel="Year", ylabel="Values")
@@ -0,0 +1,336 @@
+"""Bulk ingest: a directory of indicator CSVs merged into one multi-indicator panel store.
+
+Every CSV under the directory (wide or long, detected from the header) is
+parsed in a process pool into the countries x years layout and saved as a
+part file. The parts are then merged onto one shared country axis (a
+CountryCatalog) and one yearly axis, as a single indicators x countries x
+years float64 array that PanelStore memory-maps.
+
+Rows are matched by code where a file has one, then by spelling: a
+code-less name joins a coded row when some coded file uses that exact
+name or one that normalizes the same ('Bahamas, The' / 'The Bahamas').
+Different names for one country ('Russia' / 'Russian Federation') only
+share a row when a coded file such as world_population.csv spells it the
+way the code-less file does; otherwise the code-less name gets a row of
+its own.
+
+Re-running is incremental: the manifest records each file's size/mtime
+and content hash, and only new or changed files are parsed again. The
+merge is skipped entirely when nothing changed.
+
+    python bulk_ingest.py releases/2024-06 --workers 8
+    python main.py ingest releases/2024-06 --store panels/2024-06
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from country_catalog import CountryCatalog, normalize_name
+from dataset_cache import file_digest
+from dataset_registry import Dataset, read_indicator_csv
+from panel_alignment import place_on_grid
+
+# Bump when the store layout changes; an older store is rebuilt from scratch.
+STORE_VERSION = 1
+STORE_DIR = ".gda_panel"
+MANIFEST = "manifest.json"
+SKIP_DIRS = {STORE_DIR, ".gda_cache", "__pycache__"}
+
+
+def indicator_name(relpath):
+    """Indicator name for a file: its path inside the directory without '.csv' ('wb/gdp.csv' -> 'wb/gdp')."""
+    return os.path.splitext(relpath)[0].replace(os.sep, "/")
+
+
+def _part_name(relpath, digest):
+    slug = re.sub(r"[^\w-]+", "_", indicator_name(relpath)).strip("_") or "indicator"
+    return f"{slug}.{digest}.npz"
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def find_indicator_files(directory):
+    """Relative paths of every CSV under `directory`, sorted, skipping cache and store folders."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for filename in files:
+            if filename.lower().endswith(".csv"):
+                found.append(os.path.relpath(os.path.join(root, filename), directory))
+    return sorted(found)
+
+
+def parse_part(path, part_path):
+    """Parse one CSV and save it as a part file; runs in a worker process."""
+    dataset = read_indicator_csv(path)
+    tmp_path = f"{part_path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, names=np.array(dataset.names, dtype=str), codes=np.array(dataset.codes, dtype=str),
+             years=dataset.years, values=dataset.values)
+    os.replace(tmp_path, part_path)
+    return {"layout": dataset.layout, "rows": len(dataset)}
+
+
+def read_part(part_path, source=None):
+    with np.load(part_path) as part:
+        return Dataset(part["names"].tolist(), part["years"], part["values"], codes=part["codes"].tolist() or None,
+                       source=source)
+
+
+class IngestSummary:
+    """Outcome of one ingest run."""
+
+    def __init__(self):
+        self.parsed = []
+        self.reused = []
+        self.removed = []
+        self.failures = []
+        self.merged = False
+        self.indicators = 0
+        self.countries = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        text = (f"{self.indicators} indicators x {self.countries} countries: {len(self.parsed)} parsed, "
+                f"{len(self.reused)} unchanged, {len(self.removed)} removed in {self.seconds:.1f}s")
+        if not self.merged:
+            text += " (panel up to date)"
+        if self.failures:
+            text += f", {len(self.failures)} failed"
+        return text
+
+
+def _load_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, MANIFEST), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == STORE_VERSION else None
+
+
+def _write_json(target, data):
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+    os.replace(tmp_path, target)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def merge_parts(directory, store_dir, files):
+    """Merge the part files into one panel array; returns the manifest's 'panel' entry."""
+    datasets = [read_part(os.path.join(store_dir, "parts", entry["part"]), os.path.join(directory, relpath))
+                for relpath, entry in files.items()]
+    catalog = CountryCatalog(datasets)
+    spans = [(int(dataset.years[0]), int(dataset.years[-1])) for dataset in datasets if len(dataset.years)]
+    first, last = (min(s[0] for s in spans), max(s[1] for s in spans)) if spans else (0, -1)
+    years = np.arange(first, last + 1, dtype=np.int64)
+
+    token = f"{time.time_ns():x}"
+    filename = f"panel.{token}.npy"
+    tmp_path = os.path.join(store_dir, f"{filename}.{os.getpid()}.tmp")
+    # Written straight into a memory-mapped file, so the merged panel never sits in memory whole.
+    panel = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64,
+                                      shape=(len(datasets), len(catalog), len(years)))
+    for i, dataset in enumerate(datasets):
+        panel[i] = place_on_grid(dataset, catalog.ids(dataset), years, len(catalog))
+    panel.flush()
+    del panel
+    os.replace(tmp_path, os.path.join(store_dir, filename))
+    return {"file": filename, "indicators": [entry["indicator"] for entry in files.values()],
+            "first_year": first, "last_year": last, "keys": list(catalog.keys), "names": list(catalog.names),
+            "codes": list(catalog.codes), "aliases": catalog.aliases}
+
+
+def ingest_directory(directory, store_dir=None, workers=None, force=False, on_progress=None):
+    """Ingest every CSV under `directory` into the panel store at store_dir (default: directory/.gda_panel).
+
+    Only files whose content hash changed since the last run are parsed
+    (all of them with force=True). ``on_progress(summary)`` is called after
+    each parsed file.
+    """
+    started = time.perf_counter()
+    directory = os.path.abspath(directory)
+    store_dir = os.path.abspath(store_dir or os.path.join(directory, STORE_DIR))
+    os.makedirs(os.path.join(store_dir, "parts"), exist_ok=True)
+    manifest = (None if force else _load_manifest(store_dir)) or {"version": STORE_VERSION, "files": {}}
+    old_files = manifest["files"]
+    summary = IngestSummary()
+
+    files, pending = {}, []
+    for relpath in find_indicator_files(directory):
+        path = os.path.join(directory, relpath)
+        try:
+            stamp = _stamp(path)
+            entry = old_files.get(relpath)
+            # A matching size/mtime is trusted; otherwise the file is re-hashed, so touching it costs no parse.
+            if entry is not None and entry["stamp"] != stamp:
+                if entry["stamp"][0] != stamp[0] or entry["hash"] != file_digest(path):
+                    entry = None
+                else:
+                    entry = dict(entry, stamp=stamp)
+            if entry is not None and os.path.exists(os.path.join(store_dir, "parts", entry["part"])):
+                files[relpath] = entry
+                summary.reused.append(relpath)
+                continue
+            digest = file_digest(path)
+        except OSError as exc:
+            summary.failures.append((relpath, str(exc)))
+            continue
+        pending.append((relpath, {"indicator": indicator_name(relpath), "stamp": stamp, "hash": digest,
+                                  "part": _part_name(relpath, digest)}))
+
+    def finished(relpath, entry, outcome):
+        if isinstance(outcome, Exception):
+            summary.failures.append((relpath, str(outcome)))
+        else:
+            files[relpath] = dict(entry, **outcome)
+            summary.parsed.append(relpath)
+        if on_progress:
+            on_progress(summary)
+
+    jobs = [(relpath, entry, os.path.join(directory, relpath), os.path.join(store_dir, "parts", entry["part"]))
+            for relpath, entry in pending]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    if workers == 1:
+        for relpath, entry, path, part_path in jobs:
+            try:
+                outcome = parse_part(path, part_path)
+            except Exception as exc:
+                outcome = exc
+            finished(relpath, entry, outcome)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(parse_part, path, part_path): (relpath, entry)
+                       for relpath, entry, path, part_path in jobs}
+            for future in as_completed(futures):
+                relpath, entry = futures[future]
+                exc = future.exception()
+                finished(relpath, entry, exc if exc is not None else future.result())
+
+    summary.removed = sorted(set(old_files) - set(files) - {relpath for relpath, _ in summary.failures})
+    files = {relpath: files[relpath] for relpath in sorted(files)}
+    old_panel = manifest.get("panel")
+    changed = (summary.parsed or summary.removed or old_panel is None
+               or old_panel["indicators"] != [entry["indicator"] for entry in files.values()]
+               or not os.path.exists(os.path.join(store_dir, old_panel["file"])))
+    if changed:
+        manifest["panel"] = merge_parts(directory, store_dir, files)
+        summary.merged = True
+    manifest["files"] = files
+    # The manifest is replaced last, so a reader never sees it point at a half-written panel.
+    _write_json(os.path.join(store_dir, MANIFEST), manifest)
+
+    # Old parts and panels are only deleted once nothing refers to them.
+    live = {entry["part"] for entry in files.values()}
+    for filename in os.listdir(os.path.join(store_dir, "parts")):
+        if filename not in live:
+            _remove(os.path.join(store_dir, "parts", filename))
+    for filename in os.listdir(store_dir):
+        if filename.startswith("panel.") and filename != manifest["panel"]["file"]:
+            _remove(os.path.join(store_dir, filename))
+
+    summary.indicators = len(manifest["panel"]["indicators"])
+    summary.countries = len(manifest["panel"]["keys"])
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+class PanelStore:
+    """Read side of an ingested store: every indicator on one country axis and one yearly axis.
+
+    The panel array is memory-mapped, so opening a store with hundreds of
+    indicators only reads the manifest.
+    """
+
+    def __init__(self, store_dir):
+        manifest = _load_manifest(store_dir)
+        if manifest is None or "panel" not in manifest:
+            raise FileNotFoundError(f"no panel store in {store_dir} (run bulk_ingest.py first)")
+        panel = manifest["panel"]
+        self.store_dir = store_dir
+        self.files = manifest["files"]
+        self.indicators = panel["indicators"]
+        self.years = np.arange(panel["first_year"], panel["last_year"] + 1, dtype=np.int64)
+        self.keys = panel["keys"]
+        self.names = panel["names"]
+        self.codes = panel["codes"]
+        self.aliases = panel["aliases"]
+        self.values = np.load(os.path.join(store_dir, panel["file"]), mmap_mode="r")
+        self._indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        self._normalized = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, indicator):
+        return indicator in self._indicator_index
+
+    def id_of(self, country):
+        """Row for any spelling or code seen during ingest, or None."""
+        row = self.aliases.get(country)
+        if row is None:
+            if self._normalized is None:
+                self._normalized = {key: i for i, key in enumerate(self.keys)}
+                for name, i in self.aliases.items():
+                    self._normalized.setdefault(normalize_name(name), i)
+            row = self._normalized.get(country, self._normalized.get(normalize_name(country)))
+        return row
+
+    def indicator(self, name):
+        """(countries, years) values of one indicator (a read-only memory-mapped view)."""
+        index = self._indicator_index.get(name)
+        if index is None:
+            raise KeyError(f"unknown indicator {name!r}")
+        return self.values[index]
+
+    def dataset(self, name):
+        """One indicator as a Dataset on the store's country axis, usable wherever a loaded CSV is."""
+        return Dataset(self.names, self.years, self.indicator(name), codes=self.codes)
+
+    def series(self, name, country):
+        """(years, values) for one country, or None."""
+        row = self.id_of(country)
+        if row is None:
+            return None
+        values = np.asarray(self.indicator(name)[row])
+        present = ~np.isnan(values)
+        if not present.any():
+            return None
+        return self.years[present], values[present]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest a directory of indicator CSVs into one panel store.")
+    parser.add_argument("directory")
+    parser.add_argument("--store", help=f"panel store directory (default: DIRECTORY/{STORE_DIR})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="reparse every file, not just changed ones")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"{args.directory}: not a directory", file=sys.stderr)
+        return 2
+    summary = ingest_directory(args.directory, store_dir=args.store, workers=args.workers, force=args.force)
+    for relpath, error in summary.failures:
+        print(f"{relpath}: {error}", file=sys.stderr)
+    print(summary)
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
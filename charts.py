@@ -0,0 +1,71 @@
+import numpy as np
+
+from aggregates import aggregate_cubes
+from plot_manager import SECONDARY, LineSpec
+from series_cache import INTERPOLATED, series_cache
+
+# Axis titles and legend placement for each chart, shared by the Tk windows
+# and the headless report generator.
+POPULATION_CHART = dict(title="Population Growth", xlabel="Year", ylabel="Population")
+GDP_CHART = dict(title="GDP Over Time", xlabel="Year", ylabel="GDP (USD)")
+POPULATION_AND_GDP_CHART = dict(title="Population and GDP Growth", xlabel="Year", ylabel="Population",
+                                ylabel2="GDP (USD)", legend_loc="upper left", legend_loc2="upper right")
+
+
+def group_series(panel, indicator, name):
+    """Totals for a continent, region or income group typed in place of a country, or None."""
+    return aggregate_cubes(panel).series(indicator, name) if panel is not None else None
+
+
+def population_lines(population, countries, panel=None):
+    """Population trend lines; names the population file lacks are resolved through the panel."""
+    lines = []
+    for i, country in enumerate(countries):
+        series, source = series_cache.series(population, country), population
+        if series is None and panel is not None:
+            series, source = series_cache.series(panel, country, indicator="population"), panel
+        if series is None:
+            series = group_series(panel, "population", country)
+        if series:
+            years, populations = series
+            lines.append(LineSpec(("population", country), years, populations, source=source,
+                                  marker='o', linestyle='-', label=country, color=f"C{i}"))
+    return lines
+
+
+def gdp_lines(panel, countries):
+    """GDP trend lines, looked up through the panel so population-file names ('Russia') find GDP rows."""
+    lines = []
+    for i, country in enumerate(countries if panel else []):
+        series = series_cache.series(panel, country, indicator="gdp") or group_series(panel, "gdp", country)
+        if series:
+            years, gdps = series
+            lines.append(LineSpec(("gdp", country), years, gdps, source=panel,
+                                  marker='x', linestyle='--', label=country, color=f"C{i}"))
+    return lines
+
+
+def population_and_gdp_lines(panel, countries):
+    """Population (left axis) and GDP (right axis) on the panel's shared yearly axis."""
+    lines = []
+    for country in countries if panel else []:
+        # ✅ Census gaps interpolated log-linearly, markers only on actual census years
+        pop_series = series_cache.series(panel, country, indicator="population", transform=INTERPOLATED)
+        census = series_cache.series(panel, country, indicator="population")
+        gdp_series = series_cache.series(panel, country, indicator="gdp") or group_series(panel, "gdp", country)
+        if pop_series is None:
+            # Continent totals have no census years of their own: every point gets a marker.
+            pop_series = group_series(panel, "population", country)
+
+        if pop_series:
+            pop_years, populations = pop_series
+            markers = np.searchsorted(pop_years, census[0]).tolist() if census else None
+            lines.append(LineSpec(("population_aligned", country), pop_years, populations, source=panel,
+                                  marker='o', markevery=markers, linestyle='-',
+                                  label=f"{country} Population", color='blue'))
+
+        if gdp_series:
+            gdp_years, gdps = gdp_series
+            lines.append(LineSpec(("gdp", country), gdp_years, gdps, source=panel, axis=SECONDARY,
+                                  marker='x', linestyle='--', label=f"{country} GDP", color='green'))
+    return lines
@@ -0,0 +1,167 @@
+import csv
+import os
+import tempfile
+
+import numpy as np
+
+QUOTE = ord('"')
+NEWLINE = ord("\n")
+
+
+class CsvRowIndex:
+    """Row source over a CSV file that never loads the whole file.
+
+    ``build`` scans the file in large binary blocks on a worker thread and
+    records the byte offset of every STRIDE-th record (newlines inside quoted
+    fields are skipped by tracking quote parity with NumPy). ``rows`` seeks to
+    the nearest checkpoint and lets pandas parse just the requested page, so
+    any row can be shown as soon as it has been indexed.
+    """
+
+    STRIDE = 1000
+    BLOCK_BYTES = 8 << 20
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.total_bytes = os.path.getsize(path)
+        self._reset_index()
+        with open(path, newline="", encoding=encoding) as handle:
+            self.columns = next(csv.reader(handle), [])
+
+    def _reset_index(self):
+        self.offsets = []
+        self.rows_indexed = 0
+        self.bytes_indexed = 0
+        self.done = False
+
+    def __len__(self):
+        return self.rows_indexed
+
+    def build(self, task=None):
+        """Index the whole file; safe to run on a loader thread while rows() is used."""
+        boundaries = 0          # record ends seen so far; the first one ends the header
+        in_quotes = False
+        position = 0
+        with open(self.path, "rb") as handle:
+            while True:
+                if task is not None:
+                    task.check_cancelled()
+                block = handle.read(self.BLOCK_BYTES)
+                if not block:
+                    break
+                data = np.frombuffer(block, dtype=np.uint8)
+                quote_count = np.cumsum(data == QUOTE)
+                newlines = np.flatnonzero(data == NEWLINE)
+                # A newline ends a record only when the quotes before it are balanced.
+                balanced = (quote_count[newlines] + in_quotes) % 2 == 0
+                ends = newlines[balanced]
+                # Record k (0 = first data row) starts right after boundary k.
+                record_numbers = boundaries + np.arange(len(ends))
+                checkpoints = ends[record_numbers % self.STRIDE == 0]
+                self.offsets.extend((position + checkpoints + 1).tolist())
+                boundaries += len(ends)
+                in_quotes = bool((quote_count[-1] + in_quotes) % 2)
+                position += len(block)
+                self.bytes_indexed = position
+                self.rows_indexed = max(boundaries - 1, 0)
+                if task is not None:
+                    task.report(rows=self.rows_indexed, bytes_read=position, total_bytes=self.total_bytes,
+                                message="Indexing")
+            last_byte = self._last_byte(handle)
+        # A final line without a trailing newline is still a row.
+        if last_byte not in (None, NEWLINE) and boundaries:
+            boundaries += 1
+        while self.offsets and self.offsets[-1] >= self.total_bytes:
+            self.offsets.pop()
+        self.rows_indexed = max(boundaries - 1, 0)
+        self.done = True
+        return self
+
+    def _last_byte(self, handle):
+        if not self.total_bytes:
+            return None
+        handle.seek(self.total_bytes - 1)
+        return handle.read(1)[0]
+
+    def rows(self, start, stop):
+        import pandas as pd
+
+        stop = min(stop, self.rows_indexed)
+        checkpoint = start // self.STRIDE
+        if start >= stop or checkpoint >= len(self.offsets):
+            return []
+        with open(self.path, "rb") as handle:
+            handle.seek(self.offsets[checkpoint])
+            page = pd.read_csv(handle, header=None, names=self.columns, encoding=self.encoding,
+                               skiprows=start - checkpoint * self.STRIDE, nrows=stop - start,
+                               dtype=str, keep_default_na=False, skip_blank_lines=False)
+        return list(page.itertuples(index=False, name=None))
+
+    def close(self):
+        pass
+
+
+class ExcelRowIndex(CsvRowIndex):
+    """Streams an .xlsx sheet through openpyxl's read-only mode into a CSV spool.
+
+    Offsets are recorded while the spool is written, so pages become
+    available as soon as they are flushed; the spool is deleted on close().
+    """
+
+    def __init__(self, path, sheet=None):
+        self.source_path = path
+        self.sheet = sheet
+        handle, spool_path = tempfile.mkstemp(prefix="gda_", suffix=".csv")
+        os.close(handle)
+        self.path = spool_path
+        self.encoding = "utf-8"
+        self.total_bytes = os.path.getsize(path)
+        self._reset_index()
+        self.columns = []
+
+    def build(self, task=None):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.source_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[self.sheet] if self.sheet else workbook.active
+            with open(self.path, "w", newline="", encoding=self.encoding) as spool:
+                writer = csv.writer(spool)
+                rows = sheet.iter_rows(values_only=True)
+                header = next(rows, ())
+                self.columns = [str(title) if title is not None else f"Column {n + 1}" for n, title in enumerate(header)]
+                writer.writerow(self.columns)
+                written = 0
+                for row in rows:
+                    if written % self.STRIDE == 0:
+                        spool.flush()
+                        self.rows_indexed = written
+                        self.offsets.append(spool.tell())
+                        if task is not None:
+                            task.check_cancelled()
+                            task.report(rows=written, message="Indexing")
+                    writer.writerow(["" if value is None else value for value in row])
+                    written += 1
+                spool.flush()
+                self.rows_indexed = written
+                self.bytes_indexed = self.total_bytes
+        finally:
+            workbook.close()
+        self.done = True
+        if task is not None:
+            task.report(rows=self.rows_indexed, bytes_read=self.total_bytes, total_bytes=self.total_bytes)
+        return self
+
+    def close(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def open_row_index(file_path):
+    """Return an unbuilt row index for a .csv or .xlsx file."""
+    if file_path.endswith(".xlsx"):
+        return ExcelRowIndex(file_path)
+    return CsvRowIndex(file_path)
@@ -0,0 +1,333 @@
+"""Headless command line for the analyzer (cron, containers, no display).
+
+Only the standard library is imported up front; NumPy comes in with the
+dataset registry when a subcommand loads data, and matplotlib only for
+`chart` and `report`. Warm runs read the memory-mapped disk cache, so a
+series query never touches pandas either.
+
+    python main.py series gdp "Germany"
+    python main.py stats population --start 2000 --end 2020 --country India --country China
+    python main.py top gdp 2020 -n 5
+    python main.py top population 2022 --continent Asia
+    python main.py groups gdp 2020 --by income
+    python main.py table life_expectancy --out life.csv
+    python main.py chart population_gdp Brazil --out brazil.png
+    python main.py report --out reports --format pdf
+    python main.py ingest releases/2024-06 --workers 8
+"""
+import argparse
+import csv
+import sys
+
+# Indicator name -> (file the locator looks for, dataset_registry loader name).
+INDICATORS = {
+    "population": ("world_population.csv", "load_population"),
+    "gdp": ("gdp.csv", "load_gdp"),
+    "life_expectancy": ("Life expectancy.csv", "load_life_expectancy"),
+}
+CHARTS = ("population", "gdp", "population_gdp")
+FORWARDED = ("report", "ingest")
+
+
+class CliError(Exception):
+    """A problem worth one line on stderr rather than a traceback."""
+
+
+def _format(value):
+    return f"{value:.15g}"
+
+
+def load(indicator):
+    import dataset_registry
+    from dataset_locator import find_dataset
+
+    filename, loader = INDICATORS[indicator]
+    path = find_dataset(filename)
+    if not path:
+        raise CliError(f"{filename} not found (set GDA_DATA_ROOTS or pass --data-root)")
+    return getattr(dataset_registry, loader)(path)
+
+
+def load_panel(indicators=INDICATORS, required=()):
+    """Panel of every indicator found; a missing `required` one is an error rather than a gap."""
+    from panel_alignment import aligned_panel
+
+    datasets = {}
+    for indicator in indicators:
+        try:
+            datasets[indicator] = load(indicator)
+        except CliError:
+            if indicator in required:
+                raise
+    return aligned_panel(**{name: data for name, data in datasets.items() if len(data)})
+
+
+def lookup_series(indicator, country, interpolated=False):
+    """(years, values) for a country, falling back to the aligned panel for other spellings."""
+    series = None if interpolated else load(indicator).series(country)
+    if series is None:
+        series = load_panel(required=(indicator,)).series(indicator, country, interpolated=interpolated)
+    if series is None:
+        from aggregates import aggregate_cubes
+
+        # Continent totals, World Bank regions and income groups work in place of a country.
+        series = aggregate_cubes(load_panel(required=(indicator,))).series(indicator, country)
+    if series is None:
+        raise CliError(f"no {indicator} data for {country!r}")
+    return series
+
+
+def cmd_series(args, out):
+    years, values = lookup_series(args.indicator, args.country, interpolated=args.interpolated)
+    writer = csv.writer(out)
+    writer.writerow(["year", args.indicator])
+    writer.writerows((int(year), _format(value)) for year, value in zip(years, values))
+
+
+def cmd_stats(args, out):
+    import numpy as np
+    from stats_calculator import cagr, first_last_valid
+
+    dataset = load(args.indicator)
+    if args.countries:
+        missing = [name for name in args.countries if name not in dataset]
+        if missing:
+            raise CliError(f"not in {args.indicator}: {', '.join(missing)}")
+        rows = np.array([dataset.index[name] for name in args.countries], dtype=np.int64)
+    else:
+        rows = np.arange(len(dataset))
+    values = dataset.values[rows]
+    mask = np.ones(len(dataset.years), dtype=bool)
+    if args.start is not None:
+        mask &= dataset.years >= args.start
+    if args.end is not None:
+        mask &= dataset.years <= args.end
+    window, years = values[:, mask], dataset.years[mask]
+    growth = cagr(window, years)
+    first, last = first_last_valid(window) if window.shape[1] else (np.full(len(rows), -1),) * 2
+
+    writer = csv.writer(out)
+    writer.writerow(["country", "first_year", "first", "last_year", "last", "cagr"])
+    for i, row in enumerate(rows):
+        if first[i] < 0:
+            writer.writerow([dataset.names[row], "", "", "", "", ""])
+            continue
+        writer.writerow([dataset.names[row], int(years[first[i]]), _format(window[i, first[i]]),
+                         int(years[last[i]]), _format(window[i, last[i]]),
+                         "" if np.isnan(growth[i]) else f"{growth[i]:.6f}"])
+
+
+def cmd_top(args, out):
+    from stats_calculator import top_n
+
+    if args.continent:
+        return top_in_continent(args, out)
+    dataset = load(args.indicator)
+    if dataset.column(args.year) is None:
+        raise CliError(f"{args.indicator} has no {args.year} column")
+    exclude = None
+    if dataset.codes and not args.include_aggregates:
+        # gdp.csv also has World, income and region rows; rank countries only.
+        from aggregates import is_aggregate
+
+        exclude = [is_aggregate(code) for code in dataset.codes]
+    writer = csv.writer(out)
+    writer.writerow(["rank", "country", args.indicator])
+    ranked = top_n(dataset, args.year, args.n, descending=not args.ascending, exclude=exclude)
+    for rank, (name, value) in enumerate(ranked, 1):
+        writer.writerow([rank, name, _format(value)])
+
+
+def top_in_continent(args, out):
+    from aggregates import aggregate_cubes
+
+    cubes = aggregate_cubes(load_panel(required=(args.indicator,)))
+    if args.continent not in cubes.labels():
+        raise CliError(f"unknown continent {args.continent!r} (one of: {', '.join(cubes.labels())})")
+    ranked = cubes.top(args.indicator, args.continent, args.year, n=None if args.ascending else args.n)
+    if args.ascending:
+        ranked = ranked[::-1][:args.n]
+    writer = csv.writer(out)
+    writer.writerow(["rank", "country", args.indicator])
+    for rank, (name, value) in enumerate(ranked, 1):
+        writer.writerow([rank, name, _format(value)])
+
+
+def cmd_groups(args, out):
+    from aggregates import CONTINENT, RATE_INDICATORS, aggregate_cubes
+
+    if args.stat == "weighted_mean" and args.indicator not in RATE_INDICATORS:
+        raise CliError(f"--stat weighted_mean only applies to rates ({', '.join(sorted(RATE_INDICATORS))}); "
+                       f"use sum or mean for {args.indicator}")
+    cubes = aggregate_cubes(load_panel(required=(args.indicator,)))
+    if args.indicator not in cubes.panel.indicators:
+        raise CliError(f"no {args.indicator} data loaded")
+    writer = csv.writer(out)
+    if args.grouping == CONTINENT:
+        cube = cubes.cube(args.indicator)
+        column = args.year - int(cube.years[0]) if len(cube.years) else -1
+        if not 0 <= column < len(cube.years):
+            raise CliError(f"{args.indicator} has no {args.year} column")
+        try:
+            table = cube.stat(args.stat)
+        except KeyError as exc:
+            raise CliError(exc.args[0]) from None
+        writer.writerow(["group", args.stat, "countries"])
+        for label, value, count in zip(cube.labels, table[:, column], cube.count[:, column]):
+            writer.writerow([label, "" if value != value else _format(value), int(count)])
+        return
+    writer.writerow(["group", args.indicator])
+    for label in cubes.labels(args.grouping):
+        series = cubes.series(args.indicator, label)
+        value = None
+        if series is not None:
+            years, values = series
+            match = (years == args.year).nonzero()[0]
+            value = values[match[0]] if len(match) else None
+        writer.writerow([label, "" if value is None else _format(value)])
+
+
+def cmd_table(args, out):
+    import numpy as np
+
+    dataset = load(args.indicator)
+    missing = [name for name in args.countries if name not in dataset]
+    if missing:
+        raise CliError(f"not in {args.indicator}: {', '.join(missing)}")
+    rows = [dataset.index[name] for name in args.countries] if args.countries else range(len(dataset))
+    target = open(args.out, "w", newline="", encoding="utf-8") if args.out else out
+    try:
+        writer = csv.writer(target)
+        writer.writerow(["country", "code"] + [int(year) for year in dataset.years])
+        for row in rows:
+            code = dataset.codes[row] if dataset.codes else ""
+            writer.writerow([dataset.names[row], code] +
+                            ["" if np.isnan(value) else _format(value) for value in dataset.values[row]])
+    finally:
+        if target is not out:
+            target.close()
+
+
+def cmd_chart(args, out):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    import charts
+    from plot_manager import PlotManager
+
+    needed = {"population": (), "gdp": ("gdp",), "population_gdp": ("population", "gdp")}[args.chart]
+    panel = load_panel(("population", "gdp"), required=needed)
+    if args.chart == "population":
+        lines, labels = charts.population_lines(load("population"), args.countries, panel), charts.POPULATION_CHART
+    elif args.chart == "gdp":
+        lines, labels = charts.gdp_lines(panel, args.countries), charts.GDP_CHART
+    else:
+        lines, labels = charts.population_and_gdp_lines(panel, args.countries), charts.POPULATION_AND_GDP_CHART
+    if not lines:
+        raise CliError(f"no {args.chart} data for {', '.join(args.countries)}")
+
+    figure = Figure(figsize=(args.width, args.height), dpi=args.dpi)
+    FigureCanvasAgg(figure)
+    PlotManager(figure.add_subplot(), figure.canvas).show(lines, **labels)
+    figure.savefig(args.out, dpi=args.dpi)
+    print(args.out, file=out)
+
+
+def cmd_report(args, out):
+    import report_generator
+
+    return report_generator.main(args.forwarded)
+
+
+def cmd_ingest(args, out):
+    import bulk_ingest
+
+    return bulk_ingest.main(args.forwarded)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Global Data Analyzer, headless mode.")
+    parser.add_argument("--data-root", action="append", default=[], metavar="DIR",
+                        help="extra folder to search for the CSV files (repeatable)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    series = commands.add_parser("series", help="print one country's series as CSV")
+    series.add_argument("indicator", choices=INDICATORS)
+    series.add_argument("country")
+    series.add_argument("--interpolated", action="store_true", help="fill gaps on the shared yearly axis")
+    series.set_defaults(run=cmd_series)
+
+    stats = commands.add_parser("stats", help="first/last value and CAGR per country")
+    stats.add_argument("indicator", choices=INDICATORS)
+    stats.add_argument("--country", dest="countries", action="append", default=[], metavar="NAME",
+                       help="repeatable; default: every country")
+    stats.add_argument("--start", type=int)
+    stats.add_argument("--end", type=int)
+    stats.set_defaults(run=cmd_stats)
+
+    top = commands.add_parser("top", help="largest (or smallest) values in one year")
+    top.add_argument("indicator", choices=INDICATORS)
+    top.add_argument("year", type=int)
+    top.add_argument("-n", type=int, default=10)
+    top.add_argument("--ascending", action="store_true")
+    top.add_argument("--continent", help="rank only the countries of one continent")
+    top.add_argument("--include-aggregates", action="store_true",
+                     help="also rank aggregate rows such as World, High income and OECD members")
+    top.set_defaults(run=cmd_top)
+
+    groups = commands.add_parser("groups", help="continent totals/means, or reported region and income rows")
+    groups.add_argument("indicator", choices=INDICATORS)
+    groups.add_argument("year", type=int)
+    groups.add_argument("--by", dest="grouping", choices=("continent", "region", "income"), default="continent")
+    groups.add_argument("--stat", choices=("sum", "mean", "weighted_mean"), default="sum",
+                        help="continent statistic (weighted_mean: population-weighted, life_expectancy only)")
+    groups.set_defaults(run=cmd_groups)
+
+    table = commands.add_parser("table", help="export an indicator as a wide CSV table")
+    table.add_argument("indicator", choices=INDICATORS)
+    table.add_argument("countries", nargs="*", help="default: every country")
+    table.add_argument("--out", help="file to write (default: stdout)")
+    table.set_defaults(run=cmd_table)
+
+    chart = commands.add_parser("chart", help="save a chart image (PNG, SVG, PDF by extension)")
+    chart.add_argument("chart", choices=CHARTS)
+    chart.add_argument("countries", nargs="+")
+    chart.add_argument("--out", required=True)
+    chart.add_argument("--width", type=float, default=8)
+    chart.add_argument("--height", type=float, default=5)
+    chart.add_argument("--dpi", type=int, default=100)
+    chart.set_defaults(run=cmd_chart)
+
+    report = commands.add_parser("report", help="batch per-country reports (see report_generator.py -h)",
+                                 add_help=False)
+    report.set_defaults(run=cmd_report)
+
+    ingest = commands.add_parser("ingest", help="merge a directory of indicator CSVs into one panel store "
+                                                "(see bulk_ingest.py -h)", add_help=False)
+    ingest.set_defaults(run=cmd_ingest)
+    return parser
+
+
+def main(argv=None, out=None):
+    parser = build_parser()
+    # `report` and `ingest` forward their options untouched to their own modules' parsers.
+    args, extra = parser.parse_known_args(argv)
+    if args.command in FORWARDED:
+        args.forwarded = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    out = out or sys.stdout
+    if args.data_root:
+        from dataset_locator import locator
+
+        for root in args.data_root:
+            locator.add_root(root)
+    try:
+        return args.run(args, out) or 0
+    except CliError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import csv
+import re
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from search_index import SearchIndex
+
+# Extra per-country columns picked up from any source file that has them
+# (world_population.csv has both).
+METADATA_COLUMNS = {"continent": ("Continent",), "capital": ("Capital",)}
+NAME_COLUMNS = ("Country Name", "Country/Territory", "Country", "Entity", "Name")
+CODE_COLUMNS = ("Code", "Country Code", "CCA3", "ISO3")
+
+
+def normalize_name(name):
+    """Loose key for matching spellings like 'Bahamas, The' / 'The Bahamas'."""
+    name = name.lower().replace("&", "and")
+    name = re.sub(r"\b(the|of|rep|republic)\b", " ", name)
+    return " ".join(sorted(re.findall(r"[a-z0-9]+", name)))
+
+
+class CountryMapper:
+    """Maps every dataset's row names onto one canonical key per country.
+
+    Datasets with codes (gdp.csv 'Code', world_population.csv 'CCA3') key by
+    code, and every name they use for that code becomes an alias, so a
+    code-less table such as Life expectancy.csv ('Russia') still lines up
+    with gdp.csv ('Russian Federation').
+    """
+
+    def __init__(self, datasets):
+        self.aliases = {}
+        self.normalized = {}
+        self.display_names = {}
+        for dataset in datasets:
+            if not dataset.codes:
+                continue
+            for name, code in zip(dataset.names, dataset.codes):
+                if not code:
+                    continue
+                self.aliases.setdefault(name, code)
+                self.normalized.setdefault(normalize_name(name), code)
+                self.display_names.setdefault(code, name)
+
+    def key(self, name, code=None):
+        if code:
+            return code
+        if name in self.aliases:
+            return self.aliases[name]
+        return self.normalized.get(normalize_name(name), name)
+
+    def keys(self, dataset):
+        codes = dataset.codes or [None] * len(dataset.names)
+        return [self.key(name, code) for name, code in zip(dataset.names, codes)]
+
+
+class CountryCatalog:
+    """One entry per country across a set of datasets, addressed by integer ID.
+
+    Names, codes and aliases are interned strings held once per catalog.
+    Every spelling any dataset uses resolves to the same ID, and the
+    dataset-row <-> ID maps are integer arrays built once per dataset, so
+    windows and widgets can share one catalog (and one SearchIndex) instead
+    of each keeping its own country lists and name-keyed dicts. Continent
+    and capital are read from the source files on first use and stored as
+    an index array into a handful of interned continent names.
+    """
+
+    __slots__ = ("mapper", "keys", "names", "codes", "id_of_key", "aliases", "sources", "_dataset_ids",
+                 "_dataset_rows", "_search_index", "_continent_names", "_continents", "_capitals", "_lock",
+                 "__weakref__")
+
+    def __init__(self, datasets):
+        datasets = list(datasets)
+        self.mapper = CountryMapper(datasets)
+        self.keys = []
+        self.id_of_key = {}
+        keyed = []
+        for dataset in datasets:
+            keys = [sys.intern(key) for key in self.mapper.keys(dataset)]
+            keyed.append(keys)
+            for key in keys:
+                if key not in self.id_of_key:
+                    self.id_of_key[key] = len(self.keys)
+                    self.keys.append(key)
+        self.keys = tuple(self.keys)
+        self.names = tuple(sys.intern(self.mapper.display_names.get(key, key)) for key in self.keys)
+        self.codes = tuple(key if key in self.mapper.display_names else "" for key in self.keys)
+
+        # Any spelling seen in any dataset resolves to the same ID.
+        self.aliases = {}
+        self._dataset_ids = {}
+        for dataset, keys in zip(datasets, keyed):
+            ids = np.fromiter((self.id_of_key[key] for key in keys), dtype=np.int64, count=len(keys))
+            ids.setflags(write=False)
+            self._dataset_ids[id(dataset)] = (dataset, ids)
+            for name, country_id in zip(dataset.names, ids.tolist()):
+                self.aliases.setdefault(sys.intern(name), country_id)
+        self.sources = tuple(dataset.source for dataset in datasets if dataset.source)
+        self._dataset_rows = {}
+        self._search_index = None
+        self._continent_names = None
+        self._continents = None
+        self._capitals = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, name):
+        return self.id_of(name) is not None
+
+    def id_of(self, name):
+        """Catalog ID for any known spelling or code, or None."""
+        country_id = self.aliases.get(name)
+        if country_id is None:
+            country_id = self.id_of_key.get(self.mapper.key(name))
+        return country_id
+
+    def name(self, country_id):
+        return self.names[country_id]
+
+    def code(self, country_id):
+        return self.codes[country_id]
+
+    @property
+    def search_index(self):
+        """SearchIndex over the display names; option ids are catalog IDs."""
+        if self._search_index is None:
+            with self._lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.names)
+        return self._search_index
+
+    # -- dataset rows ------------------------------------------------------
+
+    def ids(self, dataset):
+        """Catalog ID of every row of `dataset` (int64 array, len(dataset))."""
+        entry = self._dataset_ids.get(id(dataset))
+        if entry is not None and entry[0] is dataset:
+            return entry[1]
+        lookup = self.id_of
+        ids = np.fromiter((-1 if (country_id := lookup(name)) is None else country_id for name in dataset.names),
+                          dtype=np.int64, count=len(dataset.names))
+        ids.setflags(write=False)
+        with self._lock:
+            self._dataset_ids[id(dataset)] = (dataset, ids)
+        return ids
+
+    def rows(self, dataset):
+        """Row of every catalog ID in `dataset`, -1 where it has none (int64 array, len(self))."""
+        entry = self._dataset_rows.get(id(dataset))
+        if entry is not None and entry[0] is dataset:
+            return entry[1]
+        ids = self.ids(dataset)
+        rows = np.full(len(self), -1, dtype=np.int64)
+        known = ids >= 0
+        # Reversed so the first row of a duplicated country wins, as in Dataset.index.
+        rows[ids[known][::-1]] = np.flatnonzero(known)[::-1]
+        rows.setflags(write=False)
+        with self._lock:
+            self._dataset_rows[id(dataset)] = (dataset, rows)
+        return rows
+
+    def series(self, dataset, country_id):
+        """dataset.series() for a catalog ID, whatever the dataset calls that country."""
+        row = int(self.rows(dataset)[country_id])
+        return dataset.series(dataset.names[row]) if row >= 0 else None
+
+    # -- metadata ----------------------------------------------------------
+
+    def _load_metadata(self):
+        continents = array("B", bytes(len(self)))
+        continent_names = [""]
+        capitals = [None] * len(self)
+        for path in self.sources:
+            try:
+                handle = open(path, newline="", encoding="utf-8")
+            except OSError:
+                continue
+            with handle:
+                reader = csv.reader(handle)
+                header = next(reader, [])
+                column = {title: i for i, title in enumerate(header)}
+                name_col = next((column[title] for title in NAME_COLUMNS if title in column), None)
+                code_col = next((column[title] for title in CODE_COLUMNS if title in column), None)
+                continent_col = next((column[title] for title in METADATA_COLUMNS["continent"] if title in column),
+                                     None)
+                capital_col = next((column[title] for title in METADATA_COLUMNS["capital"] if title in column), None)
+                if name_col is None or (continent_col is None and capital_col is None):
+                    continue
+                for record in reader:
+                    if len(record) < len(header):
+                        continue
+                    country_id = self.id_of_key.get(record[code_col]) if code_col is not None else None
+                    if country_id is None:
+                        country_id = self.id_of(record[name_col])
+                    if country_id is None:
+                        continue
+                    if continent_col is not None and record[continent_col] and not continents[country_id]:
+                        continent = sys.intern(record[continent_col])
+                        if continent not in continent_names:
+                            continent_names.append(continent)
+                        continents[country_id] = continent_names.index(continent)
+                    if capital_col is not None and record[capital_col] and capitals[country_id] is None:
+                        capitals[country_id] = sys.intern(record[capital_col])
+        self._continent_names = tuple(continent_names)
+        self._capitals = tuple(capitals)
+        self._continents = continents
+
+    def _metadata(self):
+        if self._continents is None:
+            with self._lock:
+                if self._continents is None:
+                    self._load_metadata()
+
+    def continent(self, country_id):
+        self._metadata()
+        return self._continent_names[self._continents[country_id]] or None
+
+    def capital(self, country_id):
+        self._metadata()
+        return self._capitals[country_id]
+
+    def continents(self):
+        self._metadata()
+        return self._continent_names[1:]
+
+    def ids_in_continent(self, continent):
+        """IDs of every country on `continent` (int64 array)."""
+        self._metadata()
+        if continent not in self._continent_names[1:]:
+            return np.empty(0, dtype=np.int64)
+        codes = np.frombuffer(self._continents, dtype=np.uint8)
+        return np.flatnonzero(codes == self._continent_names.index(continent))
+
+
+_catalogs = OrderedDict()
+_catalogs_lock = threading.Lock()
+MAX_CATALOGS = 4
+
+
+def country_catalog(*datasets):
+    """Shared CountryCatalog for these exact Dataset objects (rebuilt when a file reloads)."""
+    key = tuple(id(dataset) for dataset in datasets)
+    with _catalogs_lock:
+        entry = _catalogs.get(key)
+        if entry is not None and all(old is new for old, new in zip(entry[0], datasets)):
+            _catalogs.move_to_end(key)
+            return entry[1]
+    catalog = CountryCatalog(datasets)
+    with _catalogs_lock:
+        _catalogs[key] = (datasets, catalog)
+        while len(_catalogs) > MAX_CATALOGS:
+            _catalogs.popitem(last=False)
+    return catalog
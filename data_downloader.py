@@ -1,34 +1,68 @@
 import tkinter as tk
 from tkinter import ttk
-import csv
-import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.ticker as mtick  # ✅ For formatting large numbers with commas
+import charts
+from dataset_locator import find_dataset
+from figures import embed_figure
+from dataset_registry import Dataset, load_gdp, load_life_expectancy, load_population
+from exporter import ask_and_export
+from loader_service import loader_service
+from aggregates import aggregate_cubes
+from panel_alignment import aligned_panel
+from perf import attach_overlay, timed
+from plot_manager import PlotManager
+from search_index import IncrementalSearch, SearchIndex
+
+
+@timed
+def find_csv_file(filename, root_folder=None):
+    """Look up a CSV file through the cached dataset index (see dataset_locator)."""
+    return find_dataset(filename, root_folder)
 
 
 class SearchableComboBox:
     """Searchable dropdown (ListBox) attached to Entry."""
 
+    DEBOUNCE_MS = 120
+    MAX_RESULTS = 200
+
     def __init__(self, entry_widget, options, on_select_callback):
-        self.options = options
         self.entry = entry_widget
         self.on_select_callback = on_select_callback
+        self._pending = None
         self.listbox = tk.Listbox(self.entry.master, height=5)
         self.listbox.bind("<<ListboxSelect>>", self.on_select)
         self.entry.bind("<KeyRelease>", self.on_entry_key)
         self.entry.bind("<FocusIn>", self.show_dropdown)
         self.entry.bind("<FocusOut>", self.hide_dropdown)
-
-        for option in self.options:
-            self.listbox.insert(tk.END, option)
+        self.set_options(options)
+
+    @timed
+    def set_options(self, options):
+        """Replace the option list; pass a SearchIndex to share one between boxes."""
+        self.index = options if isinstance(options, SearchIndex) else SearchIndex(options)
+        self.options = self.index.options
+        self.search = IncrementalSearch(self.index)
+        self.show_matches(self.search.search(""))
+
+    @timed
+    def show_matches(self, ids):
+        # ✅ One batched insert, capped, instead of one insert per option
+        self.listbox.delete(0, tk.END)
+        labels = self.index.labels(ids, self.MAX_RESULTS)
+        if labels:
+            self.listbox.insert(tk.END, *labels)
 
     def on_entry_key(self, event):
+        # ✅ Debounce: only search once typing pauses
+        if self._pending is not None:
+            self.entry.after_cancel(self._pending)
+        self._pending = self.entry.after(self.DEBOUNCE_MS, self.update_matches)
+
+    @timed
+    def update_matches(self):
+        self._pending = None
         typed_value = self.entry.get().strip().lower()
-        self.listbox.delete(0, tk.END)
-        for option in self.options:
-            if typed_value in option.lower():
-                self.listbox.insert(tk.END, option)
+        self.show_matches(self.search.search(typed_value))
         self.show_dropdown()
 
     def on_select(self, event):
@@ -56,279 +90,160 @@ class PopulationApp:
         self.main_frame = ttk.Frame(self.root, padding="10")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
 
-        # ✅ Load Population and GDP data
-        self.pop_file_path = self.find_csv_file("world_population.csv")
-        self.gdp_file_path = self.find_csv_file("gdp.csv")
-
-        self.countries, self.population_data = self.read_population_data()
-        _, self.gdp_data = self.read_gdp_data()
+        # ✅ Start empty; Population and GDP data arrive from the loader thread
+        self.pop_file_path = None
+        self.gdp_file_path = None
+        self.catalog = None
+        self.countries = ()
+        self.population_data = Dataset.empty()
+        self.gdp_data = Dataset.empty()
+        self.life_expectancy_data = Dataset.empty()
+        self.panel = None
         self.selected_countries = []
         self.create_widgets()
-
+        self.overlay = attach_overlay(self.root)  # ✅ Timing breakdown when GDA_PERF is on
+        self.load_data()
+
+    def load_data(self):
+        """Locate and parse both CSVs in the background; the window fills in when they arrive."""
+        self.status_label.config(text="Loading data...")
+        self.load_task = loader_service.submit(self.load_datasets, description="Population and GDP")
+        loader_service.watch(self.root, self.load_task, self.on_data_loaded,
+                             on_error=self.on_load_error, on_progress=self.show_progress)
+
+    @timed
+    def load_datasets(self, task):
+        """Runs on the loader thread: no Tk calls in here."""
+        task.report(message="Locating data files")
+        pop_file_path = self.find_csv_file("world_population.csv")
+        gdp_file_path = self.find_csv_file("gdp.csv")
+        task.check_cancelled()
+        task.report(message="Reading population")
+        _, population_data = self.read_population_data(pop_file_path)
+        task.check_cancelled()
+        task.report(message="Reading GDP", rows=len(population_data))
+        _, gdp_data = self.read_gdp_data(gdp_file_path)
+        task.check_cancelled()
+        life_path = self.find_csv_file("Life expectancy.csv")
+        life_expectancy_data = load_life_expectancy(life_path) if life_path else Dataset.empty()
+        task.report(message="Aligning years", rows=len(population_data) + len(gdp_data) + len(life_expectancy_data))
+        # ✅ One shared year axis for all indicators, built once per dataset version
+        datasets = {"population": population_data, "gdp": gdp_data, "life_expectancy": life_expectancy_data}
+        panel = aligned_panel(**{name: data for name, data in datasets.items() if len(data)})
+        task.check_cancelled()
+        task.report(message="Aggregating continents")
+        # ✅ Continent totals and rankings precomputed here, so typing "Asia" plots instantly
+        aggregate_cubes(panel).build()
+        # ✅ The panel's country catalog (IDs, aliases, one SearchIndex) is shared by every window
+        return (pop_file_path, gdp_file_path), (panel.catalog, population_data, gdp_data, life_expectancy_data, panel)
+
+    def show_progress(self, task):
+        self.status_label.config(text=task.progress_text())
+
+    def release(self):
+        """Window closed: stop loading and drop the plot, datasets and search indexes."""
+        self.load_task.cancel()
+        self.plots.clear()
+        for entry, combo in zip(self.entries, self.combos):
+            entry.delete(0, tk.END)
+            combo.set_options([])
+        self.catalog = None
+        self.countries = ()
+        self.selected_countries = []
+        self.population_data = Dataset.empty()
+        self.gdp_data = Dataset.empty()
+        self.life_expectancy_data = Dataset.empty()
+        self.panel = None
+
+    def reopen(self):
+        """Window reused from the pool: fetch the (registry-cached) data again."""
+        if self.overlay is None:
+            self.overlay = attach_overlay(self.root)
+        self.load_data()
+
+    @timed
+    def on_data_loaded(self, result):
+        (self.pop_file_path, self.gdp_file_path), data = result
+        self.catalog, self.population_data, self.gdp_data, self.life_expectancy_data, self.panel = data
+        self.countries = self.catalog.names
+        for combo in self.combos:
+            combo.set_options(self.catalog.search_index)
+        self.status_label.config(text=f"{len(self.countries)} countries loaded")
+
+    def on_load_error(self, exc):
+        self.status_label.config(text=f"Could not load data: {exc}")
+
+    @timed
     def find_csv_file(self, filename):
         """Search for CSV files in the current directory."""
-        for dirpath, _, filenames in os.walk(os.getcwd()):
-            if filename in filenames:
-                return os.path.join(dirpath, filename)
-        return None
-
-    def read_population_data(self):
-        """Read population data from CSV."""
-        if not self.pop_file_path:
+        return find_csv_file(filename)
+
+    @timed
+    def read_population_data(self, file_path):
+        """Read population data from the shared dataset registry."""
+        if not file_path:
             print("Population CSV file not found!")
-            return [], {}
-        countries, population_data = [], {}
-        with open(self.pop_file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                country = row['Country/Territory']
-                countries.append(country)
-                population_data[country] = {}
-                for year_col in ['1970 Population', '1980 Population', '1990 Population',
-                                 '2000 Population', '2010 Population', '2015 Population',
-                                 '2020 Population', '2022 Population']:
-                    year = int(year_col.split()[0])
-                    value = row.get(year_col, "").replace(",", "")
-                    if value.isdigit():
-                        population_data[country][year] = int(value)
-        return countries, population_data
-
-    def read_gdp_data(self):
-        """Read GDP data from CSV."""
-        if not self.gdp_file_path:
+            return [], Dataset.empty()
+        population_data = load_population(file_path)
+        return population_data.names, population_data
+
+    @timed
+    def read_gdp_data(self, file_path):
+        """Read GDP data from the shared dataset registry."""
+        if not file_path:
             print("GDP CSV file not found!")
-            return [], {}
-        countries, gdp_data = [], {}
-        with open(self.gdp_file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                country = row['Country Name']
-                countries.append(country)
-                gdp_data[country] = {
-                    int(year): float(row[year]) for year in row if year.isdigit() and row[year]
-                }
-        return countries, gdp_data
+            return [], Dataset.empty()
+        gdp_data = load_gdp(file_path)
+        return gdp_data.names, gdp_data
 
     def create_widgets(self):
         ttk.Label(self.main_frame, text="Select up to 5 Countries:").pack(pady=5)
+        self.status_label = ttk.Label(self.main_frame, text="")
+        self.status_label.pack()
         self.entries = []
+        self.combos = []
         for _ in range(5):
             entry = tk.Entry(self.main_frame)
             entry.pack(pady=5)
             self.entries.append(entry)
-            SearchableComboBox(entry, self.countries, self.update_selected_countries)
+            self.combos.append(SearchableComboBox(entry, self.countries, self.update_selected_countries))
 
         # ✅ Buttons for plotting
         ttk.Button(self.main_frame, text="Plot Population", command=self.plot_population).pack(pady=5)
         ttk.Button(self.main_frame, text="Plot GDP", command=self.plot_gdp).pack(pady=5)
         ttk.Button(self.main_frame, text="Plot Population and GDP", command=self.plot_population_and_gdp).pack(pady=10)
+        ttk.Button(self.main_frame, text="Export...", command=self.export).pack(pady=5)
 
         # ✅ Create Matplotlib figure and canvas
-        self.figure, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.main_frame)
+        self.figure, self.ax, self.canvas = embed_figure(self.main_frame, figsize=(6, 4))
         self.canvas.get_tk_widget().pack(pady=10)
+        self.plots = PlotManager(self.ax, self.canvas)
 
     def update_selected_countries(self, _=None):
         """Update the list of selected countries."""
         self.selected_countries = [e.get() for e in self.entries if e.get()]
 
+    def export(self):
+        """Save the chart (PNG/SVG/PDF) or its series (CSV/Parquet) without blocking the window."""
+        ask_and_export(self.root, self.status_label, figure=self.figure, plots=self.plots)
+
+    @timed
     def plot_population(self):
         """Plot population trends."""
-        self.ax.clear()
-        for country in self.selected_countries:
-            data = self.population_data.get(country)
-            if data:
-                years, populations = zip(*sorted(data.items()))
-                self.ax.plot(years, populations, marker='o', linestyle='-', label=country)
-        self.ax.set_title("Population Growth")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("Population")
-        self.ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-        self.ax.legend()
-        self.canvas.draw()
+        lines = charts.population_lines(self.population_data, self.selected_countries, self.panel)
+        self.plots.show(lines, **charts.POPULATION_CHART)
 
+    @timed
     def plot_gdp(self):
         """Plot GDP trends."""
-        self.ax.clear()
-        for country in self.selected_countries:
-            data = self.gdp_data.get(country)
-            if data:
-                years, gdps = zip(*sorted(data.items()))
-                self.ax.plot(years, gdps, marker='x', linestyle='--', label=country)
-        self.ax.set_title("GDP Over Time")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("GDP (USD)")
-        self.ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-        self.ax.legend()
-        self.canvas.draw()
+        self.plots.show(charts.gdp_lines(self.panel, self.selected_countries), **charts.GDP_CHART)
 
+    @timed
     def plot_population_and_gdp(self):
         """Plot Population and GDP together with two Y-axes."""
-        self.ax.clear()
-        self.ax2 = self.ax.twinx()  # ✅ Second Y-axis for GDP
-
-        for country in self.selected_countries:
-            pop_data = self.population_data.get(country, {})
-            gdp_data = self.gdp_data.get(country, {})
-
-            # ✅ Plot Population on left axis
-            if pop_data:
-                pop_years, populations = zip(*sorted(pop_data.items()))
-                self.ax.plot(pop_years, populations, marker='o', linestyle='-', label=f"{country} Population", color='blue')
-
-            # ✅ Plot GDP on right axis
-            if gdp_data:
-                gdp_years, gdps = zip(*sorted(gdp_data.items()))
-                self.ax2.plot(gdp_years, gdps, marker='x', linestyle='--', label=f"{country} GDP", color='green')
-
-        # ✅ Set axis labels and titles
-        self.ax.set_title("Population and GDP Growth")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("Population")
-        self.ax2.set_ylabel("GDP (USD)")
-
-        # ✅ Add commas to both Y-axes
-        self.ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-        self.ax2.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-
-        # ✅ Add legends for both plots
-        self.ax.legend(loc="upper left")
-        self.ax2.legend(loc="upper right")
-
-        # ✅ Update canvas to reflect the changes
-        self.canvas.draw()
-
-class GDPApp:
-    """Application to visualize GDP trends."""
-    def __init__(self, root):
-        self.root = root
-        self.root.title("GDP Trends")
-        self.main_frame = ttk.Frame(self.root, padding="10")
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Find and load GDP data from CSV
-        self.file_path = self.find_csv_file("gdp.csv")
-        self.countries, self.gdp_data = self.read_csv_data()
-        self.selected_countries = []
-
-        # Create widgets (buttons, search boxes, canvas)
-        self.create_widgets()
-
-    def find_csv_file(self, filename):
-        """Search for CSV file in current directory."""
-        for dirpath, _, filenames in os.walk(os.getcwd()):
-            if filename in filenames:
-                return os.path.join(dirpath, filename)
-        return None
-
-    def read_csv_data(self):
-        """Read the GDP data from CSV and store it in a dictionary."""
-        if not self.file_path:
-            print("GDP CSV file not found!")
-            return [], {}
-        countries, gdp_data = [], {}
-        with open(self.file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                country = row['Country Name']
-                countries.append(country)
-                gdp_data[country] = {
-                    int(year): float(row[year]) for year in row if year.isdigit() and row[year]
-                }
-        return countries, gdp_data
-
-    def create_widgets(self):
-        """Create all UI widgets like search boxes, buttons, and the plot area."""
-        ttk.Label(self.main_frame, text="Select up to 5 Countries:").pack(pady=5)
-        self.entries = []
-        for _ in range(5):
-            entry = tk.Entry(self.main_frame)
-            entry.pack(pady=5)
-            self.entries.append(entry)
-            # Add searchable combo-box to select countries
-            SearchableComboBox(entry, self.countries, self.update_selected_countries)
-
-        # Add buttons for plotting Population, GDP, or Both
-        ttk.Button(self.main_frame, text="Plot Population", command=self.plot_population).pack(pady=5)
-        ttk.Button(self.main_frame, text="Plot GDP", command=self.plot_gdp).pack(pady=5)
-        ttk.Button(self.main_frame, text="Plot Both", command=self.plot_population_and_gdp).pack(pady=5)
-
-        # Create a Matplotlib figure and canvas to display plots
-        self.figure, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.main_frame)
-        self.canvas.get_tk_widget().pack(pady=10)
-
-    def update_selected_countries(self, _=None):
-        """Update the list of selected countries."""
-        self.selected_countries = [e.get() for e in self.entries if e.get()]
-
-    def plot_population(self):
-        """Plot population data for selected countries."""
-        self.ax.clear()
-        for country in self.selected_countries:
-            data = self.population_data.get(country, {})
-            if data:
-                years, populations = zip(*sorted(data.items()))
-                self.ax.plot(years, populations, marker='o', linestyle='-', label=f"{country} Population", color='blue')
-
-        self.ax.set_title("Population Growth")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("Population")
-        self.ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-        self.ax.legend()
-        self.canvas.draw()
-
-    def plot_gdp(self):
-        """Plot GDP data for selected countries."""
-        self.ax.clear()
-        for country in self.selected_countries:
-            # Assuming you have a structure for GDP data for the selected country
-            data = self.gdp_data.get(country, {})
-            if data:
-                years, gdps = zip(*sorted(data.items()))
-                self.ax.plot(years, gdps, marker='x', linestyle='--', label=f"{country} GDP", color='green')
-
-        self.ax.set_title("GDP Over Time")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("GDP (USD)")
-        self.ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-        self.ax.legend()
-        self.canvas.draw()
-
-    def plot_population_and_gdp(self):
-        """Plot both Population and GDP on the same graph with dual Y-axes."""
-        self.ax.clear()
-        self.ax2 = self.ax.twinx()  # Create secondary Y-axis for GDP
-
-        for country in self.selected_countries:
-            # Plot Population data
-            pop_data = self.population_data.get(country, {})
-            if pop_data:
-                pop_years, populations = zip(*sorted(pop_data.items()))
-                self.ax.plot(pop_years, populations, marker='o', linestyle='-', label=f"{country} Population", color='blue')
-
-            # Plot GDP data
-            gdp_data = self.gdp_data.get(country, {})
-            if gdp_data:
-                gdp_years, gdps = zip(*sorted(gdp_data.items()))
-                self.ax2.plot(gdp_years, gdps, marker='x', linestyle='--', label=f"{country} GDP", color='green')
-
-        # Labels and titles for both Y-axes
-        self.ax.set_title("Population and GDP Trends")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("Population", color='blue')
-        self.ax2.set_ylabel("GDP (USD)", color='green')
-
-        # Formatting Y-axes for commas
-        self.ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-        self.ax2.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
-
-        # Legends for both axes
-        self.ax.legend(loc="upper left")
-        self.ax2.legend(loc="upper right")
-
-        self.canvas.draw()
-
+        # ✅ Only changed lines are touched; the canvas redraws once via draw_idle
+        lines = charts.population_and_gdp_lines(self.panel, self.selected_countries)
+        self.plots.show(lines, **charts.POPULATION_AND_GDP_CHART)
 
 
 # ✅ Alias GDPApp to PopulationApp to keep both buttons working
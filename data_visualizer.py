@@ -1,32 +1,54 @@
 import tkinter as tk
 from tkinter import ttk
-import csv
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from country_catalog import country_catalog
+from dataset_locator import find_dataset
+from figures import embed_figure
+from dataset_registry import Dataset, read_wide_csv, registry
+from exporter import ask_and_export
+from loader_service import loader_service
+from perf import attach_overlay, timed
+from plot_manager import LineSpec, PlotManager
+from search_index import IncrementalSearch, SearchIndex
 
 class SearchableComboBox:
+    DEBOUNCE_MS = 120
+    MAX_RESULTS = 200
+
     def __init__(self, entry_widget, options, on_select_callback):
-        self.options = options
         self.entry = entry_widget
         self.on_select_callback = on_select_callback
+        self._pending = None
         self.listbox = tk.Listbox(self.entry.master, height=5, width=30)
         self.listbox.bind("<<ListboxSelect>>", self.on_select)
         self.entry.bind("<KeyRelease>", self.on_entry_key)
         self.entry.bind("<FocusIn>", self.show_dropdown)
-        for option in self.options:
-            self.listbox.insert(tk.END, option)
+        self.set_options(options)
+
+    @timed
+    def set_options(self, options):
+        self.index = options if isinstance(options, SearchIndex) else SearchIndex(options)
+        self.options = self.index.options
+        self.search = IncrementalSearch(self.index, prefix=True)
+        self.show_matches(self.search.search(""))
+
+    @timed
+    def show_matches(self, ids):
+        self.listbox.delete(0, tk.END)
+        labels = self.index.labels(ids, self.MAX_RESULTS)
+        if labels:
+            self.listbox.insert(tk.END, *labels)
 
     def on_entry_key(self, event):
+        if self._pending is not None:
+            self.entry.after_cancel(self._pending)
+        self._pending = self.entry.after(self.DEBOUNCE_MS, self.update_matches)
+
+    @timed
+    def update_matches(self):
+        self._pending = None
         typed_value = self.entry.get().strip().lower()
-        self.listbox.delete(0, tk.END)
-        if not typed_value:
-            for option in self.options:
-                self.listbox.insert(tk.END, option)
-        else:
-            filtered_options = [option for option in self.options if option.lower().startswith(typed_value)]
-            for option in filtered_options:
-                self.listbox.insert(tk.END, option)
+        self.show_matches(self.search.search(typed_value))
         self.show_dropdown()
 
     def on_select(self, event):
@@ -45,75 +67,101 @@ class SearchableComboBox:
     def hide_dropdown(self, event=None):
         self.listbox.place_forget()
 
+def read_world_gdp_csv(path):
+    return read_wide_csv(path, 'Country')
+
 class GDPApp:
     def __init__(self, root):
         self.root = root
         self.root.title("GDP Trends")
         self.main_frame = ttk.Frame(self.root, padding="10")
         self.main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        self.file_path = self.find_csv_file(os.getcwd())
-        self.countries, self.gdp_data = self.read_csv_data()
+        self.file_path = None
+        self.countries, self.gdp_data = [], Dataset.empty()
         self.selected_countries = []
         self.create_widgets()
+        self.overlay = attach_overlay(self.root)
+        self.load_task = loader_service.submit(self.load_gdp, description="GDP")
+        loader_service.watch(self.root, self.load_task, self.on_data_loaded, on_error=self.on_load_error,
+                             on_progress=self.show_progress)
 
+    @timed
+    def load_gdp(self, task):
+        task.report(message="Locating world_gdp.csv")
+        file_path = self.find_csv_file(os.getcwd())
+        task.check_cancelled()
+        task.report(message="Reading GDP")
+        return file_path, self.read_csv_data(file_path)
+
+    def show_progress(self, task):
+        self.status_label.config(text=task.progress_text())
+
+    @timed
+    def on_data_loaded(self, result):
+        self.file_path, (self.countries, self.gdp_data) = result
+        # Shared catalog: every GDP window over the same file reuses one SearchIndex
+        catalog = country_catalog(self.gdp_data)
+        for combo in self.combos:
+            combo.set_options(catalog.search_index)
+        self.status_label.config(text=f"{len(self.countries)} countries loaded")
+
+    def on_load_error(self, exc):
+        self.status_label.config(text=f"Could not load data: {exc}")
+
+    @timed
     def find_csv_file(self, root_folder, filename="world_gdp.csv"):
-        for dirpath, _, filenames in os.walk(root_folder):
-            if filename in filenames:
-                return os.path.join(dirpath, filename)
-        return None
+        return find_dataset(filename, root_folder)
 
-    def read_csv_data(self):
-        if not self.file_path:
+    @timed
+    def read_csv_data(self, file_path):
+        if not file_path:
             print("CSV file not found!")
-            return [], {}
-        countries = []
-        gdp_data = {}
-        with open(self.file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                country = row['Country']
-                countries.append(country)
-                gdp_data[country] = {
-                    year: float(row[year]) for year in row.keys() if year.isdigit() and row[year]
-                }
-        return countries, gdp_data
+            return [], Dataset.empty()
+        gdp_data = registry.get(file_path, read_world_gdp_csv)
+        return gdp_data.names, gdp_data
 
     def create_widgets(self):
         ttk.Label(self.main_frame, text="Select up to 5 Countries:").grid(row=0, column=0, pady=5)
         self.country_entries = []
+        self.combos = []
         for i in range(5):
             entry = tk.Entry(self.main_frame)
             entry.grid(row=i+1, column=0, pady=5)
             self.country_entries.append(entry)
-            SearchableComboBox(entry, self.countries, self.update_selected_countries)
+            self.combos.append(SearchableComboBox(entry, self.countries, self.update_selected_countries))
         plot_button = ttk.Button(self.main_frame, text="Plot GDP Trend", command=self.plot_gdp)
         plot_button.grid(row=6, column=0, pady=10)
-        self.figure, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.main_frame)
-        self.canvas.get_tk_widget().grid(row=7, column=0, pady=10)
+        ttk.Button(self.main_frame, text="Export...", command=self.export).grid(row=9, column=0, pady=5)
+        self.status_label = ttk.Label(self.main_frame, text="Loading data...")
+        self.status_label.grid(row=7, column=0)
+        self.figure, self.ax, self.canvas = embed_figure(self.main_frame, figsize=(6, 4))
+        self.canvas.get_tk_widget().grid(row=8, column=0, pady=10)
+        self.ax.grid(True)
+        self.plots = PlotManager(self.ax, self.canvas, number_format=None)
 
     def update_selected_countries(self, country):
         self.selected_countries = [entry.get() for entry in self.country_entries if entry.get()]
 
+    def export(self):
+        """Save the chart or its series in the background (format from the file extension)."""
+        ask_and_export(self.root, self.status_label, figure=self.figure, plots=self.plots)
+
+    @timed
     def plot_gdp(self):
         if not self.selected_countries:
             print("No countries selected!")
             return
-        self.ax.clear()
-        for country in self.selected_countries:
-            if country not in self.gdp_data:
+        lines = []
+        for i, country in enumerate(self.selected_countries):
+            series = self.gdp_data.series(country)
+            if series is None:
                 print(f"Data not found for {country}.")
                 continue
-            data = self.gdp_data[country]
-            years = sorted(map(int, data.keys()))
-            gdp_values = [data[str(year)] for year in years]
-            self.ax.plot(years, gdp_values, marker='o', linestyle='-', label=country)
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("GDP in Trillions USD")
-        self.ax.set_title("GDP Growth of Selected Countries")
-        self.ax.legend()
-        self.ax.grid(True)
-        self.canvas.draw()
+            years, gdp_values = series
+            lines.append(LineSpec(country, years, gdp_values, source=self.gdp_data,
+                                  marker='o', linestyle='-', label=country, color=f"C{i}"))
+        self.plots.show(lines, title="GDP Growth of Selected Countries", xlabel="Year",
+                        ylabel="GDP in Trillions USD")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from dataset_locator import default_cache_dir
+
+# Bump when the on-disk layout changes so stale caches are ignored.
+CACHE_VERSION = 2
+SIDECAR_DIR = ".gda_cache"
+META_KEYS = ("stamp", "size", "hash", "layout", "arrays", "names", "codes")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_dirs(path):
+    """Sidecar directory next to the source first, then the per-user cache dir."""
+    fallback = hashlib.blake2b(os.path.dirname(path).encode("utf-8"), digest_size=8).hexdigest()
+    return [os.path.join(os.path.dirname(path), SIDECAR_DIR), os.path.join(default_cache_dir(), "datasets", fallback)]
+
+
+def _meta_name(path, key):
+    return f"{os.path.basename(path)}.{key}.json"
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as handle:
+            meta = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    # A header from another version, or one that is not ours at all, counts as a miss.
+    if not isinstance(meta, dict) or meta.get("version") != CACHE_VERSION or any(key not in meta for key in META_KEYS):
+        return None
+    return meta
+
+
+def _read_meta(path, key):
+    for directory in _cache_dirs(path):
+        meta = _load_meta(os.path.join(directory, _meta_name(path, key)))
+        if meta is not None:
+            return directory, meta
+    return None, None
+
+
+def read(path, key):
+    """Return the cached parts of a parsed file, memory-mapped, or None on a miss.
+
+    The header stores the source size/mtime and content hash. A matching
+    size/mtime is trusted as-is; otherwise the file is re-hashed, so a file
+    that was only touched keeps its cache.
+    """
+    path = os.path.abspath(path)
+    directory, meta = _read_meta(path, key)
+    if meta is None:
+        return None
+    stamp = _stamp(path)
+    if meta["stamp"] != stamp:
+        if meta["size"] != stamp[0] or meta["hash"] != file_digest(path):
+            return None
+        meta["stamp"] = stamp
+        try:
+            _write_json(os.path.join(directory, _meta_name(path, key)), meta)
+        except OSError:
+            pass
+    try:
+        arrays = {name: np.load(os.path.join(directory, filename), mmap_mode="r")
+                  for name, filename in meta["arrays"].items()}
+    except (OSError, ValueError):
+        return None
+    return {"layout": meta["layout"], "names": meta["names"], "codes": meta["codes"], "arrays": arrays}
+
+
+def _write_json(target, data):
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+    os.replace(tmp_path, target)
+
+
+def _save_array(target, array):
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        np.save(handle, np.ascontiguousarray(array))
+    os.replace(tmp_path, target)
+
+
+def write(path, key, dataset):
+    """Write dataset.cache_arrays() and its string table next to the source (best effort).
+
+    Array files carry the content hash in their names and the header is
+    replaced last, so readers in other processes always see a consistent
+    set, and pages of an older mapping stay valid until it is closed.
+    """
+    path = os.path.abspath(path)
+    try:
+        stamp = _stamp(path)
+        digest = file_digest(path)
+    except OSError:
+        return False
+    base = f"{os.path.basename(path)}.{key}.{digest}"
+    arrays = dataset.cache_arrays()
+    meta = {
+        "version": CACHE_VERSION,
+        "source": path,
+        "stamp": stamp,
+        "size": stamp[0],
+        "hash": digest,
+        "layout": dataset.layout,
+        "arrays": {name: f"{base}.{name}.npy" for name in arrays},
+        "names": list(dataset.names),
+        "codes": list(dataset.codes),
+    }
+    for directory in _cache_dirs(path):
+        try:
+            os.makedirs(directory, exist_ok=True)
+            meta_path = os.path.join(directory, _meta_name(path, key))
+            old_meta = _load_meta(meta_path)
+            for name, array in arrays.items():
+                _save_array(os.path.join(directory, meta["arrays"][name]), array)
+            _write_json(meta_path, meta)
+        except OSError:
+            continue
+        if old_meta and old_meta.get("hash") != digest:
+            for filename in old_meta.get("arrays", {}).values():
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass
+        return True
+    return False
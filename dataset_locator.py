@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+
+# Extra data directories, separated like PATH (checked before the working directory).
+DATA_ROOTS_ENV = "GDA_DATA_ROOTS"
+CACHE_DIR_ENV = "GDA_CACHE_DIR"
+
+SKIP_DIRS = {".git", "__pycache__", "node_modules", "venv", ".venv", ".tox", ".mypy_cache", ".pytest_cache"}
+# Seconds a filename that was not found anywhere is answered from memory
+# instead of walking the tree again (unless the index or roots change first).
+MISS_TTL = 30.0
+
+
+def default_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "global_data_analyzer")
+
+
+def default_roots():
+    """Configured data roots, then the app directory, then the working directory."""
+    roots = [path for path in os.environ.get(DATA_ROOTS_ENV, "").split(os.pathsep) if path]
+    roots.append(os.path.dirname(os.path.abspath(__file__)))
+    roots.append(os.getcwd())
+    return roots
+
+
+class DatasetLocator:
+    """Finds dataset files by name through a persistent filename -> path index.
+
+    Each scanned directory is stored with its mtime, file names and
+    subdirectories; a refresh only re-lists directories whose mtime changed,
+    and the walk never goes deeper than max_depth below a root. A miss is
+    remembered for MISS_TTL seconds against the index generation, so a
+    missing file looked up on every redraw costs one walk, not one each.
+    """
+
+    def __init__(self, roots=None, max_depth=4, index_path=None):
+        self.roots = []
+        self._generation = 0
+        for root in roots if roots is not None else default_roots():
+            self.add_root(root)
+        self.max_depth = max_depth
+        self.index_path = index_path or os.path.join(default_cache_dir(), "dataset_index.json")
+        self._dirs = {}
+        self._files = {}
+        self._misses = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._load_index()
+
+    def add_root(self, root):
+        root = os.path.abspath(root)
+        if root not in self.roots:
+            self.roots.append(root)
+            self._generation += 1
+        return root
+
+    def _under_roots(self, path):
+        return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in self.roots)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            self._dirs = {path: (entry[0], entry[1], entry[2]) for path, entry in data.get("dirs", {}).items()}
+            self._files = dict(data.get("files", {}))
+        except (OSError, ValueError, TypeError, IndexError):
+            self._dirs, self._files = {}, {}
+
+    def _save_index(self):
+        data = {"dirs": {path: list(entry) for path, entry in self._dirs.items()}, "files": self._files}
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(data, handle)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            pass
+
+    def _scan_dir(self, path):
+        """Return (mtime, files, subdirs) for a directory, reusing the index when unchanged."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        entry = self._dirs.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            if item.name not in SKIP_DIRS and not item.name.startswith("."):
+                                subdirs.append(item.name)
+                        elif item.is_file():
+                            files.append(item.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        entry = (mtime, sorted(files), sorted(subdirs))
+        self._dirs[path] = entry
+        return entry
+
+    def refresh(self):
+        """Rebuild the filename index, breadth-first so shallower matches win."""
+        with self._lock:
+            before = ({path: entry[0] for path, entry in self._dirs.items()}, dict(self._files))
+            files = {}
+            seen = set()
+            for root in self.roots:
+                level = [root]
+                for _ in range(self.max_depth + 1):
+                    next_level = []
+                    for path in level:
+                        if path in seen:
+                            continue
+                        seen.add(path)
+                        entry = self._scan_dir(path)
+                        if entry is None:
+                            continue
+                        _, names, subdirs = entry
+                        for name in names:
+                            files.setdefault(name, os.path.join(path, name))
+                        next_level.extend(os.path.join(path, sub) for sub in subdirs)
+                    level = next_level
+                    if not level:
+                        break
+            # Forget directories that disappeared or fell outside the walk.
+            self._dirs = {path: entry for path, entry in self._dirs.items() if path in seen}
+            self._files = files
+            if before != ({path: entry[0] for path, entry in self._dirs.items()}, self._files):
+                self._generation += 1
+                self._save_index()
+
+    def build_in_background(self):
+        """Start refreshing the index on a daemon thread (no-op if one is running)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.refresh, name="dataset-locator", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _lookup(self, filename):
+        path = self._files.get(filename)
+        if path and self._under_roots(path) and os.path.isfile(path):
+            return path
+        return None
+
+    def find(self, filename, root_folder=None):
+        """Return the path of filename, or None if it is not under any data root."""
+        if root_folder is not None:
+            self.add_root(root_folder)
+        # Cheap checks first: the file sitting directly in a root, then the index.
+        for root in self.roots:
+            candidate = os.path.join(root, filename)
+            if os.path.isfile(candidate):
+                return candidate
+        path = self._lookup(filename)
+        if path is not None:
+            return path
+        miss = self._misses.get(filename)
+        if miss is not None and miss[0] == self._generation and time.monotonic() - miss[1] < MISS_TTL:
+            return None
+        self.refresh()
+        path = self._lookup(filename)
+        if path is None:
+            self._misses[filename] = (self._generation, time.monotonic())
+        else:
+            self._misses.pop(filename, None)
+        return path
+
+
+# Process-wide locator shared by every window.
+locator = DatasetLocator()
+
+
+def find_dataset(filename, root_folder=None):
+    return locator.find(filename, root_folder)
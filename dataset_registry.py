@@ -0,0 +1,368 @@
+import csv
+import os
+import re
+import threading
+
+import numpy as np
+
+import dataset_cache
+
+
+class Dataset:
+    """Read-only columnar view of an indicator table (countries x years)."""
+
+    layout = "wide"
+
+    def __init__(self, names, years, values, codes=None, source=None):
+        self.names = tuple(names)
+        self.codes = tuple(codes) if codes is not None else ()
+        self.source = source
+
+        self.years = np.asarray(years, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64).reshape(len(self.names), len(self.years))
+        self.years.setflags(write=False)
+        self.values.setflags(write=False)
+
+        self.index = {}
+        for row, name in enumerate(self.names):
+            self.index.setdefault(name, row)
+        self.year_index = {int(year): col for col, year in enumerate(self.years)}
+
+    @classmethod
+    def empty(cls, source=None):
+        return Dataset([], [], np.empty((0, 0)), source=source)
+
+    def cache_arrays(self):
+        """Arrays dataset_cache should store for this layout."""
+        return {"years": self.years, "values": self.values}
+
+    @classmethod
+    def from_cache(cls, names, codes, arrays, source=None):
+        years, values = arrays["years"], arrays["values"]
+        if values.shape != (len(names), len(years)):
+            raise ValueError("cached matrix does not match its string table")
+        return cls(names, years, values, codes=codes or None, source=source)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def row(self, name):
+        """Return the full (NaN-padded) value row for a country, or None."""
+        row = self.index.get(name)
+        if row is None:
+            return None
+        return self.values[row]
+
+    def series(self, name):
+        """Return (years, values) with missing years dropped, or None if there is no data."""
+        values = self.row(name)
+        if values is None:
+            return None
+        present = ~np.isnan(values)
+        if not present.any():
+            return None
+        return self.years[present], values[present]
+
+    def column(self, year):
+        """Return every country's value for one year, or None if the year is not in the table."""
+        col = self.year_index.get(int(year))
+        if col is None:
+            return None
+        return self.values[:, col]
+
+    def value(self, name, year):
+        """Return a single value, or NaN when the country or year is unknown."""
+        row = self.index.get(name)
+        col = self.year_index.get(int(year))
+        if row is None or col is None:
+            return np.nan
+        return self.values[row, col]
+
+
+class LongDataset(Dataset):
+    """Long-format (entity, year, value) table kept sorted by entity, then year.
+
+    Each entity's observations are one contiguous slice of the flat arrays,
+    located through ``offsets``, so series() is an O(1) slice. The
+    countries x years matrix other code expects is pivoted lazily.
+    """
+
+    layout = "long"
+
+    def __init__(self, names, flat_years, flat_values, offsets, codes=None, source=None):
+        self.names = tuple(names)
+        self.codes = tuple(codes) if codes is not None else ()
+        self.source = source
+        self.flat_years = np.asarray(flat_years, dtype=np.int64)
+        self.flat_values = np.asarray(flat_values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if len(self.offsets) != len(self.names) + 1 or len(self.flat_years) != len(self.flat_values):
+            raise ValueError("long table offsets do not match its rows")
+        for array in (self.flat_years, self.flat_values, self.offsets):
+            array.setflags(write=False)
+
+        self.index = {}
+        for row, name in enumerate(self.names):
+            self.index.setdefault(name, row)
+        self.years = np.unique(self.flat_years)
+        self.years.setflags(write=False)
+        self.year_index = {int(year): col for col, year in enumerate(self.years)}
+        self._values = None
+
+    @property
+    def values(self):
+        if self._values is None:
+            grid = np.full((len(self.names), len(self.years)), np.nan)
+            rows = np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+            grid[rows, np.searchsorted(self.years, self.flat_years)] = self.flat_values
+            grid.setflags(write=False)
+            self._values = grid
+        return self._values
+
+    def series(self, name):
+        row = self.index.get(name)
+        if row is None:
+            return None
+        start, stop = self.offsets[row], self.offsets[row + 1]
+        if start == stop:
+            return None
+        return self.flat_years[start:stop], self.flat_values[start:stop]
+
+    def cache_arrays(self):
+        return {"years": self.flat_years, "values": self.flat_values, "offsets": self.offsets}
+
+    @classmethod
+    def from_cache(cls, names, codes, arrays, source=None):
+        return cls(names, arrays["years"], arrays["values"], arrays["offsets"], codes=codes or None, source=source)
+
+
+LAYOUTS = {Dataset.layout: Dataset, LongDataset.layout: LongDataset}
+
+# Column names recognised when a file's layout has to be detected.
+NAME_COLUMNS = ('Country Name', 'Country/Territory', 'Country', 'Entity', 'Name')
+CODE_COLUMNS = ('Code', 'Country Code', 'CCA3', 'ISO3')
+YEAR_COLUMNS = ('Year', 'year', 'YEAR')
+WIDE_YEAR_PATTERN = r"^(\d{4})(?:\s.*)?$"
+
+
+def read_csv_header(path):
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return next(csv.reader(csvfile), [])
+
+
+def read_wide_csv(path, name_column, year_pattern=r"^(\d{4})$", code_column=None):
+    """Parse a wide CSV (one row per country, one column per year) into a Dataset.
+
+    Only the name, code and year columns are handed to pandas' C parser, so
+    trailing junk such as gdp.csv's 'Unnamed: 65' never gets read, and the
+    year block comes back as a single float64 matrix (NaN for blanks).
+    """
+    import pandas as pd
+
+    year_re = re.compile(year_pattern)
+    header = read_csv_header(path)
+    year_cols = sorted((int(match.group(1)), title) for title in header for match in [year_re.match(title)] if match)
+    year_titles = [title for _, title in year_cols]
+    label_cols = [name_column] + ([code_column] if code_column in header else [])
+
+    read_kwargs = dict(
+        usecols=label_cols + year_titles,
+        encoding='utf-8',
+        thousands=',',
+        keep_default_na=False,
+        na_values={title: [''] for title in year_titles},
+    )
+    dtypes = dict.fromkeys(label_cols, str)
+    dtypes.update(dict.fromkeys(year_titles, 'float64'))
+    try:
+        frame = pd.read_csv(path, dtype=dtypes, **read_kwargs)
+        values = frame[year_titles].to_numpy(dtype=np.float64)
+    except ValueError:
+        # Non-numeric markers ('..', 'n/a') in a year column: coerce column by column.
+        frame = pd.read_csv(path, dtype=str, **read_kwargs)
+        values = np.column_stack([
+            pd.to_numeric(frame[title].str.replace(',', '', regex=False), errors='coerce').to_numpy(dtype=np.float64)
+            for title in year_titles
+        ]) if year_titles else np.empty((len(frame), 0))
+
+    names = frame[name_column].tolist()
+    codes = frame[code_column].tolist() if code_column in frame else None
+    years = [year for year, _ in year_cols]
+    return Dataset(names, years, values, codes=codes, source=path)
+
+
+def read_long_csv(path, entity_column, year_column, value_column, code_column=None):
+    """Parse a long CSV (one row per entity and year) in one pass into a LongDataset.
+
+    Rows are factorized by entity, missing values dropped, and the flat
+    arrays stably sorted by (entity, year) unless they already are.
+    """
+    import pandas as pd
+
+    label_cols = [entity_column] + ([code_column] if code_column else [])
+    frame = pd.read_csv(path, usecols=label_cols + [year_column, value_column], encoding='utf-8',
+                        dtype=dict.fromkeys(label_cols, str), keep_default_na=False,
+                        na_values={value_column: [''], year_column: ['']})
+    entity_ids, names = pd.factorize(frame[entity_column], sort=False)
+    years = pd.to_numeric(frame[year_column], errors='coerce').to_numpy(dtype=np.float64)
+    values = pd.to_numeric(frame[value_column], errors='coerce').to_numpy(dtype=np.float64)
+    keep = ~np.isnan(years) & ~np.isnan(values)
+    entity_ids, years, values = entity_ids[keep], years[keep].astype(np.int64), values[keep]
+
+    # Exports are usually already grouped and sorted; only sort when they are not.
+    if len(entity_ids) > 1:
+        step_entity = np.diff(entity_ids)
+        if (step_entity < 0).any() or ((step_entity == 0) & (np.diff(years) < 0)).any():
+            order = np.lexsort((years, entity_ids))
+            entity_ids, years, values = entity_ids[order], years[order], values[order]
+    offsets = np.searchsorted(entity_ids, np.arange(len(names) + 1))
+
+    codes = None
+    if code_column:
+        first_rows = pd.Series(frame[code_column].to_numpy()).groupby(frame[entity_column].to_numpy(), sort=False).first()
+        codes = [first_rows.get(name, "") for name in names]
+    return LongDataset(list(names), years, values, offsets, codes=codes, source=path)
+
+
+def detect_layout(header, value_column=None):
+    """Work out how a CSV is laid out from its header.
+
+    Returns a dict of read_wide_csv / read_long_csv keyword arguments plus
+    'layout' ('wide' or 'long'), or None if the header fits neither.
+    """
+    year_re = re.compile(WIDE_YEAR_PATTERN)
+    year_titles = [title for title in header if year_re.match(title)]
+    name_column = next((col for col in NAME_COLUMNS if col in header), None)
+    code_column = next((col for col in CODE_COLUMNS if col in header), None)
+    year_column = next((col for col in YEAR_COLUMNS if col in header), None)
+
+    if len(year_titles) >= 2:
+        suffixes = {year_re.match(title).group(0)[4:] for title in year_titles}
+        suffix = re.escape(suffixes.pop()) if len(suffixes) == 1 else r"(?:\s.*)?"
+        name_column = name_column or next((col for col in header if col not in year_titles), None)
+        if name_column is None:
+            return None
+        return {"layout": "wide", "name_column": name_column, "code_column": code_column,
+                "year_pattern": rf"^(\d{{4}}){suffix}$"}
+
+    if year_column is not None:
+        others = [col for col in header if col not in (year_column, code_column)]
+        entity_column = name_column or (others[0] if others else None)
+        values = [col for col in others if col != entity_column]
+        value_column = value_column if value_column in values else (values[0] if values else None)
+        if entity_column is None or value_column is None:
+            return None
+        return {"layout": "long", "entity_column": entity_column, "year_column": year_column,
+                "value_column": value_column, "code_column": code_column}
+    return None
+
+
+def read_indicator_csv(path, value_column=None):
+    """Read any wide or long indicator CSV, detecting the layout from the header."""
+    layout = detect_layout(read_csv_header(path), value_column=value_column)
+    if layout is None:
+        raise ValueError(f"{os.path.basename(path)}: no year columns and no 'Year' column found")
+    kind = layout.pop("layout")
+    if kind == "wide":
+        return read_wide_csv(path, **layout)
+    return read_long_csv(path, **layout)
+
+
+def read_population_csv(path):
+    """world_population.csv: 'Country/Territory' plus 'YYYY Population' columns."""
+    return read_wide_csv(path, 'Country/Territory', r"^(\d{4}) Population$", code_column='CCA3')
+
+
+def read_gdp_csv(path):
+    """gdp.csv: 'Country Name', 'Code' and one column per year."""
+    return read_wide_csv(path, 'Country Name', code_column='Code')
+
+
+def read_life_expectancy_csv(path):
+    """Life expectancy.csv: long 'Entity,Year,Life expectancy' rows."""
+    return read_indicator_csv(path, value_column='Life expectancy')
+
+
+class DatasetRegistry:
+    """Loads each file once per process and hands out the shared Dataset.
+
+    Entries are keyed by (absolute path, loader) and reloaded when the file's
+    mtime or size changes, so edited files are picked up on the next request.
+    Parsed tables also go through dataset_cache, so later processes map the
+    binary sidecar instead of re-tokenizing the CSV.
+    """
+
+    def __init__(self, disk_cache=True):
+        self.disk_cache = disk_cache
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, path, loader):
+        path = os.path.abspath(path)
+        key = (path, loader)
+        with self._key_lock(key):
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+            dataset = self._load(path, loader)
+            self._entries[key] = (stamp, dataset)
+            return dataset
+
+    def _load(self, path, loader):
+        """Memory-map the binary sidecar cache if it is current, else parse and write it."""
+        if not self.disk_cache:
+            return loader(path)
+        cache_key = f"{loader.__module__}.{loader.__qualname__}"
+        parts = dataset_cache.read(path, cache_key)
+        if parts is not None and parts["layout"] in LAYOUTS:
+            try:
+                return LAYOUTS[parts["layout"]].from_cache(parts["names"], parts["codes"], parts["arrays"],
+                                                           source=path)
+            except (KeyError, ValueError):
+                pass
+        dataset = loader(path)
+        dataset_cache.write(path, cache_key, dataset)
+        return dataset
+
+    def invalidate(self, path=None):
+        """Drop cached entries for one file, or everything when path is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = os.path.abspath(path)
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide registry shared by every window.
+registry = DatasetRegistry()
+
+
+def load_population(path):
+    return registry.get(path, read_population_csv)
+
+
+def load_gdp(path):
+    return registry.get(path, read_gdp_csv)
+
+
+def load_life_expectancy(path):
+    return registry.get(path, read_life_expectancy_csv)
+
+
+def load_indicator(path):
+    return registry.get(path, read_indicator_csv)
@@ -1,6 +1,19 @@
+import os
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import pandas as pd
+from chunked_reader import ExcelRowIndex, open_row_index
+from loader_service import loader_service
+from exporter import ask_and_export
+from perf import attach_overlay, timed
+from query_engine import QueryEngine, QueryError, run_chunked
+from virtual_table import DataFrameSource, VirtualTable
+
+CSV_CHUNK_ROWS = 50_000
+# Files at least this big open in streaming mode instead of being read whole.
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+# Queries on a streamed file keep only the rows their filter matches, up to this many.
+STREAMING_QUERY_MAX_ROWS = 1_000_000
 
 def open_dataset(parent):
     # Open file dialog to select a dataset
@@ -9,33 +22,185 @@ def open_dataset(parent):
     if file_path:
         display_dataset(parent, file_path)
 
-def display_dataset(parent, file_path):
+@timed
+def read_dataset(file_path, task):
+    # Runs on the loader thread: read in chunks so progress and Cancel work
+    task.report(total_bytes=os.path.getsize(file_path), message="Reading")
+    if file_path.endswith(".xlsx"):
+        df = pd.read_excel(file_path)
+        task.check_cancelled()
+        task.report(rows=len(df), bytes_read=task.total_bytes)
+        return df
+
+    chunks, rows = [], 0
+    with open(file_path, "rb") as handle:
+        for chunk in pd.read_csv(handle, chunksize=CSV_CHUNK_ROWS):
+            task.check_cancelled()
+            chunks.append(chunk)
+            rows += len(chunk)
+            task.report(rows=rows, bytes_read=handle.tell())
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.read_csv(file_path)
+
+@timed
+def run_query(engine, text, task):
+    # Runs on the loader thread; only the result's visible page is ever read into the table
+    task.report(message="Querying")
+    return engine.run(text)
+
+@timed
+def stream_query(file_path, text, columns, task):
+    # Runs on the loader thread: the file is scanned chunk by chunk and only matching rows are kept
+    task.report(total_bytes=os.path.getsize(file_path), message="Querying")
+    with open(file_path, "rb") as handle:
+        def chunks():
+            rows = 0
+            for chunk in pd.read_csv(handle, chunksize=CSV_CHUNK_ROWS):
+                task.check_cancelled()
+                yield chunk
+                rows += len(chunk)
+                task.report(rows=rows, bytes_read=handle.tell())
+        return run_chunked(chunks(), text, columns, max_rows=STREAMING_QUERY_MAX_ROWS)
+
+def add_query_bar(data_window, table, frame=None, index=None):
+    """Query entry above `table`: queries run on `frame`, or stream through a row index's CSV when too big to load.
+
+    For a CSV that is the file itself; an Excel sheet is queried through the
+    index's CSV spool, which is only complete once indexing has finished.
+    """
+    bar = ttk.Frame(data_window)
+    bar.pack(fill="x", before=table.frame)
+    ttk.Label(bar, text="Query:").pack(side="left", padx=(5, 2), pady=5)
+    entry = ttk.Entry(bar)
+    entry.pack(side="left", expand=True, fill="x", pady=5)
+    status = ttk.Label(bar, text="")
+    status.pack(side="right", padx=5)
+    state = {"source": table.source, "engine": QueryEngine(frame) if frame is not None else None}
+
+    def run(event=None):
+        text = entry.get().strip()
+        if not text:
+            clear()
+            return
+        if state["engine"] is None and isinstance(index, ExcelRowIndex) and not index.done:
+            status.config(text="Queries become available once the sheet is indexed")
+            return
+        status.config(text="Running...")
+        if state["engine"] is None:
+            task = loader_service.submit(stream_query, index.path, text, index.columns,
+                                         description=os.path.basename(index.path))
+        else:
+            task = loader_service.submit(run_query, state["engine"], text, description="query")
+        loader_service.watch(data_window, task, show, on_error=failed,
+                             on_progress=lambda t: status.config(text=t.progress_text()))
+
+    def show(result):
+        table.set_source(result)
+        status.config(text=f"{len(result):,} rows in {result.elapsed * 1000:.0f} ms")
+
+    def failed(exc):
+        status.config(text=str(exc) if isinstance(exc, QueryError) else f"Failed: {exc}")
+
+    def clear():
+        entry.delete(0, "end")
+        table.set_source(state["source"])
+        status.config(text="")
+
+    entry.bind("<Return>", run)
+    # Exports whatever the table shows: the query result, or the whole file when no query is applied
+    ttk.Button(bar, text="Export...", command=lambda: ask_and_export(data_window, status, source=table.source)).pack(
+        side="right", padx=2, pady=5)
+    ttk.Button(bar, text="Clear", command=clear).pack(side="right", pady=5)
+    ttk.Button(bar, text="Run", command=run).pack(side="right", padx=2, pady=5)
+    return bar
+
+@timed
+def display_dataset(parent, file_path, streaming=None):
+    if not file_path.endswith((".csv", ".xlsx")):
+        messagebox.showerror("Error", "Unsupported file format")
+        return
+
     # Create a new window to display the dataset
     data_window = tk.Toplevel(parent)  # Use the parent (main window)
     data_window.title("Dataset Viewer")
+    attach_overlay(data_window)
     data_window.geometry("800x500")
 
-    # Read the dataset (CSV or Excel)
-    if file_path.endswith(".csv"):
-        df = pd.read_csv(file_path)
-    elif file_path.endswith(".xlsx"):
-        df = pd.read_excel(file_path)
-    else:
-        messagebox.showerror("Error", "Unsupported file format")
+    # Loading state: the window opens right away and fills in when the data arrives
+    status_frame = ttk.Frame(data_window)
+    status_frame.pack(fill="x")
+    status = ttk.Label(status_frame, text="Loading...")
+    status.pack(side="left", padx=5, pady=5)
+
+    if streaming is None:
+        streaming = os.path.getsize(file_path) >= STREAMING_THRESHOLD_BYTES
+    if streaming:
+        display_streaming(data_window, status_frame, status, file_path)
         return
 
-    # Create Treeview widget to display the dataset in a table
-    tree = ttk.Treeview(data_window)
-    tree["columns"] = list(df.columns)
-    tree["show"] = "headings"
+    task = loader_service.submit(read_dataset, file_path, description=os.path.basename(file_path))
+
+    def cancel():
+        task.cancel()
+        status.config(text="Cancelled")
+        cancel_button.config(state="disabled")
+
+    def show(df):
+        status_frame.destroy()
+        # Virtual table: only the rows on screen ever become Treeview items
+        table = VirtualTable(data_window, DataFrameSource(df))
+        table.pack(expand=True, fill="both")
+        add_query_bar(data_window, table, frame=df)
+
+    def failed(exc):
+        status.config(text="Failed")
+        cancel_button.config(state="disabled")
+        messagebox.showerror("Error", f"Could not read {file_path}:\n{exc}", parent=data_window)
+
+    cancel_button = ttk.Button(status_frame, text="Cancel", command=cancel)
+    cancel_button.pack(side="right", padx=5, pady=5)
+    loader_service.watch(data_window, task, show, on_error=failed,
+                         on_progress=lambda t: status.config(text=t.progress_text()))
+
+@timed
+def display_streaming(data_window, status_frame, status, file_path):
+    # Index row offsets in the background; the first page shows as soon as it is indexed
+    index = open_row_index(file_path)
+    task = loader_service.submit(index.build, description=os.path.basename(file_path))
+    view = {}
+
+    def update_table():
+        if "table" not in view and len(index):
+            view["table"] = VirtualTable(data_window, index)
+            view["table"].pack(expand=True, fill="both")
+            add_query_bar(data_window, view["table"], index=index)
+        elif "table" in view:
+            view["table"].refresh()
+
+    def progress(t):
+        update_table()
+        status.config(text=t.progress_text())
+
+    def done(_):
+        update_table()
+        status.config(text=f"{len(index):,} rows")
+        cancel_button.config(state="disabled")
+
+    def cancel():
+        task.cancel()
+        status.config(text=f"Indexing stopped at {len(index):,} rows")
+        cancel_button.config(state="disabled")
 
-    # Set column headers
-    for col in df.columns:
-        tree.heading(col, text=col)
-        tree.column(col, width=100)
+    def failed(exc):
+        status.config(text="Failed")
+        cancel_button.config(state="disabled")
+        messagebox.showerror("Error", f"Could not read {file_path}:\n{exc}", parent=data_window)
 
-    # Insert data into the treeview (table)
-    for _, row in df.iterrows():
-        tree.insert("", "end", values=list(row))
+    def closed(event):
+        if event.widget is data_window:
+            task.cancel()
+            index.close()
 
-    tree.pack(expand=True, fill="both")
\ No newline at end of file
+    cancel_button = ttk.Button(status_frame, text="Stop indexing", command=cancel)
+    cancel_button.pack(side="right", padx=5, pady=5)
+    data_window.bind("<Destroy>", closed, add="+")
+    loader_service.watch(data_window, task, done, on_error=failed, on_progress=progress)
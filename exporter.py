@@ -0,0 +1,256 @@
+"""Exports that never block the Tk loop: figures to PNG/SVG/PDF, series and tables to CSV/Parquet.
+
+The caller snapshots on the Tk thread: a figure is pickled (a detached
+copy that the worker renders on its own Agg canvas), and table sources
+are read-only already, so only their current length is fixed. Encoding
+then runs on the loader service's threads, reporting progress on the
+LoadTask the window polls. Tables are written chunk by chunk straight
+from the source (DataFrame slices where the source has them), never
+as one intermediate copy, and land in a temporary file that replaces the
+target only when complete, so a cancelled export leaves nothing behind.
+
+Parquet needs pyarrow; without it the Parquet choice reports an error and
+everything else still works.
+"""
+import csv
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from loader_service import LoadTask, loader_service
+
+FIGURE_FORMATS = ("png", "svg", "pdf")
+TABLE_FORMATS = ("csv", "parquet")
+CHUNK_ROWS = 50_000
+FILETYPES = {
+    "png": ("PNG image", "*.png"),
+    "svg": ("SVG image", "*.svg"),
+    "pdf": ("PDF document", "*.pdf"),
+    "csv": ("CSV table", "*.csv"),
+    "parquet": ("Parquet table", "*.parquet"),
+}
+
+
+class ExportError(Exception):
+    """An export that cannot be done (unknown format, missing optional dependency)."""
+
+
+def export_format(path, allowed=FIGURE_FORMATS + TABLE_FORMATS):
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    if fmt not in allowed:
+        raise ExportError(f"cannot export .{fmt or '?'} files (use {', '.join('.' + f for f in allowed)})")
+    return fmt
+
+
+class SeriesSource:
+    """The lines of a chart as a long table (series, year, value), in the row-source protocol."""
+
+    columns = ["series", "year", "value"]
+
+    def __init__(self, series):
+        # The plot's own arrays, not copies: they are never written to, and rows() slices them a chunk at a time.
+        self.series = [(label, np.asarray(x), np.asarray(y)) for label, x, y in series]
+        self._starts = []
+        total = 0
+        for _, x, _ in self.series:
+            self._starts.append(total)
+            total += len(x)
+        self._total = total
+
+    def __len__(self):
+        return self._total
+
+    def rows(self, start, stop):
+        rows = []
+        for (label, x, y), first in zip(self.series, self._starts):
+            lo, hi = max(start - first, 0), min(stop - first, len(x))
+            if lo < hi:
+                rows.extend((label, year, value) for year, value in zip(x[lo:hi].tolist(), y[lo:hi].tolist()))
+        return rows
+
+
+def snapshot_figure(figure):
+    """Detached copy of a figure, taken on the Tk thread (the canvas is not part of it)."""
+    return pickle.dumps(figure, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _temporary(path):
+    """A new, uniquely named file next to `path` (same filesystem, so os.replace is atomic)."""
+    handle, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".part",
+                                        dir=os.path.dirname(os.path.abspath(path)))
+    os.close(handle)
+    return tmp_path
+
+
+def write_figure(snapshot, path, dpi=None, task=None):
+    """Render a snapshot_figure() copy to PNG/SVG/PDF on its own Agg canvas."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fmt = export_format(path, FIGURE_FORMATS)
+    if task is not None:
+        task.report(message=f"Rendering {fmt.upper()}")
+    figure = pickle.loads(snapshot)
+    FigureCanvasAgg(figure)
+    tmp_path = _temporary(path)
+    try:
+        figure.savefig(tmp_path, format=fmt, dpi=dpi or figure.dpi)
+        if task is not None:
+            task.check_cancelled()
+        os.replace(tmp_path, path)
+    finally:
+        figure.clear()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _chunks(source, total, chunk_rows):
+    frame_rows = getattr(source, "frame_rows", None)
+    for start in range(0, total, chunk_rows):
+        stop = min(start + chunk_rows, total)
+        yield stop, (frame_rows(start, stop) if frame_rows is not None else source.rows(start, stop))
+
+
+def _write_csv(source, tmp_path, total, chunk_rows, task):
+    with open(tmp_path, "w", newline="", encoding="utf-8") as handle:
+        # One line ending for the header, list chunks and DataFrame chunks on every platform.
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(source.columns)
+        for written, chunk in _chunks(source, total, chunk_rows):
+            if isinstance(chunk, list):
+                writer.writerows(chunk)
+            else:
+                chunk.to_csv(handle, header=False, index=False, lineterminator="\n")
+            task.check_cancelled()
+            task.report(rows=written)
+
+
+def _write_parquet(source, tmp_path, total, chunk_rows, task):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)") from None
+    import pandas as pd
+
+    writer = schema = None
+    try:
+        # One row group per chunk; the first chunk fixes the schema for the rest.
+        for written, chunk in _chunks(source, total, chunk_rows):
+            frame = pd.DataFrame(chunk, columns=source.columns) if isinstance(chunk, list) else chunk
+            frame.columns = source.columns
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(table)
+            task.check_cancelled()
+            task.report(rows=written)
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(pd.DataFrame(columns=source.columns), preserve_index=False), tmp_path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_table(source, path, total=None, chunk_rows=CHUNK_ROWS, task=None):
+    """Stream rows [0, total) of a row source (DataFrameSource, QueryResult, CsvRowIndex, SeriesSource) to CSV/Parquet."""
+    fmt = export_format(path, TABLE_FORMATS)
+    task = task or LoadTask(os.path.basename(path))
+    total = len(source) if total is None else total
+    task.report(rows=0, total_rows=total, message=f"Writing {fmt.upper()}")
+    tmp_path = _temporary(path)
+    try:
+        (_write_csv if fmt == "csv" else _write_parquet)(source, tmp_path, total, chunk_rows, task)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def export_figure(widget, figure, path, dpi=None, on_done=None, on_error=None, on_progress=None):
+    """Snapshot `figure` now and render it to `path` in the background; returns the LoadTask."""
+    export_format(path, FIGURE_FORMATS)
+    task = loader_service.submit(write_figure, snapshot_figure(figure), path, dpi,
+                                 description=os.path.basename(path))
+    loader_service.watch(widget, task, on_done or (lambda _: None), on_error=on_error, on_progress=on_progress)
+    return task
+
+
+def export_table(widget, source, path, on_done=None, on_error=None, on_progress=None, chunk_rows=CHUNK_ROWS):
+    """Write the rows `source` has now to `path` in the background; returns the LoadTask."""
+    export_format(path, TABLE_FORMATS)
+    task = loader_service.submit(write_table, source, path, len(source), chunk_rows,
+                                 description=os.path.basename(path))
+    loader_service.watch(widget, task, on_done or (lambda _: None), on_error=on_error, on_progress=on_progress)
+    return task
+
+
+def ask_and_export(window, status, figure=None, plots=None, source=None, dpi=300):
+    """Save dialog for a window's chart and/or data; the format follows the chosen extension.
+
+    Figures go out at `dpi`; CSV/Parquet writes `source` if given, otherwise
+    the lines currently on `plots`. While the export runs a small dialog
+    shows its progress and offers Cancel; the outcome goes to the `status`
+    label.
+    """
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+
+    formats = (FIGURE_FORMATS if figure is not None else ()) + TABLE_FORMATS
+    path = filedialog.asksaveasfilename(parent=window, title="Export", defaultextension=f".{formats[0]}",
+                                        filetypes=[FILETYPES[fmt] for fmt in formats])
+    if not path:
+        return None
+    name = os.path.basename(path)
+    view = {}
+
+    def close():
+        dialog = view.get("dialog")
+        view.clear()
+        if dialog is not None:
+            dialog.destroy()
+
+    def done(result):
+        close()
+        status.config(text=f"Exported {os.path.basename(result)}")
+
+    def failed(exc):
+        close()
+        status.config(text="Export failed")
+        messagebox.showerror("Export", f"Could not export {name}:\n{exc}", parent=window)
+
+    def progress(task):
+        status.config(text=task.progress_text())
+        if "label" in view:
+            view["label"].config(text=f"Exporting {name}\n{task.progress_text()}")
+
+    def cancel():
+        # The worker stops at its next check and removes the partial file; a cancelled task calls nothing back.
+        task.cancel()
+        close()
+        status.config(text="Export cancelled")
+
+    try:
+        if export_format(path, formats) in FIGURE_FORMATS:
+            task = export_figure(window, figure, path, dpi=dpi, on_done=done, on_error=failed, on_progress=progress)
+        else:
+            if source is None:
+                source = SeriesSource(plots.series() if plots is not None else [])
+            task = export_table(window, source, path, on_done=done, on_error=failed, on_progress=progress)
+    except ExportError as exc:
+        failed(exc)
+        return None
+
+    dialog = view["dialog"] = tk.Toplevel(window)
+    dialog.title("Export")
+    dialog.transient(window)
+    dialog.resizable(False, False)
+    view["label"] = ttk.Label(dialog, text=f"Exporting {name}", width=40, justify="left")
+    view["label"].pack(padx=10, pady=(10, 5))
+    ttk.Button(dialog, text="Cancel", command=cancel).pack(pady=(0, 10))
+    dialog.protocol("WM_DELETE_WINDOW", cancel)
+    return task
@@ -0,0 +1,35 @@
+"""Matplotlib figures embedded in Tk windows, built without pyplot.
+
+pyplot's figure manager holds on to every figure until plt.close() is
+called, so windows that used plt.subplots kept their figure alive after
+being closed. A figure made here belongs only to its window and is
+cleared when that window is destroyed.
+"""
+import weakref
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from perf import timed
+
+# Every figure handed out and not yet garbage collected (see windows.DebugPanel).
+live_figures = weakref.WeakSet()
+
+
+def embed_figure(master, figsize=(6, 4), dpi=None):
+    """Return (figure, ax, canvas) for `master`; the caller packs/grids canvas.get_tk_widget()."""
+    figure = Figure(figsize=figsize, dpi=dpi)
+    live_figures.add(figure)
+    ax = figure.add_subplot()
+    canvas = FigureCanvasTkAgg(figure, master=master)
+    # draw_idle ends up here, so the deferred redraw shows up in the perf trace too.
+    canvas.draw = timed("canvas.draw")(canvas.draw)
+    toplevel = master.winfo_toplevel()
+
+    def release(event):
+        # <Destroy> is delivered for every child too; only the window itself counts.
+        if event.widget is toplevel:
+            figure.clear()
+
+    toplevel.bind("<Destroy>", release, add="+")
+    return figure, ax, canvas
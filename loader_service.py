@@ -0,0 +1,146 @@
+import threading
+import tkinter as tk
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class LoadCancelled(Exception):
+    """Raised inside a load function once its task has been cancelled."""
+
+
+class LoadTask:
+    """Handle for one background load: a future plus progress and cancellation."""
+
+    def __init__(self, description=""):
+        self.description = description
+        self.future = None
+        self.rows = 0
+        self.bytes_read = 0
+        self.total_bytes = None
+        self.total_rows = None
+        self.message = ""
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    # Called from the worker thread.
+    def report(self, rows=None, bytes_read=None, total_bytes=None, message=None, total_rows=None):
+        with self._lock:
+            if rows is not None:
+                self.rows = rows
+            if total_rows is not None:
+                self.total_rows = total_rows
+            if bytes_read is not None:
+                self.bytes_read = bytes_read
+            if total_bytes is not None:
+                self.total_bytes = total_bytes
+            if message is not None:
+                self.message = message
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise LoadCancelled(self.description)
+
+    # Called from the Tk thread.
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def progress(self):
+        """Snapshot of (rows, bytes_read, total_bytes, message)."""
+        with self._lock:
+            return self.rows, self.bytes_read, self.total_bytes, self.message
+
+    def progress_text(self):
+        rows, bytes_read, total_bytes, message = self.progress()
+        parts = [message or self.description or "Loading"]
+        if rows:
+            parts.append(f"{rows:,} rows")
+        if total_bytes:
+            parts.append(f"{bytes_read / total_bytes:.0%}")
+        elif self.total_rows:
+            parts.append(f"{rows / self.total_rows:.0%}")
+        elif bytes_read:
+            parts.append(f"{bytes_read / 1e6:,.1f} MB")
+        return " - ".join(parts)
+
+
+class LoaderService:
+    """Runs dataset loads on a small thread pool and reports back to Tk by polling.
+
+    Load functions receive the LoadTask as their ``task`` keyword so they can
+    report progress and call ``task.check_cancelled()`` between chunks. Tk is
+    only ever touched from ``root.after`` callbacks on the main thread.
+    """
+
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gda-loader")
+            return self._executor
+
+    def submit(self, fn, *args, description="", **kwargs):
+        task = LoadTask(description)
+        task.future = self._pool().submit(fn, *args, task=task, **kwargs)
+        return task
+
+    def watch(self, widget, task, on_done, on_error=None, on_progress=None, interval=None):
+        """Poll task from the Tk loop; call on_done(result) or on_error(exc) when it finishes.
+
+        Nothing is called for a cancelled task, and polling stops by itself
+        once the widget has been destroyed.
+        """
+        interval = interval or self.POLL_INTERVAL_MS
+
+        def poll():
+            try:
+                alive = widget.winfo_exists()
+            except tk.TclError:
+                alive = False
+            if not alive:
+                task.cancel()
+                return
+            if not task.done():
+                if on_progress is not None:
+                    on_progress(task)
+                widget.after(interval, poll)
+                return
+            if task.cancelled:
+                return
+            try:
+                result = task.future.result()
+            except (LoadCancelled, CancelledError):
+                return
+            except Exception as exc:
+                if on_error is not None:
+                    on_error(exc)
+                else:
+                    print(f"Load failed ({task.description}): {exc}")
+                return
+            on_done(result)
+
+        widget.after(0, poll)
+        return task
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+# Process-wide loader shared by every window.
+loader_service = LoaderService()
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+def minmax_indices(y, start, stop, bucket):
+    """Indices of the min and max of each `bucket`-sized slice of y[start:stop], in x order.
+
+    Keeping both extremes per bucket preserves peaks and troughs, which plain
+    striding or averaging would flatten. A bucket with missing values also
+    keeps its first NaN, so the line still breaks at gaps shorter than a bucket.
+    """
+    segment = np.asarray(y[start:stop], dtype=np.float64)
+    count = len(segment)
+    if count == 0:
+        return np.empty(0, dtype=np.int64)
+    buckets = -(-count // bucket)
+    padded = np.full(buckets * bucket, np.nan)
+    padded[:count] = segment
+    block = padded.reshape(buckets, bucket)
+    # NaNs (and the padding) would poison argmin/argmax; push them to the far end instead.
+    missing = np.isnan(block)
+    lows = np.argmin(np.where(missing, np.inf, block), axis=1)
+    highs = np.argmax(np.where(missing, -np.inf, block), axis=1)
+    offsets = np.arange(buckets) * bucket
+    indices = (np.stack([lows, highs], axis=1) + offsets[:, None]).ravel()
+    gaps = missing.ravel()[:count].nonzero()[0]
+    if len(gaps):
+        # First NaN of each bucket that has one (the padding is not a gap).
+        gaps = gaps[np.r_[True, gaps[1:] // bucket != gaps[:-1] // bucket]]
+        indices = np.concatenate([indices, gaps])
+    return np.unique(np.minimum(indices, count - 1)) + start
+
+
+class LevelOfDetail:
+    """Reduces long series to about `points_per_pixel` points per pixel of axes width.
+
+    Reductions are cached per (series, zoom level, chunk): the zoom level is
+    the power-of-two bucket size, and each chunk covers CHUNK_BUCKETS buckets,
+    so panning or zooming only computes chunks that were never visible at
+    that level before.
+    """
+
+    CHUNK_BUCKETS = 256
+    MIN_POINTS = 200
+
+    def __init__(self, ax, points_per_pixel=2, cache_size=256):
+        self.ax = ax
+        self.points_per_pixel = points_per_pixel
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def target_points(self):
+        width = self.ax.get_window_extent().width
+        return max(self.MIN_POINTS, int(width * self.points_per_pixel))
+
+    def needs_reduction(self, x):
+        return len(x) > self.target_points()
+
+    def reduce(self, key, x, y, xlim=None):
+        """Return (x, y) for the visible range, reduced if it has more points than pixels."""
+        n = len(x)
+        target = self.target_points()
+        if n <= target:
+            return x, y
+        lo, hi = 0, n
+        if xlim is not None:
+            left, right = sorted(xlim)
+            lo = max(int(np.searchsorted(x, left, side="left")) - 1, 0)
+            hi = min(int(np.searchsorted(x, right, side="right")) + 1, n)
+        if hi - lo <= target:
+            return x[lo:hi], y[lo:hi]
+
+        # Two points per bucket, bucket size rounded up to a power of two.
+        bucket = 1 << int(np.ceil(np.log2(2 * (hi - lo) / target)))
+        chunk_len = bucket * self.CHUNK_BUCKETS
+        first_chunk, last_chunk = lo // chunk_len, (hi - 1) // chunk_len
+        parts = [self._chunk(key, y, bucket, chunk, chunk_len) for chunk in range(first_chunk, last_chunk + 1)]
+        # Keep the exact end points so autoscaling still sees the full x extent.
+        indices = np.concatenate(parts)
+        indices = np.unique(np.concatenate([[lo], indices[(indices > lo) & (indices < hi - 1)], [hi - 1]]))
+        return x[indices], y[indices]
+
+    def _chunk(self, key, y, bucket, chunk, chunk_len):
+        cache_key = (key, bucket, chunk)
+        indices = self._cache.get(cache_key)
+        if indices is None:
+            start = chunk * chunk_len
+            indices = minmax_indices(y, start, min(start + chunk_len, len(y)), bucket)
+            self._cache[cache_key] = indices
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(cache_key)
+        return indices
+
+    def forget(self, key):
+        """Drop cached reductions for a series whose data changed."""
+        for cache_key in [cache_key for cache_key in self._cache if cache_key[0] == key]:
+            del self._cache[cache_key]
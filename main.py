@@ -1,9 +1,16 @@
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # ✅ Arguments mean headless mode: hand off before any Tk / matplotlib / pandas import
+    from cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
 import tkinter as tk
-from tkinter import ttk, Menu
-from data_downloader import PopulationApp, GDPApp  # Import both apps
-from explore import open_dataset  # Import the function from explore.py
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import ttk, Menu, filedialog
+from dataset_locator import locator
+from perf import recorder
+from windows import show_debug_panel, windows
+# ✅ The windows behind the buttons (and matplotlib / pandas with them) are imported on first click
 
 
 class TheDataAnalyser:
@@ -30,6 +37,14 @@ class TheDataAnalyser:
         collaboratorMenu.add_command(label="MAHPROJECTS")
         menubar.add_cascade(label="Contributors", menu=collaboratorMenu)
 
+        debugMenu = Menu(menubar, tearoff=0)
+        debugMenu.add_command(label="Memory and Windows", command=lambda: show_debug_panel(self.root))
+        self.recording = tk.BooleanVar(value=recorder.enabled)
+        debugMenu.add_checkbutton(label="Record Performance", variable=self.recording,
+                                  command=self.toggle_recording)
+        debugMenu.add_command(label="Export Performance Trace...", command=self.export_trace)
+        menubar.add_cascade(label="Debug", menu=debugMenu)
+
         # Main frame for buttons
         self.main_frame = ttk.Frame(self.root, padding=10)
         self.main_frame.pack()  
@@ -58,92 +73,42 @@ class TheDataAnalyser:
         )
         self.both_data_button.pack(fill="x", expand=True)
 
-        # Pass 'root' when calling open_dataset
-        self.dataset_button = tk.Button(self.main_frame, text="Open Dataset", command=lambda: open_dataset(root),
+        # Opens the dataset viewer (explore.py and pandas load on first click)
+        self.dataset_button = tk.Button(self.main_frame, text="Open Dataset", command=self.open_dataset,
                                         bg="green",
                                         fg="black",)
         self.dataset_button.pack(fill = 'x', expand=True)
 
     def open_single_data_app(self):
-        new_window = tk.Toplevel(self.root)
-        PopulationApp(new_window)  # Open population data, or you could switch to GDPApp based on input
+        from data_downloader import PopulationApp
+        # Closed windows are recycled by the pool instead of piling up
+        windows.open(self.root, "population", PopulationApp)
 
     def open_both_data_app(self):
-        new_window = tk.Toplevel(self.root)
-        BothDataApp(new_window)  # Open a new window to view both GDP and Population data
-
-class BothDataApp:
-    """Class to view both GDP and Population for a single country"""
-
-    def __init__(self, root):
-        self.root = root
-        self.root.title("GDP and Population for a Country")
-        
-        # Frame to hold widgets
-        self.main_frame = ttk.Frame(self.root, padding="10")
-        self.main_frame.pack(fill="both", expand=True)
-
-        # Country selection input
-        self.country_label = tk.Label(self.main_frame, text="Select a Country:")
-        self.country_label.pack(pady=5)
-
-        self.country_entry = tk.Entry(self.main_frame)
-        self.country_entry.pack(pady=5)
-
-        # Button to fetch both GDP and Population data
-        self.plot_button = tk.Button(self.main_frame, text="Plot GDP and Population", command=self.plot_data)
-        self.plot_button.pack(pady=5)
-
-        # Create matplotlib figure for plotting
-        self.figure, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.main_frame)
-        self.canvas.get_tk_widget().pack(pady=10)
-
-        # Data for GDP and Population
-        self.population_data = {}  # To be filled with real data
-        self.gdp_data = {}  # To be filled with real data
-
-        # Load your data (for now, just placeholders)
-        self.load_data()
-
-    def load_data(self):
-        # Load Population data (this can come from a CSV or API)
-        self.population_data = {
-            "2020": 700000000,  # Example: for a country
-            "2021": 705000000
-        }
-
-        # Load GDP data (this can come from a CSV or API)
-        self.gdp_data = {
-            "2020": 15000,  # Example GDP in USD
-            "2021": 16000
-        }
-
-    def plot_data(self):
-        self.ax.clear()
-
-        # Extract years for plotting
-        years = sorted(set(self.population_data.keys()).union(self.gdp_data.keys()))
-        
-        # Plot Population data
-        population_values = [self.population_data.get(year, 0) for year in years]
-        self.ax.plot(years, population_values, marker='o', label="Population", color="blue")
-
-        # Plot GDP data
-        gdp_values = [self.gdp_data.get(year, 0) for year in years]
-        self.ax.plot(years, gdp_values, marker='o', label="GDP", color="green")
-
-        # Set titles and labels
-        self.ax.set_title("GDP and Population Over Time")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("Values")
-        self.ax.legend()
-
-        # Redraw canvas
-        self.canvas.draw()
+        from both_data_app import BothDataApp
+        windows.open(self.root, "both", BothDataApp)  # Open a window to view both GDP and Population data
+
+    def toggle_recording(self):
+        # Windows opened (or reopened) from now on get the timing overlay
+        if self.recording.get():
+            recorder.enable()
+        else:
+            recorder.disable()
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(title="Export Performance Trace", defaultextension=".trace.json",
+                                            filetypes=[("Chrome trace", "*.trace.json"),
+                                                       ("Latency summary", "*.json")])
+        if path:
+            recorder.export(path)
+
+    def open_dataset(self):
+        from explore import open_dataset  # Import the function from explore.py
+        open_dataset(self.root)
 
 # Main program execution
 if __name__ == "__main__":
+    locator.build_in_background()  # Warm the dataset path index while the main window starts
     root = tk.Tk()
     app = TheDataAnalyser(root)
     root.mainloop()
@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from country_catalog import CountryCatalog
+
+LINEAR = "linear"
+LOG_LINEAR = "log"
+
+# Interpolation used for each indicator unless the caller says otherwise:
+# population grows geometrically, so census gaps are filled log-linearly.
+DEFAULT_METHODS = {"population": LOG_LINEAR, "gdp": LINEAR, "life_expectancy": LINEAR}
+
+
+def interpolate_rows(values, years, method=LINEAR):
+    """Fill NaN gaps between known points of every row at once (no extrapolation).
+
+    For each cell the previous and next known column are found with running
+    max/min accumulations, so there is no per-row Python loop.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values.copy()
+    years = np.asarray(years, dtype=np.float64)
+    work = values
+    if method == LOG_LINEAR:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            work = np.where(values > 0, np.log(values), np.nan)
+    known = ~np.isnan(work)
+    columns = np.arange(values.shape[1])
+    prev_col = np.maximum.accumulate(np.where(known, columns, -1), axis=1)
+    next_col = np.minimum.accumulate(np.where(known, columns, values.shape[1])[:, ::-1], axis=1)[:, ::-1]
+    inside = (prev_col >= 0) & (next_col < values.shape[1])
+    prev_safe = np.clip(prev_col, 0, values.shape[1] - 1)
+    next_safe = np.clip(next_col, 0, values.shape[1] - 1)
+    rows = np.arange(values.shape[0])[:, None]
+    prev_val, next_val = work[rows, prev_safe], work[rows, next_safe]
+    span = years[next_safe] - years[prev_safe]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(span > 0, (years[None, :] - years[prev_safe]) / span, 0.0)
+    filled = np.where(inside, prev_val + weight * (next_val - prev_val), np.nan)
+    if method == LOG_LINEAR:
+        filled = np.exp(filled)
+    # Known points keep their exact original values.
+    return np.where(~np.isnan(values), values, filled)
+
+
+def place_on_grid(dataset, rows, years, row_count):
+    """dataset.values on a (row_count, len(years)) NaN grid: row i goes to rows[i], years outside the axis drop."""
+    grid = np.full((row_count, len(years)), np.nan)
+    if len(years):
+        cols = dataset.years - years[0]
+        in_range = (cols >= 0) & (cols < len(years))
+        if len(rows) and in_range.any():
+            grid[np.ix_(rows, cols[in_range])] = dataset.values[:, in_range]
+    return grid
+
+
+class AlignedPanel:
+    """Several indicators on one country axis and one yearly axis.
+
+    ``raw`` holds each indicator's observed values placed on the shared grid;
+    ``filled`` holds the interpolated version. Both are built once, so the
+    dual-axis and per-capita views are plain lookups.
+    """
+
+    def __init__(self, datasets, methods=None, year_range=None):
+        methods = dict(DEFAULT_METHODS, **(methods or {}))
+        self.sources = dict(datasets)
+        # Panel rows are catalog IDs, so the panel and every widget sharing the catalog agree on them.
+        self.catalog = CountryCatalog(datasets.values())
+        self.mapper = self.catalog.mapper
+        all_years = [dataset.years for dataset in datasets.values() if len(dataset.years)]
+        if year_range is not None:
+            first, last = year_range
+        elif all_years:
+            first, last = min(int(y[0]) for y in all_years), max(int(y[-1]) for y in all_years)
+        else:
+            first, last = 0, -1
+        self.years = np.arange(first, last + 1, dtype=np.int64)
+
+        self.keys = list(self.catalog.keys)
+        self.row_of = self.catalog.id_of_key
+        self.name_index = self.catalog.aliases
+        self.names = list(self.catalog.names)
+
+        self.raw, self.filled = {}, {}
+        for name, dataset in datasets.items():
+            grid = place_on_grid(dataset, self.catalog.ids(dataset), self.years, len(self.keys))
+            grid.setflags(write=False)
+            self.raw[name] = grid
+            filled = interpolate_rows(grid, self.years, methods.get(name, LINEAR))
+            filled.setflags(write=False)
+            self.filled[name] = filled
+        self._derived = {}
+
+    @property
+    def indicators(self):
+        return list(self.raw)
+
+    def row(self, country):
+        row = self.name_index.get(country)
+        if row is None:
+            row = self.row_of.get(self.mapper.key(country))
+        return row
+
+    def series(self, indicator, country, interpolated=True):
+        """(years, values) for one country on the shared axis, or None."""
+        table = (self.filled if interpolated else self.raw).get(indicator)
+        if table is None:
+            table = self._derived.get(indicator)
+        row = self.row(country)
+        if table is None or row is None:
+            return None
+        values = table[row]
+        present = ~np.isnan(values)
+        if not present.any():
+            return None
+        return self.years[present], values[present]
+
+    def per_capita(self, numerator="gdp", denominator="population"):
+        """numerator / interpolated denominator, computed once and cached."""
+        name = f"{numerator}_per_capita"
+        if name not in self._derived:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = self.raw[numerator] / self.filled[denominator]
+            values[~np.isfinite(values)] = np.nan
+            values.setflags(write=False)
+            self._derived[name] = values
+        return self._derived[name]
+
+
+_panels = OrderedDict()
+_panels_lock = threading.Lock()
+MAX_PANELS = 4
+
+
+def aligned_panel(**datasets):
+    """Shared AlignedPanel for these exact Dataset objects (e.g. population=..., gdp=...).
+
+    Registry reloads produce new Dataset objects, so a changed file builds a
+    new panel and unchanged ones are reused.
+    """
+    key = tuple(sorted((name, id(dataset)) for name, dataset in datasets.items()))
+    with _panels_lock:
+        entry = _panels.get(key)
+        if entry is not None and all(entry[0][name] is dataset for name, dataset in datasets.items()):
+            _panels.move_to_end(key)
+            return entry[1]
+    panel = AlignedPanel(datasets)
+    with _panels_lock:
+        _panels[key] = (dict(datasets), panel)
+        while len(_panels) > MAX_PANELS:
+            _panels.popitem(last=False)
+    return panel
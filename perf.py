@@ -0,0 +1,263 @@
+"""Hot-path instrumentation: timed() / span() with rolling histograms and trace export.
+
+Recording is off unless GDA_PERF=1 is set or enable() is called (the
+Debug menu does this). While off, a timed function costs one flag check
+and span() hands back a shared no-op context manager.
+
+While on, every span keeps:
+  * a rolling window of its last durations (summary() and histogram()),
+  * an event in a ring buffer that export_chrome_trace() writes out for
+    chrome://tracing or Perfetto,
+  * for top-level spans, a breakdown of the spans nested inside them
+    (recent), which PerfOverlay shows in a window's corner.
+
+With GDA_PERF_TRACE=<path> the trace is written when the process exits.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+PERF_ENV = "GDA_PERF"
+TRACE_ENV = "GDA_PERF_TRACE"
+WINDOW = 1000
+MAX_EVENTS = 100_000
+# Top-level operations kept for the overlay (a click and the redraw it triggers are separate).
+RECENT_OPERATIONS = 8
+# Histogram bucket upper bounds, in milliseconds.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class Recorder:
+    """Collects span timings from any thread."""
+
+    def __init__(self, enabled=False, window=WINDOW, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.window = window
+        self.durations = {}
+        self.counts = {}
+        self.events = deque(maxlen=max_events)
+        self.recent = deque(maxlen=RECENT_OPERATIONS)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.durations.clear()
+            self.counts.clear()
+            self.events.clear()
+            self.recent.clear()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name):
+        self._stack().append([name, time.perf_counter(), []])
+
+    def end(self):
+        stack = self._stack()
+        name, started, children = stack.pop()
+        duration = time.perf_counter() - started
+        if stack:
+            stack[-1][2].append((name, duration))
+        with self._lock:
+            samples = self.durations.get(name)
+            if samples is None:
+                samples = self.durations[name] = deque(maxlen=self.window)
+            samples.append(duration)
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.events.append((name, started - self._origin, duration, threading.get_ident(), len(stack)))
+            if not stack:
+                self.recent.append((name, duration, tuple(children)))
+        return duration
+
+    @property
+    def last_operation(self):
+        """(name, seconds, ((child, seconds), ...)) of the latest top-level span, or None."""
+        return self.recent[-1] if self.recent else None
+
+    def summary(self):
+        """{name: {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}} over each rolling window."""
+        with self._lock:
+            windows = {name: sorted(samples) for name, samples in self.durations.items()}
+            counts = dict(self.counts)
+        result = {}
+        for name, samples in windows.items():
+            if not samples:
+                continue
+
+            def pick(q, samples=samples):
+                return samples[min(int(q * len(samples)), len(samples) - 1)] * 1000
+
+            result[name] = {"count": counts[name], "mean_ms": sum(samples) / len(samples) * 1000,
+                            "p50_ms": pick(0.5), "p90_ms": pick(0.9), "p99_ms": pick(0.99),
+                            "max_ms": samples[-1] * 1000}
+        return result
+
+    def histogram(self, name):
+        """[(bucket upper bound in ms, count), ...] for one span's rolling window."""
+        with self._lock:
+            samples = list(self.durations.get(name, ()))
+        counts = [0] * len(BUCKETS_MS)
+        for seconds in samples:
+            ms = seconds * 1000
+            for i, bound in enumerate(BUCKETS_MS):
+                if ms <= bound:
+                    counts[i] += 1
+                    break
+        return list(zip(BUCKETS_MS, counts))
+
+    def export_json(self, path):
+        report = {"summary": self.summary(),
+                  "histograms": {name: [["inf" if bound == float("inf") else bound, count]
+                                        for bound, count in self.histogram(name)]
+                                 for name in list(self.durations)}}
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+
+    def export_chrome_trace(self, path):
+        """Write the event ring buffer in Chrome trace-event format (complete 'X' events)."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        trace = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": pid, "tid": tid,
+                  "args": {"depth": depth}}
+                 for name, start, duration, tid, depth in events]
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, out)
+
+    def export(self, path):
+        """Chrome trace for *.trace.json / *.trace, the summary and histograms for anything else."""
+        if path.endswith((".trace.json", ".trace")):
+            self.export_chrome_trace(path)
+        else:
+            self.export_json(path)
+
+
+recorder = Recorder(enabled=os.environ.get(PERF_ENV, "") not in ("", "0"))
+
+
+class _Span:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        recorder.begin(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        recorder.end()
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager timing a block as `name` (a no-op while recording is off)."""
+    return _Span(name) if recorder.enabled else _NULL_SPAN
+
+
+def timed(name=None):
+    """Decorator timing every call; spans are named module.qualname unless a name is given."""
+    def decorate(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return fn(*args, **kwargs)
+            recorder.begin(label)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                recorder.end()
+
+        return wrapper
+
+    # Allow both @timed and @timed("name").
+    if callable(name):
+        fn, name = name, None
+        return decorate(fn)
+    return decorate
+
+
+def format_operation(operation, limit=4):
+    """'PopulationApp.load_datasets 41.2 ms: read_gdp_data 30.1 | ...' for a recent operation."""
+    if operation is None:
+        return ""
+    name, duration, children = operation
+    text = f"{'.'.join(name.split('.')[-2:])} {duration * 1000:.1f} ms"
+    if children:
+        slowest = sorted(children, key=lambda child: -child[1])[:limit]
+        text += ": " + " | ".join(f"{child.rsplit('.', 1)[-1]} {seconds * 1000:.1f}" for child, seconds in slowest)
+    return text
+
+
+class PerfOverlay:
+    """Label in a window's bottom-right corner showing the latest timed operations."""
+
+    POLL_MS = 250
+    LINES = 3
+
+    def __init__(self, window):
+        import tkinter as tk
+
+        self.window = window
+        self.label = tk.Label(window, text="", font=("TkFixedFont", 8), bg="#ffffe0", justify="right")
+        self.label.place(relx=1.0, rely=1.0, anchor="se")
+        self._shown = None
+        self.poll()
+
+    def poll(self):
+        try:
+            if not self.label.winfo_exists():
+                return
+        except Exception:
+            return
+        latest = recorder.last_operation
+        if latest is not self._shown:
+            self._shown = latest
+            operations = list(recorder.recent)[-self.LINES:]
+            self.label.config(text="\n".join(format_operation(operation) for operation in operations))
+            self.label.lift()
+        self.window.after(self.POLL_MS, self.poll)
+
+
+def attach_overlay(window):
+    """Add a PerfOverlay to a window when recording is on; returns it (or None)."""
+    return PerfOverlay(window) if recorder.enabled else None
+
+
+def _export_at_exit():
+    path = os.environ.get(TRACE_ENV)
+    if path and recorder.events:
+        recorder.export_chrome_trace(path)
+
+
+atexit.register(_export_at_exit)
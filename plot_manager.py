@@ -0,0 +1,127 @@
+import matplotlib.ticker as mtick
+
+from lod import LevelOfDetail
+
+PRIMARY = "primary"
+SECONDARY = "secondary"
+
+
+class LineSpec:
+    """One line a view wants on screen: key, data, target axis and style."""
+
+    def __init__(self, key, x, y, source=None, axis=PRIMARY, **style):
+        self.key = key
+        self.x = x
+        self.y = y
+        self.source = source
+        self.axis = axis
+        self.style = style
+
+
+class PlotManager:
+    """Keeps one Line2D per key and applies only the differences between views.
+
+    Lines that stay are updated with set_data (and only when their source or
+    their arrays changed), lines that go are removed, and the secondary y-axis is created
+    once and hidden when unused instead of stacking a new twinx() per click.
+    Redraws go through draw_idle so bursts of updates coalesce. Series longer
+    than about two points per pixel are drawn through a LevelOfDetail
+    reduction that is recomputed for the visible range on pan/zoom.
+    """
+
+    def __init__(self, ax, canvas, number_format='{x:,.0f}'):
+        self.ax = ax
+        self.canvas = canvas
+        self.number_format = number_format
+        self.ax2 = None
+        self.lines = {}
+        self._state = {}
+        self._full = {}
+        self.lod = LevelOfDetail(ax)
+        self._format_axis(self.ax)
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+
+    def _format_axis(self, ax):
+        if self.number_format:
+            ax.yaxis.set_major_formatter(mtick.StrMethodFormatter(self.number_format))
+
+    def secondary_axis(self):
+        if self.ax2 is None:
+            self.ax2 = self.ax.twinx()
+            self._format_axis(self.ax2)
+        return self.ax2
+
+    def _axis(self, name):
+        return self.secondary_axis() if name == SECONDARY else self.ax
+
+    def show(self, specs, title="", xlabel="", ylabel="", ylabel2="", legend_loc="best", legend_loc2="upper right"):
+        wanted = {spec.key: spec for spec in specs}
+
+        for key in [key for key in self.lines if key not in wanted]:
+            self.lines.pop(key).remove()
+            del self._state[key]
+            del self._full[key]
+            self.lod.forget(key)
+
+        for key, spec in wanted.items():
+            line = self.lines.get(key)
+            if line is not None and self._state[key][0] != spec.axis:
+                # Moving between axes: cheaper to recreate than to reparent.
+                line.remove()
+                line = None
+            if line is None:
+                self.lod.forget(key)
+                (line,) = self._axis(spec.axis).plot(*self.lod.reduce(key, spec.x, spec.y), **spec.style)
+                self.lines[key] = line
+                self._full[key] = (spec.x, spec.y)
+            else:
+                old_axis, old_source, old_style = self._state[key]
+                old_x, old_y = self._full[key]
+                # Same source and the very same arrays (series_cache hands them out again): nothing to redraw.
+                if spec.source is None or spec.source is not old_source or spec.x is not old_x or spec.y is not old_y:
+                    self.lod.forget(key)
+                    self._full[key] = (spec.x, spec.y)
+                    line.set_data(*self.lod.reduce(key, spec.x, spec.y))
+                if spec.style != old_style:
+                    line.set(**spec.style)
+            self._state[key] = (spec.axis, spec.source, spec.style)
+
+        uses_secondary = any(spec.axis == SECONDARY for spec in specs)
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self._rescale(self.ax)
+        self._legend(self.ax, legend_loc)
+        if self.ax2 is not None:
+            self.ax2.set_visible(uses_secondary)
+            self.ax2.set_ylabel(ylabel2 if uses_secondary else "")
+            self._rescale(self.ax2)
+            self._legend(self.ax2, legend_loc2)
+        self.canvas.draw_idle()
+
+    def on_xlim_changed(self, ax):
+        """Re-reduce long series for the newly visible x range (pan/zoom)."""
+        changed = False
+        for key, (x, y) in self._full.items():
+            if self.lod.needs_reduction(x):
+                self.lines[key].set_data(*self.lod.reduce(key, x, y, ax.get_xlim()))
+                changed = True
+        if changed:
+            self.canvas.draw_idle()
+
+    def _rescale(self, ax):
+        ax.relim()
+        ax.autoscale_view()
+
+    def _legend(self, ax, loc):
+        if any(line.axes is ax for line in self.lines.values()):
+            ax.legend(loc=loc)
+        elif ax.get_legend() is not None:
+            ax.get_legend().remove()
+
+    def series(self):
+        """[(label, x, y), ...] for every line on screen, at full resolution (not the LOD-reduced data)."""
+        return [(self.lines[key].get_label(), x, y) for key, (x, y) in self._full.items()]
+
+    def clear(self):
+        self.show([])
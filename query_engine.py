@@ -0,0 +1,534 @@
+"""Small query language over a DataFrame, compiled to vectorized pandas/NumPy operations.
+
+A query is a pipeline of stages separated by '|'. The first stage may be a
+bare condition (an implicit `where`):
+
+    Continent == "Asia" and `Density (per km²)` > 500
+    where Continent in ("Asia", "Europe") | sort `2022 Population` desc | limit 20
+    group Continent | agg sum(`2022 Population`), mean(`Growth Rate`), count() | sort count() desc
+    `Country/Territory` contains "guinea" | select `Country/Territory`, Capital
+
+Columns with spaces or symbols are written in backticks. Conditions support
+== != < <= > >= (numbers or strings), `in (...)`, `contains` and
+`startswith` (case-insensitive), combined with and / or / not and
+parentheses. Aggregates: count, sum, mean, min, max, median, std, nunique.
+
+Filtering never copies rows: a result is a list of row positions that the
+viewer pages through, so only the rows on screen are materialized. Range
+filters on a numeric column build a sorted index for it the second time
+that column is filtered, and later range filters (and sorts on that column)
+become binary searches. Results are cached per query text. Files too big
+to load go through run_chunked(), which keeps only the filtered rows.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class QueryError(ValueError):
+    """The query text could not be parsed or does not fit the data."""
+
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<number>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?(?![\w.]))
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<quoted>`[^`]*`)
+  | (?P<op>==|!=|<=|>=|<|>|=|\(|\)|,|\|)
+  | (?P<word>[^\s()<>=!,|`"']+)
+)""", re.VERBOSE)
+
+COMPARISONS = {"==", "!=", "<", "<=", ">", ">=", "="}
+STAGES = {"where", "sort", "group", "agg", "select", "limit"}
+AGGREGATES = ("count", "sum", "mean", "min", "max", "median", "std", "nunique")
+# A column gets a sorted index once it has been range-filtered this many times.
+INDEX_AFTER_USES = 2
+
+
+def tokenize(text):
+    tokens, position = [], 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise QueryError(f"cannot read the query at: {text[position:position + 20]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "quoted":
+            value = value[1:-1]
+        elif kind == "number":
+            value = float(value)
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens, columns):
+        self.tokens = tokens
+        self.position = 0
+        self.columns = list(columns)
+        self._lower = {}
+        for column in self.columns:
+            self._lower.setdefault(column.lower(), column)
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        if token[0] is None:
+            raise QueryError("the query ends too early")
+        self.position += 1
+        return token
+
+    def keyword(self, *words):
+        kind, value = self.peek()
+        if kind == "word" and value.lower() in words:
+            self.position += 1
+            return value.lower()
+        return None
+
+    def expect(self, op):
+        kind, value = self.take()
+        if kind != "op" or value != op:
+            raise QueryError(f"expected {op!r}, found {value!r}")
+
+    def column(self):
+        kind, value = self.take()
+        if kind not in ("word", "quoted"):
+            raise QueryError(f"expected a column name, found {value!r}")
+        if value in self.columns:
+            return value
+        if value.lower() in self._lower:
+            return self._lower[value.lower()]
+        raise QueryError(f"no column named {value!r}")
+
+    def literal(self):
+        kind, value = self.take()
+        if kind in ("number", "string"):
+            return value
+        if kind == "word":
+            return value
+        raise QueryError(f"expected a value, found {value!r}")
+
+    # condition := or_expr
+    def condition(self):
+        node = self.conjunction()
+        while self.keyword("or"):
+            node = ("or", node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.keyword("and"):
+            node = ("and", node, self.negation())
+        return node
+
+    def negation(self):
+        if self.keyword("not"):
+            return ("not", self.negation())
+        if self.peek() == ("op", "("):
+            self.take()
+            node = self.condition()
+            self.expect(")")
+            return node
+        return self.comparison()
+
+    def comparison(self):
+        column = self.column()
+        kind, value = self.peek()
+        if kind == "op" and value in COMPARISONS:
+            self.take()
+            return ("cmp", column, "==" if value == "=" else value, self.literal())
+        word = self.keyword("in", "contains", "startswith")
+        if word == "in":
+            self.expect("(")
+            values = [self.literal()]
+            while self.peek() == ("op", ","):
+                self.take()
+                values.append(self.literal())
+            self.expect(")")
+            return ("in", column, tuple(values))
+        if word is not None:
+            return (word, column, str(self.literal()))
+        raise QueryError(f"expected a comparison after {column!r}")
+
+    def column_list(self):
+        columns = [self.column()]
+        while self.peek() == ("op", ","):
+            self.take()
+            columns.append(self.column())
+        return columns
+
+    def aggregates(self):
+        specs = [self.aggregate()]
+        while self.peek() == ("op", ","):
+            self.take()
+            specs.append(self.aggregate())
+        return specs
+
+    def aggregate(self):
+        kind, name = self.take()
+        if kind != "word" or name.lower() not in AGGREGATES:
+            raise QueryError(f"unknown aggregate {name!r} (use {', '.join(AGGREGATES)})")
+        name = name.lower()
+        self.expect("(")
+        column = None
+        if self.peek() != ("op", ")"):
+            column = self.column()
+        self.expect(")")
+        if column is None and name != "count":
+            raise QueryError(f"{name}() needs a column")
+        return name, column
+
+    def at_stage_end(self):
+        return self.peek()[0] is None or self.peek() == ("op", "|")
+
+
+class Plan:
+    """Parsed form of a query."""
+
+    def __init__(self):
+        self.where = None
+        self.group = None
+        self.aggregates = []
+        self.sort = []
+        self.select = None
+        self.limit = None
+
+
+def parse(text, columns):
+    """Parse query text against a table's columns into a Plan (raises QueryError)."""
+    tokens = tokenize(text)
+    parser = _Parser(tokens, columns)
+    plan = Plan()
+    first = True
+    while parser.peek()[0] is not None:
+        stage = parser.keyword(*STAGES)
+        if stage is None and first:
+            stage = "where"
+        if stage is None:
+            raise QueryError(f"expected one of {', '.join(sorted(STAGES))}, found {parser.peek()[1]!r}")
+        if stage == "where":
+            condition = parser.condition()
+            plan.where = condition if plan.where is None else ("and", plan.where, condition)
+        elif stage == "group":
+            plan.group = parser.column_list()
+            if parser.keyword("agg"):
+                plan.aggregates = parser.aggregates()
+        elif stage == "agg":
+            plan.aggregates = parser.aggregates()
+        elif stage == "sort":
+            plan.sort = []
+            while True:
+                if plan.group is not None or plan.aggregates:
+                    kind, value = parser.peek()
+                    # Sort keys after a group may name an aggregate, e.g. sum(`2022 Population`).
+                    if kind == "word" and value.lower() in AGGREGATES and parser.tokens[parser.position + 1:][:1] == [("op", "(")]:
+                        name, column = parser.aggregate()
+                        key = _aggregate_name(name, column)
+                    else:
+                        key = parser.column()
+                else:
+                    key = parser.column()
+                descending = parser.keyword("desc", "asc") == "desc"
+                plan.sort.append((key, not descending))
+                if parser.peek() != ("op", ","):
+                    break
+                parser.take()
+        elif stage == "select":
+            plan.select = parser.column_list()
+        elif stage == "limit":
+            kind, value = parser.take()
+            if kind != "number" or value < 0 or value != int(value):
+                raise QueryError("limit needs a whole number")
+            plan.limit = int(value)
+        if not parser.at_stage_end():
+            raise QueryError(f"unexpected {parser.peek()[1]!r} in {stage} stage")
+        if parser.peek() == ("op", "|"):
+            parser.take()
+        first = False
+    if plan.aggregates and plan.group is None:
+        plan.group = []
+    return plan
+
+
+def _aggregate_name(name, column):
+    return f"{name}({column or ''})"
+
+
+class ColumnIndex:
+    """Row positions of a numeric column in sorted order (NaNs last)."""
+
+    def __init__(self, values):
+        self.order = np.argsort(values, kind="stable")
+        self.sorted = values[self.order]
+        self.valid = int(np.count_nonzero(~np.isnan(values)))
+
+    def positions(self, op, value):
+        keys = self.sorted[:self.valid]
+        if op == "==":
+            lo, hi = np.searchsorted(keys, value, "left"), np.searchsorted(keys, value, "right")
+        elif op == "<":
+            lo, hi = 0, np.searchsorted(keys, value, "left")
+        elif op == "<=":
+            lo, hi = 0, np.searchsorted(keys, value, "right")
+        elif op == ">":
+            lo, hi = np.searchsorted(keys, value, "right"), self.valid
+        else:
+            lo, hi = np.searchsorted(keys, value, "left"), self.valid
+        return self.order[lo:hi]
+
+
+class QueryResult:
+    """A query's output as a VirtualTable row source; rows are materialized a page at a time."""
+
+    def __init__(self, frame, positions=None, columns=None, elapsed=0.0):
+        self.frame = frame
+        self.positions = positions
+        self.columns = [str(column) for column in (columns if columns is not None else frame.columns)]
+        self._column_positions = [frame.columns.get_loc(column) for column in columns] if columns is not None else None
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.positions) if self.positions is not None else len(self.frame)
+
+    def rows(self, start, stop):
+        return list(self.frame_rows(start, stop).itertuples(index=False, name=None))
+
+    def frame_rows(self, start, stop):
+        rows = slice(start, stop) if self.positions is None else self.positions[start:stop]
+        cols = slice(None) if self._column_positions is None else self._column_positions
+        return self.frame.iloc[rows, cols]
+
+    def to_frame(self):
+        frame = self.frame if self.positions is None else self.frame.iloc[self.positions]
+        if self._column_positions is not None:
+            frame = frame.iloc[:, self._column_positions]
+        return frame.reset_index(drop=True)
+
+
+class QueryEngine:
+    """Runs queries against one DataFrame, with lazy sorted indexes and a result cache."""
+
+    def __init__(self, frame, cache_size=32):
+        self.frame = frame
+        self.columns = [str(column) for column in frame.columns]
+        self.cache_size = cache_size
+        self._results = OrderedDict()
+        self._indexes = {}
+        self._range_uses = {}
+        self._numeric = {}
+        self._lock = threading.Lock()
+
+    # -- column access -----------------------------------------------------
+
+    def _values(self, column):
+        """Float64 array for numeric-looking columns (cached), None for text columns."""
+        if column not in self._numeric:
+            series = self.frame[column]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                values = None
+            self._numeric[column] = values
+        return self._numeric[column]
+
+    def index(self, column):
+        """Sorted index for a numeric column (built on demand)."""
+        index = self._indexes.get(column)
+        if index is None:
+            index = self._indexes[column] = ColumnIndex(self._values(column))
+        return index
+
+    def _range_index(self, column):
+        uses = self._range_uses.get(column, 0) + 1
+        self._range_uses[column] = uses
+        if column in self._indexes or uses >= INDEX_AFTER_USES:
+            return self.index(column)
+        return None
+
+    # -- evaluation --------------------------------------------------------
+
+    def _mask(self, node):
+        kind = node[0]
+        if kind == "and":
+            return self._mask(node[1]) & self._mask(node[2])
+        if kind == "or":
+            return self._mask(node[1]) | self._mask(node[2])
+        if kind == "not":
+            return ~self._mask(node[1])
+        column = node[1]
+        values = self._values(column)
+        if kind == "cmp":
+            _, _, op, literal = node
+            if values is not None:
+                if isinstance(literal, str):
+                    try:
+                        literal = float(literal)
+                    except ValueError:
+                        raise QueryError(f"{column!r} is numeric; {literal!r} is not a number") from None
+                if op != "!=":
+                    index = self._range_index(column)
+                    if index is not None:
+                        mask = np.zeros(len(self.frame), dtype=bool)
+                        mask[index.positions(op, literal)] = True
+                        return mask
+                with np.errstate(invalid="ignore"):
+                    return _COMPARE[op](values, literal)
+            if not isinstance(literal, str):
+                raise QueryError(f'{column!r} is not numeric; write "{literal:g}" to compare it as text')
+            text = self.frame[column].astype(str) if op not in ("==", "!=") else self.frame[column]
+            try:
+                return np.asarray(_COMPARE[op](text, literal), dtype=bool)
+            except TypeError as exc:
+                raise QueryError(f"cannot compare {column!r} with {literal!r}: {exc}") from None
+        if kind == "in":
+            literals = node[2]
+            if values is not None:
+                try:
+                    return np.isin(values, [float(value) for value in literals])
+                except ValueError:
+                    raise QueryError(f"{column!r} is numeric; not every value in the list is a number") from None
+            numbers = [value for value in literals if not isinstance(value, str)]
+            if numbers:
+                raise QueryError(f'{column!r} is not numeric; write "{numbers[0]:g}" to compare it as text')
+            return self.frame[column].isin(literals).to_numpy()
+        text = self.frame[column].astype(str).str.lower()
+        needle = node[2].lower()
+        if kind == "contains":
+            return text.str.contains(needle, regex=False).to_numpy(dtype=bool)
+        return text.str.startswith(needle).to_numpy(dtype=bool)
+
+    def _sorted_positions(self, positions, sort):
+        if len(sort) == 1 and self._values(sort[0][0]) is not None:
+            # Single numeric key: reuse (or build) the column's sorted index instead of sorting.
+            column, ascending = sort[0]
+            index = self.index(column)
+            keep = np.zeros(len(self.frame), dtype=bool)
+            keep[positions] = True
+            valid, missing = index.order[:index.valid], index.order[index.valid:]
+            valid = valid[keep[valid]]
+            if not ascending:
+                # Descending, with ties still in row order (the index is a stable ascending sort).
+                valid = valid[np.lexsort((valid, -self._values(column)[valid]))]
+            return np.concatenate([valid, missing[keep[missing]]])
+        return positions[_argsort_frame(self.frame.iloc[positions], sort)]
+
+    def _group(self, positions, plan):
+        frame = self.frame.iloc[positions]
+        specs = plan.aggregates or [("count", None)]
+        named = {}
+        for name, column in specs:
+            label = _aggregate_name(name, column)
+            if column is None:
+                named[label] = (frame.columns[0], "size")
+            else:
+                if name not in ("count", "nunique", "min", "max") and self._values(column) is None:
+                    raise QueryError(f"{name}() needs a numeric column; {column!r} is text")
+                named[label] = (column, name)
+        if plan.group:
+            result = frame.groupby(plan.group, sort=True, dropna=False).agg(**named).reset_index()
+        else:
+            result = pd.DataFrame({label: [frame[column].agg(how) if how != "size" else len(frame)]
+                                   for label, (column, how) in named.items()})
+        if plan.sort:
+            missing = [key for key, _ in plan.sort if key not in result.columns]
+            if missing:
+                raise QueryError(f"cannot sort grouped rows by {missing[0]!r}")
+            result = result.sort_values([key for key, _ in plan.sort], ascending=[asc for _, asc in plan.sort],
+                                        kind="stable", na_position="last").reset_index(drop=True)
+        if plan.select:
+            missing = [column for column in plan.select if column not in result.columns]
+            if missing:
+                raise QueryError(f"{missing[0]!r} is not a grouped column")
+            result = result[plan.select]
+        if plan.limit is not None:
+            result = result.iloc[:plan.limit]
+        return result
+
+    def run(self, text):
+        """Run a query; returns a QueryResult (cached by the query's tokens)."""
+        key = tuple(tokenize(text))
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+            started = time.perf_counter()
+            result = self._run(parse(text, self.columns))
+            result.elapsed = time.perf_counter() - started
+            self._results[key] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return result
+
+    def _run(self, plan):
+        if plan.where is not None:
+            positions = np.flatnonzero(self._mask(plan.where))
+        else:
+            positions = np.arange(len(self.frame))
+        if plan.group is not None:
+            return QueryResult(self._group(positions, plan))
+        if plan.sort:
+            positions = self._sorted_positions(positions, plan.sort)
+        if plan.limit is not None:
+            positions = positions[:plan.limit]
+        return QueryResult(self.frame, positions, columns=plan.select)
+
+
+def run_chunked(chunks, text, columns, max_rows=None):
+    """Run a query over a table read in pieces (DataFrame chunks with `columns`).
+
+    The `where` stage is applied chunk by chunk and only matching rows are
+    kept; sort, group, select and limit then run on those. A query without
+    a filter would have to keep every row, so it is refused, as is a filter
+    that keeps more than `max_rows`.
+    """
+    started = time.perf_counter()
+    plan = parse(text, [str(column) for column in columns])
+    if plan.where is None:
+        raise QueryError("this file is too large to query whole; start the query with a filter (where ...)")
+    where, plan.where = plan.where, None
+    matches, kept = [], 0
+    for chunk in chunks:
+        part = chunk[QueryEngine(chunk)._mask(where)]
+        kept += len(part)
+        if max_rows is not None and kept > max_rows:
+            raise QueryError(f"more than {max_rows:,} rows match; narrow the filter")
+        matches.append(part)
+        if plan.limit is not None and plan.group is None and not plan.sort and kept >= plan.limit:
+            break
+    frame = pd.concat(matches, ignore_index=True) if matches else pd.DataFrame(columns=list(columns))
+    result = QueryEngine(frame)._run(plan)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _argsort_frame(frame, sort):
+    """Stable row order of `frame` by several keys (NaN/None last)."""
+    keys = []
+    for column, ascending in reversed(sort):
+        codes, uniques = pd.factorize(frame[column], sort=True)
+        codes = codes.astype(np.int64)
+        if not ascending:
+            codes = np.where(codes >= 0, len(uniques) - 1 - codes, codes)
+        codes[codes < 0] = len(uniques)
+        keys.append(codes)
+    return np.lexsort(keys)
+
+
+_COMPARE = {
+    "==": lambda values, literal: values == literal,
+    "!=": lambda values, literal: values != literal,
+    "<": lambda values, literal: values < literal,
+    "<=": lambda values, literal: values <= literal,
+    ">": lambda values, literal: values > literal,
+    ">=": lambda values, literal: values >= literal,
+}
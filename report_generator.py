@@ -0,0 +1,220 @@
+"""Headless batch reports: every country's population and GDP charts as PNG and/or PDF.
+
+Rendering uses the Agg canvas directly (no Tk, no pyplot) and runs in a
+process pool. Each worker loads the datasets once through the registry
+(warm runs come straight from the memory-mapped disk cache) and reuses a
+single figure for every chart it draws.
+
+    python report_generator.py --out reports --format png pdf --workers 8
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+import charts
+from dataset_locator import find_dataset
+from dataset_registry import Dataset, load_gdp, load_population
+from panel_alignment import aligned_panel
+from plot_manager import PlotManager
+
+FORMATS = ("png", "pdf")
+# Each chart: (file suffix, how to build its lines, axis labels).
+CHARTS = (
+    ("population", lambda data, countries: charts.population_lines(data.population, countries, data.panel),
+     charts.POPULATION_CHART),
+    ("gdp", lambda data, countries: charts.gdp_lines(data.panel, countries), charts.GDP_CHART),
+    ("population_gdp", lambda data, countries: charts.population_and_gdp_lines(data.panel, countries),
+     charts.POPULATION_AND_GDP_CHART),
+)
+
+
+def report_slug(country):
+    """File-system safe name for a country ('Congo, Dem. Rep.' -> 'Congo_Dem_Rep')."""
+    return re.sub(r"[^\w-]+", "_", country).strip("_") or "unnamed"
+
+
+class ReportData:
+    """The datasets one report run draws from."""
+
+    def __init__(self, population_path, gdp_path):
+        self.population_path = population_path
+        self.gdp_path = gdp_path
+        self.population = load_population(population_path) if population_path else Dataset.empty()
+        self.gdp = load_gdp(gdp_path) if gdp_path else Dataset.empty()
+        datasets = {"population": self.population, "gdp": self.gdp}
+        self.panel = aligned_panel(**{name: data for name, data in datasets.items() if len(data)})
+
+
+class _NoRedraw:
+    """Canvas stand-in for PlotManager: savefig renders, so draw_idle must not render a second time."""
+
+    def draw_idle(self):
+        pass
+
+
+class ReportRenderer:
+    """Draws every chart of a country report on one reused Agg figure."""
+
+    def __init__(self, data, out_dir, formats=("png",), figsize=(8, 5), dpi=100):
+        self.data = data
+        self.out_dir = out_dir
+        self.formats = tuple(formats)
+        self.dpi = dpi
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.plots = PlotManager(self.ax, _NoRedraw())
+
+    def render(self, country):
+        """Write one country's report files; returns the paths written."""
+        slug = report_slug(country)
+        written = []
+        pdf = None
+        if "pdf" in self.formats:
+            pdf_path = os.path.join(self.out_dir, f"{slug}.pdf")
+            pdf = PdfPages(pdf_path)
+        try:
+            for suffix, build_lines, labels in CHARTS:
+                lines = build_lines(self.data, [country])
+                if not lines:
+                    continue
+                self.plots.show(lines, **dict(labels, title=f"{country}: {labels['title']}"))
+                if "png" in self.formats:
+                    path = os.path.join(self.out_dir, f"{slug}_{suffix}.png")
+                    # Fast zlib level: the PNGs are small and the batch is CPU bound.
+                    self.figure.savefig(path, dpi=self.dpi, pil_kwargs={"compress_level": 1})
+                    written.append(path)
+                if pdf is not None:
+                    pdf.savefig(self.figure)
+        finally:
+            if pdf is not None:
+                pages = pdf.get_pagecount()
+                pdf.close()
+                if pages:
+                    written.append(pdf_path)
+                else:
+                    os.remove(pdf_path)
+        self.plots.clear()
+        return written
+
+
+class ReportSummary:
+    """Outcome and throughput of one report run."""
+
+    def __init__(self):
+        self.countries = 0
+        self.files = []
+        self.failures = []
+        self.seconds = 0.0
+
+    @property
+    def countries_per_second(self):
+        return self.countries / self.seconds if self.seconds else 0.0
+
+    def add(self, countries, files, failures):
+        self.countries += countries
+        self.files.extend(files)
+        self.failures.extend(failures)
+
+    def __str__(self):
+        text = (f"{self.countries} countries, {len(self.files)} files in {self.seconds:.1f}s "
+                f"({self.countries_per_second:.1f} countries/s)")
+        if self.failures:
+            text += f", {len(self.failures)} failed"
+        return text
+
+
+# Per-process renderer, created once by _init_worker.
+_renderer = None
+
+
+def _init_worker(population_path, gdp_path, out_dir, formats, dpi):
+    global _renderer
+    _renderer = ReportRenderer(ReportData(population_path, gdp_path), out_dir, formats, dpi=dpi)
+
+
+def _render_chunk(countries):
+    files, failures = [], []
+    for country in countries:
+        try:
+            files.extend(_renderer.render(country))
+        except Exception as exc:  # one bad country must not sink the batch
+            failures.append((country, f"{type(exc).__name__}: {exc}"))
+    return len(countries), files, failures
+
+
+def generate_reports(out_dir, countries=None, formats=("png",), workers=None, population_path=None,
+                     gdp_path=None, dpi=100, on_progress=None):
+    """Render reports for `countries` (default: every row of gdp.csv) into out_dir.
+
+    Countries are dealt out to `workers` processes (default: one per CPU) in
+    small interleaved chunks so slow and fast countries balance out.
+    ``on_progress(summary)`` is called after every finished chunk.
+    """
+    formats = tuple(formats)
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"unsupported report format(s): {', '.join(sorted(unknown))}")
+    population_path = population_path or find_dataset("world_population.csv")
+    gdp_path = gdp_path or find_dataset("gdp.csv")
+    if not gdp_path:
+        raise FileNotFoundError("gdp.csv not found")
+    os.makedirs(out_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    # Loading here also writes the disk cache the workers will map.
+    data = ReportData(population_path, gdp_path)
+    if countries is None:
+        countries = list(dict.fromkeys(data.gdp.names))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(countries) or 1))
+
+    summary = ReportSummary()
+    if workers == 1:
+        global _renderer
+        _renderer = ReportRenderer(data, out_dir, formats, dpi=dpi)
+        for country in countries:
+            summary.add(*_render_chunk([country]))
+            if on_progress:
+                on_progress(summary)
+    else:
+        chunk_count = workers * 4
+        chunks = [countries[i::chunk_count] for i in range(chunk_count) if countries[i::chunk_count]]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(population_path, gdp_path, out_dir, formats, dpi)) as pool:
+            for result in pool.map(_render_chunk, chunks):
+                summary.add(*result)
+                if on_progress:
+                    on_progress(summary)
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render per-country population and GDP reports.")
+    parser.add_argument("--out", default="reports", help="output directory (default: reports)")
+    parser.add_argument("--format", nargs="+", default=["png"], choices=FORMATS, dest="formats")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--population", help="path to world_population.csv")
+    parser.add_argument("--gdp", help="path to gdp.csv")
+    parser.add_argument("countries", nargs="*", help="countries to render (default: all in gdp.csv)")
+    args = parser.parse_args(argv)
+
+    summary = generate_reports(args.out, countries=args.countries or None, formats=args.formats,
+                               workers=args.workers, population_path=args.population, gdp_path=args.gdp,
+                               dpi=args.dpi)
+    for country, error in summary.failures:
+        print(f"{country}: {error}", file=sys.stderr)
+    print(summary)
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+from bisect import bisect_left, bisect_right
+
+# Separator that cannot appear in a typed query, so matches never span two options.
+_SEPARATOR = "\x00"
+
+
+class SearchIndex:
+    """Precomputed, shareable lookup structure for searchable option lists.
+
+    Options are lowercased once. Prefix queries bisect a sorted key list;
+    substring queries run str.find over one joined blob instead of looping in
+    Python. Results are option ids (positions in ``options``) in their
+    original order, and a query can be narrowed from an earlier result set.
+    """
+
+    def __init__(self, options):
+        self.options = list(options)
+        self.keys = [option.lower() for option in self.options]
+        self._sorted_ids = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self._sorted_keys = [self.keys[i] for i in self._sorted_ids]
+        self._blob = _SEPARATOR.join(self.keys)
+        self._starts = []
+        position = 0
+        for key in self.keys:
+            self._starts.append(position)
+            position += len(key) + 1
+
+    def __len__(self):
+        return len(self.options)
+
+    def prefix_ids(self, query):
+        lo = bisect_left(self._sorted_keys, query)
+        # Upper bound above every key starting with query, astral characters included.
+        hi = bisect_right(self._sorted_keys, query + "\U0010ffff", lo)
+        return sorted(self._sorted_ids[lo:hi])
+
+    def substring_ids(self, query, within=None):
+        if within is not None:
+            keys = self.keys
+            return [i for i in within if query in keys[i]]
+        ids = []
+        blob, starts = self._blob, self._starts
+        position = blob.find(query)
+        while position != -1:
+            option_id = bisect_right(starts, position) - 1
+            ids.append(option_id)
+            # Skip to the next option: one hit per option is enough.
+            next_start = starts[option_id + 1] if option_id + 1 < len(starts) else len(blob)
+            position = blob.find(query, next_start)
+        return ids
+
+    def search(self, query, prefix=False, within=None):
+        """Return ids of options matching the (already lowercased) query."""
+        if not query:
+            return list(range(len(self.options)))
+        if prefix:
+            if within is not None:
+                keys = self.keys
+                return [i for i in within if keys[i].startswith(query)]
+            return self.prefix_ids(query)
+        return self.substring_ids(query, within)
+
+    def labels(self, ids, limit=None):
+        options = self.options
+        return [options[i] for i in (ids[:limit] if limit is not None else ids)]
+
+
+class IncrementalSearch:
+    """Per-widget search state on top of a shared SearchIndex.
+
+    When the new query extends the previous one, only the previous matches
+    are re-checked instead of the whole option list.
+    """
+
+    def __init__(self, index, prefix=False):
+        self.index = index
+        self.prefix = prefix
+        self._last_query = ""
+        self._last_ids = None
+
+    def search(self, query):
+        within = self._last_ids if self._last_query and query.startswith(self._last_query) else None
+        ids = self.index.search(query, prefix=self.prefix, within=within)
+        self._last_query, self._last_ids = query, ids
+        return ids
@@ -0,0 +1,174 @@
+"""Prepared plot series, memoized: sorted year/value arrays plus derived transforms.
+
+Plot buttons ask for the same few countries over and over; each request
+used to mask out missing years (and for the dual-axis chart interpolate
+and locate census markers) again. Here every prepared series is cached
+under (dataset version, indicator, country, transform) in one LRU bounded
+by the bytes its arrays hold. A dataset version is the Dataset or
+AlignedPanel object itself: a reloaded file produces a new object, so
+stale entries are never returned and simply age out.
+
+Transforms: raw, interpolated (panel), log10, per_capita (panel GDP over
+interpolated population) and indexed (base year = 100). Cached arrays
+are compact copies, never views into a panel table, so the byte bound is
+what the cache really keeps alive; they are read-only because they are
+shared between callers.
+
+    from series_cache import series_cache
+    years, values = series_cache.series(panel, "India", indicator="gdp", transform=INDEXED, base_year=2000)
+    series_cache.stats()   # {'hits': ..., 'misses': ..., 'hit_rate': ..., 'bytes': ..., ...}
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+RAW = "raw"
+INTERPOLATED = "interpolated"
+LOG = "log"
+PER_CAPITA = "per_capita"
+INDEXED = "indexed"
+TRANSFORMS = (RAW, INTERPOLATED, LOG, PER_CAPITA, INDEXED)
+MAX_BYTES = 32 * 2 ** 20
+# Per-entry bookkeeping (key tuple, OrderedDict slot, weakref), counted so tiny series still cost something.
+ENTRY_OVERHEAD = 256
+
+
+def _frozen(array):
+    # An owned copy: a view would keep its whole base table alive while only its own bytes were counted.
+    array = np.array(array, copy=True, order="C")
+    array.setflags(write=False)
+    return array
+
+
+def _lookup(source, indicator, country, interpolated):
+    if indicator is None:
+        return source.series(country)
+    return source.series(indicator, country, interpolated=interpolated)
+
+
+def prepare(source, country, indicator=None, transform=RAW, base_year=None):
+    """Compute one series (uncached): (years, values) or None.
+
+    `source` is a Dataset (indicator=None) or an AlignedPanel (indicator
+    names the panel table).
+    """
+    if transform not in TRANSFORMS:
+        raise ValueError(f"unknown transform {transform!r} (one of {', '.join(TRANSFORMS)})")
+    if transform == INTERPOLATED:
+        if indicator is None:
+            raise ValueError("interpolated series come from an AlignedPanel; pass indicator=")
+        return _lookup(source, indicator, country, True)
+    if transform == PER_CAPITA:
+        if indicator is None:
+            raise ValueError("per-capita series come from an AlignedPanel; pass indicator=")
+        if indicator not in source.raw or "population" not in source.filled:
+            raise ValueError(f"per-capita {indicator} needs {indicator} and population in the panel")
+        row = source.row(country)
+        if row is None:
+            return None
+        values = source.per_capita(indicator)[row]
+        present = ~np.isnan(values)
+        return (source.years[present], values[present]) if present.any() else None
+
+    series = _lookup(source, indicator, country, False)
+    if series is None or transform == RAW:
+        return series
+    years, values = series
+    if transform == LOG:
+        positive = values > 0
+        if not positive.any():
+            return None
+        return years[positive], np.log10(values[positive])
+    # INDEXED: value / value in the base year * 100 (base year defaults to the first one with data).
+    if base_year is None:
+        base = 0
+    else:
+        base = int(np.searchsorted(years, base_year))
+        if base >= len(years) or years[base] != base_year:
+            return None
+    if values[base] == 0:
+        return None
+    return years, values / values[base] * 100.0
+
+
+class SeriesCache:
+    """Byte-bounded LRU of prepared series with hit/miss counters."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def series(self, source, country, indicator=None, transform=RAW, base_year=None):
+        """Cached prepare(): the same read-only arrays for repeated requests, or None."""
+        key = (id(source), indicator, country, transform, base_year)
+        with self._lock:
+            entry = self._entries.get(key)
+            # id() can be reused once a source is gone; the weak reference tells the two apart.
+            if entry is not None and entry[0]() is source:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        series = prepare(source, country, indicator, transform, base_year)
+        if series is not None:
+            series = (_frozen(series[0]), _frozen(series[1]))
+        size = ENTRY_OVERHEAD + (series[0].nbytes + series[1].nbytes if series is not None else 0)
+        try:
+            ref = weakref.ref(source)
+        except TypeError:
+            return series
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size <= self.max_bytes:
+                self._entries[key] = (ref, series, size)
+                self._bytes += size
+                self._evict()
+        return series
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def invalidate(self, source=None):
+        """Drop every entry (or every entry of one source)."""
+        with self._lock:
+            if source is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in [key for key, entry in self._entries.items() if entry[0]() is source]:
+                self._bytes -= self._entries.pop(key)[2]
+
+    def stats(self):
+        """{'hits', 'misses', 'hit_rate', 'evictions', 'entries', 'bytes', 'max_bytes'}."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "evictions": self.evictions, "entries": len(self._entries), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+series_cache = SeriesCache()
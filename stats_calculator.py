@@ -0,0 +1,199 @@
+import numpy as np
+
+from dataset_registry import Dataset
+
+
+def _as_dataset(dataset, values, years=None, names=None, codes=None):
+    return Dataset(dataset.names if names is None else names,
+                   dataset.years if years is None else years,
+                   values,
+                   codes=(dataset.codes or None) if codes is None else codes,
+                   source=dataset.source)
+
+
+def growth_rate(values, years=None, annualize=True):
+    """Growth between consecutive columns; column 0 is NaN.
+
+    With ``years`` and ``annualize`` the rate is per year, so gaps such as the
+    census columns (1970, 1980, ..., 2015, 2020, 2022) are comparable.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = values[:, 1:] / values[:, :-1]
+        if annualize and years is not None:
+            gaps = np.diff(np.asarray(years, dtype=np.float64))
+            out[:, 1:] = np.power(ratio, 1.0 / gaps) - 1.0
+        else:
+            out[:, 1:] = ratio - 1.0
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def yoy(dataset):
+    """Year-over-year (annualized) growth as a Dataset."""
+    return _as_dataset(dataset, growth_rate(dataset.values, dataset.years))
+
+
+def first_last_valid(values):
+    """Column index of each row's first and last non-NaN value (-1 for empty rows)."""
+    present = ~np.isnan(values)
+    has_any = present.any(axis=1)
+    first = np.where(has_any, np.argmax(present, axis=1), -1)
+    last = np.where(has_any, values.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1), -1)
+    return first, last
+
+
+def cagr(values, years, start=None, end=None):
+    """Compound annual growth between each row's first and last value in [start, end]."""
+    values = np.asarray(values, dtype=np.float64)
+    years = np.asarray(years)
+    mask = np.ones(len(years), dtype=bool)
+    if start is not None:
+        mask &= years >= start
+    if end is not None:
+        mask &= years <= end
+    window, window_years = values[:, mask], years[mask].astype(np.float64)
+    result = np.full(len(values), np.nan)
+    if window.shape[1] == 0:
+        return result
+    first, last = first_last_valid(window)
+    rows = np.flatnonzero((first >= 0) & (last > first))
+    begin, finish = window[rows, first[rows]], window[rows, last[rows]]
+    span = window_years[last[rows]] - window_years[first[rows]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[rows] = np.power(finish / begin, 1.0 / span) - 1.0
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def rolling_mean(values, window, min_periods=1):
+    """Trailing mean over `window` columns, skipping NaNs (cumulative-sum based)."""
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    sums = np.cumsum(np.where(present, values, 0.0), axis=1)
+    counts = np.cumsum(present, axis=1)
+    sums = np.concatenate([np.zeros((len(values), 1)), sums], axis=1)
+    counts = np.concatenate([np.zeros((len(values), 1), dtype=counts.dtype), counts], axis=1)
+    window_sums = sums[:, 1:] - sums[:, np.maximum(np.arange(1, values.shape[1] + 1) - window, 0)]
+    window_counts = counts[:, 1:] - counts[:, np.maximum(np.arange(1, values.shape[1] + 1) - window, 0)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = window_sums / window_counts
+    out[window_counts < max(min_periods, 1)] = np.nan
+    return out
+
+
+def align_rows(left, right, by="name"):
+    """Row indices (left_rows, right_rows) of countries present in both datasets."""
+    left_keys = left.names if by == "name" else left.codes
+    right_keys = right.names if by == "name" else right.codes
+    right_index = {}
+    for row, key in enumerate(right_keys):
+        right_index.setdefault(key, row)
+    pairs = [(row, right_index[key]) for row, key in enumerate(left_keys) if key in right_index]
+    if not pairs:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    left_rows, right_rows = (np.array(side, dtype=np.int64) for side in zip(*pairs))
+    return left_rows, right_rows
+
+
+def align_years(left, right):
+    """Column indices of the years both datasets share."""
+    shared, left_cols, right_cols = np.intersect1d(left.years, right.years, return_indices=True)
+    return shared, left_cols, right_cols
+
+
+def per_capita(gdp, population, by="code"):
+    """GDP / population on the countries and years both tables have."""
+    if by == "code" and not (gdp.codes and population.codes):
+        by = "name"
+    gdp_rows, pop_rows = align_rows(gdp, population, by=by)
+    years, gdp_cols, pop_cols = align_years(gdp, population)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = gdp.values[np.ix_(gdp_rows, gdp_cols)] / population.values[np.ix_(pop_rows, pop_cols)]
+    values[~np.isfinite(values)] = np.nan
+    names = [gdp.names[row] for row in gdp_rows]
+    codes = [gdp.codes[row] for row in gdp_rows] if gdp.codes else None
+    return Dataset(names, years, values, codes=codes, source=gdp.source)
+
+
+def rank(values, descending=True):
+    """Rank of every row within each column (1 = largest by default); NaN stays NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    keyed = np.where(missing, np.inf, -values if descending else values)
+    order = np.argsort(keyed, axis=0, kind="stable")
+    ranks = np.empty(values.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, np.arange(1, len(values) + 1, dtype=np.float64)[:, None], axis=0)
+    ranks[missing] = np.nan
+    return ranks
+
+
+def top_n(dataset, year, n=10, descending=True, exclude=None):
+    """[(name, value), ...] for the n largest (or smallest) values in one year.
+
+    `exclude` is an optional boolean mask over the rows to leave out of the
+    ranking (aggregate rows such as 'World', for instance).
+    """
+    column = dataset.column(year)
+    if column is None:
+        return []
+    keep = ~np.isnan(column)
+    if exclude is not None:
+        keep &= ~np.asarray(exclude, dtype=bool)
+    valid = np.flatnonzero(keep)
+    order = valid[np.argsort(-column[valid] if descending else column[valid], kind="stable")][:n]
+    return [(dataset.names[row], column[row]) for row in order]
+
+
+def percentiles(values, q=(10, 25, 50, 75, 90)):
+    """Cross-country percentiles per year: shape (len(q), years)."""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full((len(q), values.shape[1]), np.nan)
+    has_data = (~np.isnan(values)).any(axis=0)
+    if has_data.any():
+        result[:, has_data] = np.nanpercentile(values[:, has_data], q, axis=0)
+    return result
+
+
+def percentile_rank(values):
+    """Each value's percentile (0-100) among the countries reporting that year."""
+    values = np.asarray(values, dtype=np.float64)
+    ascending = rank(values, descending=False)
+    counts = (~np.isnan(values)).sum(axis=0).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(counts > 1, (ascending - 1) / (counts - 1) * 100.0, 100.0)
+    out[np.isnan(values)] = np.nan
+    return out
+
+
+def correlation(values, min_periods=3):
+    """Pairwise Pearson correlation between rows over the years both rows have.
+
+    Uses masked matrix products, so the whole matrix costs a handful of BLAS
+    calls instead of a Python loop over pairs.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = (~np.isnan(values)).astype(np.float64)
+    # Correlation is scale-free; normalising rows keeps GDP-sized sums from losing precision.
+    scale = np.max(np.where(present > 0, np.abs(values), 0.0), axis=1, keepdims=True)
+    scale[scale == 0] = 1.0
+    x = np.where(present > 0, values / scale, 0.0)
+    n = present @ present.T
+    sum_x = x @ present.T
+    sum_y = sum_x.T
+    sum_xy = x @ x.T
+    sum_x2 = (x * x) @ present.T
+    sum_y2 = sum_x2.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sum_xy - sum_x * sum_y
+        var = (n * sum_x2 - sum_x ** 2) * (n * sum_y2 - sum_y ** 2)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def correlation_between(dataset, names, min_periods=3):
+    """Correlation matrix for a subset of countries (rows in the order given)."""
+    rows = [dataset.index[name] for name in names if name in dataset.index]
+    return correlation(dataset.values[rows], min_periods=min_periods)
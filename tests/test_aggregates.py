@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from aggregates import RATE_INDICATORS, REGION, AggregateCubes
+from dataset_registry import read_gdp_csv, read_life_expectancy_csv, read_population_csv
+from panel_alignment import AlignedPanel
+
+POPULATION = """\
+Rank,CCA3,Country/Territory,Capital,Continent,2010 Population,2000 Population
+1,AAA,Aland,A City,Asia,300,100
+2,BBB,Borduria,B City,Asia,100,50
+3,CCC,Carpania,C City,Europe,40,20
+4,DDD,Dawsbergen,D City,Africa,10,
+"""
+GDP = """\
+Country Name,Code,2000,2010
+Aland,AAA,1000,3000
+Borduria,BBB,500,
+Carpania,CCC,200,400
+Sub-Saharan Africa,SSF,7000,9000
+High income,HIC,8000,12000
+"""
+LIFE = """\
+Entity,Year,Life expectancy
+Aland,2000,60
+Borduria,2000,70
+Carpania,2000,80
+"""
+
+
+@pytest.fixture
+def panel(tmp_path):
+    files = {"population": POPULATION, "gdp": GDP, "life_expectancy": LIFE}
+    readers = {"population": read_population_csv, "gdp": read_gdp_csv, "life_expectancy": read_life_expectancy_csv}
+    datasets = {}
+    for name, text in files.items():
+        path = tmp_path / f"{name}.csv"
+        path.write_text(text, encoding="utf-8")
+        datasets[name] = readers[name](str(path))
+    return AlignedPanel(datasets, year_range=(2000, 2010))
+
+
+def test_continent_sums_and_means(panel):
+    cubes = AggregateCubes(panel)
+    assert set(cubes.labels()) == {"Asia", "Europe", "Africa"}
+    cube = cubes.cube("gdp")
+    asia, column = cube.index["Asia"], 0
+    assert cube.sum[asia, column] == 1500
+    assert cube.mean[asia, column] == 750
+    assert cube.count[asia, column] == 2
+    # Borduria has no 2010 GDP and the interpolation does not extrapolate past its last value.
+    last = len(cube.years) - 1
+    assert cube.count[asia, last] == 1
+    assert cube.sum[asia, last] == 3000
+    assert np.isnan(cube.sum[cube.index["Africa"], column])
+
+
+def test_aggregate_rows_are_not_continent_members(panel):
+    cubes = AggregateCubes(panel)
+    europe = cubes.cube("gdp").index["Europe"]
+    assert cubes.cube("gdp").sum[europe, 0] == 200
+    assert cubes.reported(REGION) == {"Sub-Saharan Africa": panel.catalog.id_of("Sub-Saharan Africa")}
+    years, values = cubes.series("gdp", "Sub-Saharan Africa")
+    assert years.tolist() == [2000, 2010]
+    assert values.tolist() == [7000, 9000]
+
+
+def test_top_is_ranked_largest_first(panel):
+    cubes = AggregateCubes(panel)
+    assert cubes.top("population", "Asia", 2000) == [("Aland", 100.0), ("Borduria", 50.0)]
+    assert cubes.top("population", "Asia", 2000, n=1) == [("Aland", 100.0)]
+    assert cubes.top("population", "Asia", 1990) == []
+
+
+def test_weighted_mean_only_for_rates(panel):
+    cubes = AggregateCubes(panel)
+    assert "life_expectancy" in RATE_INDICATORS
+    life = cubes.cube("life_expectancy")
+    asia = life.index["Asia"]
+    assert life.stat("weighted_mean")[asia, 0] == pytest.approx((60 * 100 + 70 * 50) / 150)
+    for indicator in ("population", "gdp"):
+        with pytest.raises(KeyError, match="rate indicator"):
+            cubes.cube(indicator).stat("weighted_mean")
+
+
+def test_cube_is_reused_while_sources_are_unchanged(panel):
+    assert AggregateCubes(panel).cube("gdp") is AggregateCubes(panel).cube("gdp")
@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pytest
+
+from bulk_ingest import PanelStore, indicator_name, ingest_directory, main
+
+GDP = """\
+Country Name,Code,2000,2001
+Russian Federation,RUS,10,11
+Germany,DEU,20,21
+"""
+POPULATION = """\
+Country/Territory,CCA3,2000 Population,2010 Population
+Russia,RUS,146,143
+Germany,DEU,82,81
+"""
+LIFE = """\
+Entity,Year,Life expectancy
+Germany,2000,78
+Germany,2001,78.3
+"""
+
+
+@pytest.fixture
+def directory(tmp_path):
+    root = tmp_path / "release"
+    (root / "wb").mkdir(parents=True)
+    (root / "wb" / "gdp.csv").write_text(GDP, encoding="utf-8")
+    (root / "population.csv").write_text(POPULATION, encoding="utf-8")
+    (root / "life.csv").write_text(LIFE, encoding="utf-8")
+    return root
+
+
+def ingest(directory):
+    return ingest_directory(str(directory), workers=1)
+
+
+def test_first_run_parses_and_merges(directory):
+    summary = ingest(directory)
+    assert sorted(summary.parsed) == sorted(["life.csv", "population.csv", os.path.join("wb", "gdp.csv")])
+    assert summary.merged and not summary.failures
+    store = PanelStore(str(directory / ".gda_panel"))
+    assert store.indicators == ["life", "population", "wb/gdp"]
+    assert store.years.tolist()[0] == 2000 and store.years.tolist()[-1] == 2010
+
+
+def test_aliases_share_one_row(directory):
+    ingest(directory)
+    store = PanelStore(str(directory / ".gda_panel"))
+    assert store.id_of("Russia") == store.id_of("Russian Federation") == store.id_of("RUS")
+    years, values = store.series("wb/gdp", "Russia")
+    assert years.tolist() == [2000, 2001] and values.tolist() == [10.0, 11.0]
+    assert store.series("population", "russian federation")[1].tolist() == [146.0, 143.0]
+    assert store.series("life", "Russia") is None
+    assert np.isnan(store.dataset("life").value("Germany", 2005))
+
+
+def test_codeless_names_without_a_coded_spelling_keep_their_own_row(tmp_path):
+    root = tmp_path / "release"
+    root.mkdir()
+    (root / "gdp.csv").write_text(GDP + "\"Bahamas, The\",BHS,5,6\n", encoding="utf-8")
+    (root / "life.csv").write_text(LIFE + "Russia,2000,65.3\nThe Bahamas,2000,72.1\n", encoding="utf-8")
+    ingest(root)
+    store = PanelStore(str(root / ".gda_panel"))
+    assert store.id_of("The Bahamas") == store.id_of("BHS")
+    assert store.series("life", "Bahamas, The")[1].tolist() == [72.1]
+    assert store.id_of("Russia") != store.id_of("Russian Federation")
+    assert store.series("gdp", "Russia") is None
+    assert store.series("life", "Russia")[1].tolist() == [65.3]
+
+
+def test_touched_file_is_not_reparsed(directory):
+    ingest(directory)
+    path = directory / "population.csv"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    summary = ingest(directory)
+    assert summary.parsed == [] and not summary.merged
+    assert len(summary.reused) == 3
+
+
+def test_changed_file_is_reparsed(directory):
+    ingest(directory)
+    (directory / "life.csv").write_text(LIFE + "Germany,2002,78.6\n", encoding="utf-8")
+    summary = ingest(directory)
+    assert summary.parsed == ["life.csv"] and summary.merged
+    assert PanelStore(str(directory / ".gda_panel")).series("life", "Germany")[0].tolist() == [2000, 2001, 2002]
+
+
+def test_bad_file_is_reported(directory, capsys):
+    (directory / "broken.csv").write_text("Name,Notes\nfoo,bar\n", encoding="utf-8")
+    summary = ingest(directory)
+    assert [relpath for relpath, _ in summary.failures] == ["broken.csv"]
+    assert "broken" not in PanelStore(str(directory / ".gda_panel"))
+    assert main([str(directory), "--workers", "1"]) == 1
+    assert "broken.csv" in capsys.readouterr().err
+
+
+def test_removed_file_is_dropped(directory):
+    ingest(directory)
+    (directory / "life.csv").unlink()
+    summary = ingest(directory)
+    assert summary.removed == ["life.csv"] and summary.merged
+    store = PanelStore(str(directory / ".gda_panel"))
+    assert "life" not in store
+    assert len(os.listdir(directory / ".gda_panel" / "parts")) == 2
+
+
+def test_force_reparses_everything(directory):
+    ingest(directory)
+    assert len(ingest_directory(str(directory), workers=1, force=True).parsed) == 3
+
+
+def test_indicator_names_and_main_errors(tmp_path):
+    assert indicator_name(os.path.join("wb", "gdp.csv")) == "wb/gdp"
+    assert main([str(tmp_path / "missing")]) == 2
+
+
+def test_worker_processes_match_inline(directory, tmp_path):
+    ingest(directory)
+    pooled = ingest_directory(str(directory), store_dir=str(tmp_path / "pooled"), workers=2)
+    assert len(pooled.parsed) == 3 and not pooled.failures
+    inline = PanelStore(str(directory / ".gda_panel"))
+    assert np.array_equal(PanelStore(str(tmp_path / "pooled")).values, inline.values, equal_nan=True)
@@ -0,0 +1,77 @@
+import csv
+
+import pandas as pd
+import pytest
+
+from chunked_reader import CsvRowIndex, open_row_index
+
+
+class SmallIndex(CsvRowIndex):
+    """Tiny stride and block size so checkpoints and block edges land inside quoted fields."""
+
+    STRIDE = 7
+    BLOCK_BYTES = 61
+
+
+def awkward_rows(count):
+    rows = []
+    for i in range(count):
+        note = [f"plain {i}", f"two\nlines {i}", f"comma, {i}", f'say "hi" {i}', f'"\n,\n" {i}', ""][i % 6]
+        rows.append([f"Country {i}", str(1960 + i % 60), note, f"{i * 1.5}"])
+    return rows
+
+
+@pytest.fixture(params=["\n", "\r\n"], ids=["lf", "crlf"])
+def csv_path(tmp_path, request):
+    path = tmp_path / "awkward.csv"
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, lineterminator=request.param)
+        writer.writerow(["Country", "Year", "Note,\nwith a newline", "Value"])
+        writer.writerows(awkward_rows(250))
+    return path
+
+
+def expected_rows(path):
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return list(frame.itertuples(index=False, name=None))
+
+
+@pytest.mark.parametrize("index_class", [CsvRowIndex, SmallIndex])
+def test_random_access_matches_read_csv(csv_path, index_class):
+    expected = expected_rows(csv_path)
+    index = index_class(str(csv_path)).build()
+    assert index.done and len(index) == len(expected) == 250
+    assert index.columns == ["Country", "Year", "Note,\nwith a newline", "Value"]
+    assert index.rows(0, len(index)) == expected
+    for start, stop in [(0, 1), (6, 8), (7, 14), (13, 29), (100, 101), (243, 250), (249, 400)]:
+        assert index.rows(start, stop) == expected[start:stop]
+    assert index.rows(250, 260) == []
+    assert index.rows(5, 5) == []
+
+
+def test_embedded_fields_survive(csv_path):
+    rows = SmallIndex(str(csv_path)).build().rows(0, 6)
+    assert [row[2] for row in rows] == ["plain 0", "two\nlines 1", "comma, 2", 'say "hi" 3', '"\n,\n" 4', ""]
+
+
+def test_missing_final_newline(tmp_path):
+    path = tmp_path / "tail.csv"
+    path.write_bytes(b'Country,Note\nA,"x\ny"\nB,last')
+    index = SmallIndex(str(path)).build()
+    assert len(index) == 2
+    assert index.rows(0, 2) == expected_rows(path) == [("A", "x\ny"), ("B", "last")]
+
+
+def test_header_only_and_empty_files(tmp_path):
+    header_only = tmp_path / "header.csv"
+    header_only.write_text("Country,Value\n", encoding="utf-8")
+    index = CsvRowIndex(str(header_only)).build()
+    assert len(index) == 0 and index.columns == ["Country", "Value"] and index.rows(0, 10) == []
+    empty = tmp_path / "empty.csv"
+    empty.write_text("", encoding="utf-8")
+    index = CsvRowIndex(str(empty)).build()
+    assert len(index) == 0 and index.columns == []
+
+
+def test_open_row_index_picks_by_extension(csv_path):
+    assert type(open_row_index(str(csv_path))) is CsvRowIndex
@@ -0,0 +1,144 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import dataset_cache
+from dataset_locator import CACHE_DIR_ENV
+from dataset_registry import DatasetRegistry, read_gdp_csv, read_life_expectancy_csv
+
+GDP = """\
+Country Name,Code,2000,2001
+Germany,DEU,20,21
+Chad,TCD,1,
+"""
+LIFE = """\
+Entity,Year,Life expectancy
+Chad,2000,47.5
+Germany,2000,78
+Germany,2001,78.3
+"""
+KEY = f"{read_gdp_csv.__module__}.{read_gdp_csv.__qualname__}"
+
+
+@pytest.fixture(autouse=True)
+def user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "user-cache"))
+
+
+@pytest.fixture
+def gdp_path(tmp_path):
+    path = tmp_path / "gdp.csv"
+    path.write_text(GDP, encoding="utf-8")
+    return str(path)
+
+
+def sidecar(path, key=KEY):
+    return os.path.join(os.path.dirname(path), dataset_cache.SIDECAR_DIR, dataset_cache._meta_name(path, key))
+
+
+def load(path, loader=read_gdp_csv):
+    return DatasetRegistry()._load(os.path.abspath(path), loader)
+
+
+def test_round_trip_is_memory_mapped(gdp_path):
+    parsed = load(gdp_path)
+    parts = dataset_cache.read(gdp_path, KEY)
+    assert parts["names"] == ["Germany", "Chad"] and parts["codes"] == ["DEU", "TCD"]
+    assert isinstance(parts["arrays"]["values"], np.memmap)
+    cached = load(gdp_path)
+    np.testing.assert_array_equal(cached.values, parsed.values)
+    assert cached.years.tolist() == [2000, 2001]
+
+
+def test_long_layout_round_trip(tmp_path):
+    path = tmp_path / "life.csv"
+    path.write_text(LIFE, encoding="utf-8")
+    parsed = load(path, read_life_expectancy_csv)
+    cached = load(path, read_life_expectancy_csv)
+    assert cached.series("Germany")[1].tolist() == parsed.series("Germany")[1].tolist() == [78.0, 78.3]
+
+
+def test_changed_source_hash_invalidates(gdp_path):
+    load(gdp_path)
+    stat = os.stat(gdp_path)
+    # Same size, new mtime: only the content hash can tell the edit apart from a touch.
+    with open(gdp_path, "w", encoding="utf-8") as handle:
+        handle.write(GDP.replace("20,21", "30,31"))
+    os.utime(gdp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert dataset_cache.read(gdp_path, KEY) is None
+    assert load(gdp_path).value("Germany", 2000) == 30.0
+    meta = json.load(open(sidecar(gdp_path), encoding="utf-8"))
+    assert meta["hash"] == dataset_cache.file_digest(gdp_path)
+    # The superseded arrays were removed.
+    assert sorted(os.listdir(os.path.dirname(sidecar(gdp_path)))) == sorted(
+        [os.path.basename(sidecar(gdp_path))] + list(meta["arrays"].values()))
+
+
+def test_touched_source_keeps_its_cache(gdp_path):
+    load(gdp_path)
+    os.utime(gdp_path, ns=(0, os.stat(gdp_path).st_mtime_ns + 5_000_000))
+    assert dataset_cache.read(gdp_path, KEY) is not None
+    meta = json.load(open(sidecar(gdp_path), encoding="utf-8"))
+    assert meta["stamp"] == [os.stat(gdp_path).st_size, os.stat(gdp_path).st_mtime_ns]
+
+
+def corrupt_header(path):
+    with open(sidecar(path), "r+", encoding="utf-8") as handle:
+        handle.truncate(len(handle.read()) // 2)
+
+
+def header_is_a_list(path):
+    with open(sidecar(path), "w", encoding="utf-8") as handle:
+        json.dump([dataset_cache.CACHE_VERSION], handle)
+
+
+def header_missing_keys(path):
+    with open(sidecar(path), "w", encoding="utf-8") as handle:
+        json.dump({"version": dataset_cache.CACHE_VERSION}, handle)
+
+
+def old_version(path):
+    meta = json.load(open(sidecar(path), encoding="utf-8"))
+    meta["version"] = dataset_cache.CACHE_VERSION - 1
+    with open(sidecar(path), "w", encoding="utf-8") as handle:
+        json.dump(meta, handle)
+
+
+def _array(path, name):
+    meta = json.load(open(sidecar(path), encoding="utf-8"))
+    return os.path.join(os.path.dirname(sidecar(path)), meta["arrays"][name])
+
+
+def truncated_array(path):
+    target = _array(path, "values")
+    with open(target, "r+b") as handle:
+        handle.truncate(os.path.getsize(target) - 8)
+
+
+def garbage_array(path):
+    with open(_array(path, "values"), "wb") as handle:
+        handle.write(b"not an npy file")
+
+
+def missing_array(path):
+    os.remove(_array(path, "years"))
+
+
+def mismatched_array(path):
+    np.save(_array(path, "values"), np.zeros((5, 5)))
+
+
+@pytest.mark.parametrize("damage", [corrupt_header, header_is_a_list, header_missing_keys, old_version,
+                                    truncated_array, garbage_array, missing_array, mismatched_array])
+def test_damaged_sidecar_falls_back_to_parsing(gdp_path, damage):
+    expected = read_gdp_csv(gdp_path)
+    load(gdp_path)
+    damage(gdp_path)
+    dataset = load(gdp_path)
+    np.testing.assert_array_equal(dataset.values, expected.values)
+    assert list(dataset.names) == ["Germany", "Chad"]
+    # The parse rewrote a good sidecar.
+    assert dataset_cache.read(gdp_path, KEY) is not None
+
@@ -0,0 +1,62 @@
+import pytest
+
+import dataset_locator
+from dataset_locator import DatasetLocator
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "data"
+    (root / "nested" / "deeper").mkdir(parents=True)
+    (root / "nested" / "deeper" / "gdp.csv").write_text("Country Name,Code,2000\n", encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def locator(tree, tmp_path):
+    locator = DatasetLocator([str(tree)], index_path=str(tmp_path / "index.json"))
+    refreshes = []
+    refresh = locator.refresh
+    locator.refresh = lambda: (refreshes.append(1), refresh())
+    locator.refreshes = refreshes
+    return locator
+
+
+def test_finds_nested_file_through_the_index(locator, tree):
+    assert locator.find("gdp.csv") == str(tree / "nested" / "deeper" / "gdp.csv")
+    assert locator.find("gdp.csv") == str(tree / "nested" / "deeper" / "gdp.csv")
+    assert len(locator.refreshes) == 1
+
+
+def test_repeated_miss_walks_the_tree_once(locator):
+    for _ in range(5):
+        assert locator.find("world_gdp.csv") is None
+    assert len(locator.refreshes) == 1
+
+
+def test_miss_expires(locator, monkeypatch):
+    assert locator.find("world_gdp.csv") is None
+    clock = dataset_locator.time.monotonic() + dataset_locator.MISS_TTL + 1
+    monkeypatch.setattr(dataset_locator.time, "monotonic", lambda: clock)
+    assert locator.find("world_gdp.csv") is None
+    assert len(locator.refreshes) == 2
+
+
+def test_new_index_generation_forgets_misses(locator, tree, tmp_path):
+    assert locator.find("world_gdp.csv") is None
+    (tree / "nested" / "world_gdp.csv").write_text("x\n", encoding="utf-8")
+    # Another lookup's refresh picks the new file up; the remembered miss must not hide it.
+    assert locator.find("other.csv") is None
+    assert locator.find("world_gdp.csv") == str(tree / "nested" / "world_gdp.csv")
+
+    extra = tmp_path / "extra" / "sub"
+    extra.mkdir(parents=True)
+    (extra / "life.csv").write_text("x\n", encoding="utf-8")
+    assert locator.find("life.csv") is None
+    assert locator.find("life.csv", root_folder=str(tmp_path / "extra")) == str(extra / "life.csv")
+
+
+def test_file_dropped_into_a_root_is_found_despite_a_cached_miss(locator, tree):
+    assert locator.find("world_gdp.csv") is None
+    (tree / "world_gdp.csv").write_text("x\n", encoding="utf-8")
+    assert locator.find("world_gdp.csv") == str(tree / "world_gdp.csv")
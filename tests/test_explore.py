@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from chunked_reader import open_row_index
+from explore import stream_query
+from loader_service import LoadTask
+from query_engine import QueryEngine
+
+ROWS = [("Aland", "Asia", 300), ("Borduria", "Asia", 100), ("Carpania", "Europe", 40), ("Dawsbergen", "Africa", 10)]
+QUERY = 'Continent == "Asia" | sort Population desc'
+
+
+def query_index(index, text=QUERY):
+    index.build()
+    try:
+        return stream_query(index.path, text, index.columns, task=LoadTask("query")).to_frame()
+    finally:
+        index.close()
+
+
+def expected(text=QUERY):
+    return QueryEngine(pd.DataFrame(ROWS, columns=["Country", "Continent", "Population"])).run(text).to_frame()
+
+
+def test_streamed_csv_query(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame(ROWS, columns=["Country", "Continent", "Population"]).to_csv(path, index=False)
+    assert query_index(open_row_index(str(path))).equals(expected())
+
+
+def test_streamed_xlsx_query_reads_the_spool(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "data.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Country", "Continent", "Population"])
+    for row in ROWS:
+        sheet.append(list(row))
+    workbook.save(path)
+
+    index = open_row_index(str(path))
+    assert index.path != str(path)
+    result = query_index(index)
+    assert result.equals(expected())
+    assert result.Country.tolist() == ["Aland", "Borduria"]
@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exporter import ExportError, SeriesSource, _temporary, snapshot_figure, write_figure, write_table
+from loader_service import LoadCancelled, LoadTask
+from virtual_table import DataFrameSource
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"country": [f"C{i}" for i in range(1000)], "year": np.arange(1000) % 60 + 1960,
+                         "value": rng.random(1000)})
+
+
+def test_csv_matches_to_csv(tmp_path, frame):
+    target = tmp_path / "out.csv"
+    write_table(DataFrameSource(frame), str(target), chunk_rows=64)
+    assert target.read_bytes() == frame.to_csv(index=False, lineterminator="\n").encode("utf-8")
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_cancelled_export_leaves_nothing(tmp_path, frame):
+    target = tmp_path / "out.csv"
+    task = LoadTask("export")
+    task.cancel()
+    with pytest.raises(LoadCancelled):
+        write_table(DataFrameSource(frame), str(target), chunk_rows=64, task=task)
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_export_keeps_the_old_file(tmp_path):
+    target = tmp_path / "out.csv"
+    target.write_text("old", encoding="utf-8")
+
+    class Broken:
+        columns = ["a"]
+
+        def __len__(self):
+            return 10
+
+        def rows(self, start, stop):
+            raise OSError("disk gone")
+
+    with pytest.raises(OSError):
+        write_table(Broken(), str(target))
+    assert target.read_text(encoding="utf-8") == "old"
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_temporary_names_are_unique(tmp_path):
+    target = str(tmp_path / "out.csv")
+    names = {_temporary(target) for _ in range(20)}
+    assert len(names) == 20
+    assert all(os.path.dirname(name) == str(tmp_path) and name.endswith(".part") for name in names)
+
+
+def test_unknown_format(tmp_path, frame):
+    with pytest.raises(ExportError):
+        write_table(DataFrameSource(frame), str(tmp_path / "out.xls"))
+
+
+def test_row_sources_without_frames(tmp_path):
+    target = tmp_path / "out.csv"
+    source = SeriesSource([("a", np.array([2000, 2001]), np.array([1.5, 2.5]))])
+    write_table(source, str(target), chunk_rows=1)
+    assert target.read_text(encoding="utf-8") == "series,year,value\na,2000,1.5\na,2001,2.5\n"
+
+
+def test_series_source_rows_span_lines():
+    years = np.array([2000, 2001, 2002])
+    source = SeriesSource([("a", years, np.array([1.0, 2.0, 3.0])), ("b", years[:2], np.array([5.0, 6.0]))])
+    assert len(source) == 5
+    assert source.rows(0, 5) == [("a", 2000, 1.0), ("a", 2001, 2.0), ("a", 2002, 3.0),
+                                 ("b", 2000, 5.0), ("b", 2001, 6.0)]
+    assert source.rows(2, 4) == [("a", 2002, 3.0), ("b", 2000, 5.0)]
+    # The plot's arrays are kept, not copied.
+    assert source.series[0][1] is years
+
+
+def test_figure_snapshot_renders(tmp_path):
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    figure.add_subplot().plot([1, 2, 3])
+    target = tmp_path / "chart.png"
+    write_figure(snapshot_figure(figure), str(target))
+    assert target.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+    assert os.listdir(tmp_path) == ["chart.png"]
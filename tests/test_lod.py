@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from lod import LevelOfDetail, minmax_indices
+
+
+class Axes:
+    """Just enough of a matplotlib Axes for LevelOfDetail: a window extent width in pixels."""
+
+    class Extent:
+        width = 100
+
+    def get_window_extent(self):
+        return self.Extent()
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(1)
+    x = np.arange(100_000, dtype=np.float64)
+    y = rng.normal(size=len(x)).cumsum()
+    y[31_337] += 1e4
+    y[77_001] -= 1e4
+    return x, y
+
+
+def test_minmax_keeps_every_bucket_extreme(series):
+    _, y = series
+    bucket = 64
+    indices = minmax_indices(y, 0, len(y), bucket)
+    assert len(indices) <= 2 * -(-len(y) // bucket)
+    assert np.all(np.diff(indices) > 0)
+    for start in range(0, len(y), bucket):
+        chosen = y[indices[(indices >= start) & (indices < start + bucket)]]
+        assert chosen.max() == y[start:start + bucket].max()
+        assert chosen.min() == y[start:start + bucket].min()
+
+
+def test_minmax_offsets_by_start(series):
+    _, y = series
+    assert np.array_equal(minmax_indices(y, 1000, 1100, 16), minmax_indices(y[1000:1100], 0, 100, 16) + 1000)
+    assert len(minmax_indices(y, 10, 10, 16)) == 0
+
+
+def test_reduce_keeps_spikes_and_respects_the_point_budget(series):
+    x, y = series
+    lod = LevelOfDetail(Axes())
+    rx, ry = lod.reduce("s", x, y)
+    assert len(rx) <= lod.target_points() + 2
+    assert ry.max() == y.max() and ry.min() == y.min()
+    assert rx[0] == x[0] and rx[-1] == x[-1]
+    assert np.all(np.diff(rx) > 0)
+
+
+def test_reduce_visible_range(series):
+    x, y = series
+    lod = LevelOfDetail(Axes())
+    rx, ry = lod.reduce("s", x, y, xlim=(30_000, 40_000))
+    assert len(rx) <= lod.target_points() + 2
+    assert rx[0] <= 30_000 and rx[-1] >= 40_000
+    assert 31_337 in rx and ry.max() == y[29_999:40_002].max()
+
+
+def test_short_series_is_untouched():
+    lod = LevelOfDetail(Axes())
+    x = np.arange(50.0)
+    rx, ry = lod.reduce("s", x, x)
+    assert rx is x and ry is x
+
+
+@pytest.mark.parametrize("gap", [slice(50_000, 50_003), slice(60_000, 65_000)])
+def test_nan_gaps_survive_reduction(series, gap):
+    x, y = series
+    y = y.copy()
+    y[gap] = np.nan
+    rx, ry = LevelOfDetail(Axes()).reduce("s", x, y)
+    # A NaN has to land between the points either side of the gap, or the line is drawn across it.
+    before = rx < gap.start
+    after = rx >= gap.stop
+    inside = ~before & ~after
+    assert np.isnan(ry[inside]).any()
+    assert not np.isnan(ry[before | after]).any()
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from query_engine import QueryEngine, QueryError, parse, run_chunked, tokenize
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Country": ["Aland", "Borduria", "Carpania", "Dawsbergen", "Elbonia", "Freedonia"],
+        "Continent": ["Asia", "Asia", "Europe", "Africa", "Europe", "Asia"],
+        "Population": [300.0, 100.0, 40.0, 10.0, np.nan, 55.0],
+        "Growth Rate": [1.5, 0.5, -0.2, 2.5, 0.1, 1.0],
+    })
+
+
+def run(frame, text):
+    return QueryEngine(frame).run(text).to_frame()
+
+
+def test_parse_stages():
+    plan = parse('Continent == "Asia" | sort Population desc | select Country, Population | limit 2',
+                 ["Country", "Continent", "Population"])
+    assert plan.where == ("cmp", "Continent", "==", "Asia")
+    assert plan.sort == [("Population", False)]
+    assert plan.select == ["Country", "Population"]
+    assert plan.limit == 2
+
+
+def test_backticks_and_numbers():
+    assert tokenize("`Growth Rate` >= -0.5") == [("quoted", "Growth Rate"), ("op", ">="), ("number", -0.5)]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("Nope == 1", "Nope"),
+    ("Population >", None),
+    ("sort", None),
+    ("limit 2.5", "whole number"),
+    ('Population > "many"', "not a number"),
+])
+def test_parse_errors(frame, text, message):
+    with pytest.raises(QueryError, match=message):
+        QueryEngine(frame).run(text)
+
+
+def test_filters_match_pandas(frame):
+    result = run(frame, '(Continent == "Asia" or Continent in ("Africa")) and not Population < 60')
+    expected = frame[frame.Continent.isin(["Asia", "Africa"]) & ~(frame.Population < 60)]
+    assert result.equals(expected.reset_index(drop=True))
+    assert run(frame, 'Country contains "ONIA"').Country.tolist() == ["Elbonia", "Freedonia"]
+    assert run(frame, 'Country startswith "b"').Country.tolist() == ["Borduria"]
+
+
+def test_range_filters_through_the_index_agree(frame):
+    engine = QueryEngine(frame)
+    for text in ("Population > 50", "Population >= 55", "Population <= 40", "Population == 100"):
+        first = engine.run(text).to_frame()
+        engine._results.clear()
+        # The second run of a column goes through its sorted index.
+        assert engine.run(text).to_frame().equals(first)
+    assert "Population" in engine._indexes
+
+
+def test_sort_puts_missing_last_and_keeps_ties_in_order(frame):
+    assert run(frame, "sort Population desc").Country.tolist()[-1] == "Elbonia"
+    assert run(frame, "sort Continent, Country desc").Country.tolist() == [
+        "Dawsbergen", "Freedonia", "Borduria", "Aland", "Elbonia", "Carpania"]
+
+
+def test_group_and_aggregate(frame):
+    result = run(frame, "group Continent | agg count(), sum(Population) | sort Continent")
+    expected = frame.groupby("Continent").agg(count=("Country", "size"), total=("Population", "sum"))
+    assert result["count()"].tolist() == expected["count"].tolist()
+    assert result["sum(Population)"].tolist() == expected["total"].tolist()
+
+
+def test_results_are_cached_by_tokens(frame):
+    engine = QueryEngine(frame)
+    assert engine.run("Population > 50") is engine.run("Population  >  50")
+
+
+def test_numbers_against_text_columns_are_errors(frame):
+    engine = QueryEngine(frame)
+    with pytest.raises(QueryError, match="not numeric"):
+        engine.run("Continent > 5")
+    with pytest.raises(QueryError, match="not numeric"):
+        engine.run("Continent in (1, 2)")
+    assert engine.run('Continent > "B"').to_frame().Country.tolist() == ["Carpania", "Elbonia"]
+
+
+def test_run_chunked_matches_whole_frame(frame):
+    for text in ('Continent == "Asia" | sort Population desc', "Population > 20 | group Continent | agg count()",
+                 "`Growth Rate` > 0 | limit 2"):
+        chunks = (frame.iloc[i:i + 2] for i in range(0, len(frame), 2))
+        assert run_chunked(chunks, text, frame.columns).to_frame().equals(run(frame, text))
+
+
+def test_run_chunked_refuses_unbounded_queries(frame):
+    with pytest.raises(QueryError, match="filter"):
+        run_chunked(iter([frame]), "sort Population", frame.columns)
+    with pytest.raises(QueryError, match="narrow"):
+        run_chunked(iter([frame]), "Population > 0", frame.columns, max_rows=3)
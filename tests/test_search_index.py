@@ -0,0 +1,63 @@
+import pytest
+
+from search_index import IncrementalSearch, SearchIndex
+
+OPTIONS = [
+    "Germany", "GERMANY (former East)", "Georgia", "Ghana", "Guinea", "Guinea-Bissau", "Equatorial Guinea",
+    "Papua New Guinea", "Côte d'Ivoire", "CÔTE D'IVOIRE", "Curaçao", "Congo, Dem. Rep.", "Congo, Rep.",
+    "Korea, Rep.", "Korea, Dem. People's Rep.", "İstanbul", "Straße", "Åland", "a\U0001F600 astral", "ab",
+]
+TYPED = ["Guinea-Bissau", "GUIN", "Côte", "côte d", "Congo, Rep", "korea, ", "İst", "STRASSE", "Åla",
+         "a\U0001F600", "e", "rep.", "x"]
+
+
+def brute_force(query, prefix):
+    keys = [option.lower() for option in OPTIONS]
+    if prefix:
+        return [i for i, key in enumerate(keys) if key.startswith(query)]
+    return [i for i, key in enumerate(keys) if query in key]
+
+
+def typing(text):
+    """Every query a widget sees while `text` is typed: each prefix, lowercased like the widgets do."""
+    return [text[:length].lower() for length in range(len(text) + 1)]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(OPTIONS)
+
+
+@pytest.mark.parametrize("prefix", [False, True])
+@pytest.mark.parametrize("text", TYPED)
+def test_incremental_search_equals_fresh_search(index, text, prefix):
+    incremental = IncrementalSearch(index, prefix=prefix)
+    for query in typing(text):
+        assert incremental.search(query) == index.search(query, prefix=prefix) == brute_force(query, prefix)
+
+
+def test_case_folding(index):
+    for query in ("guinea", "GUINEA", "Guinea"):
+        assert index.labels(index.search(query.lower())) == [
+            "Guinea", "Guinea-Bissau", "Equatorial Guinea", "Papua New Guinea"]
+        assert index.labels(index.search(query.lower(), prefix=True)) == ["Guinea", "Guinea-Bissau"]
+    assert index.labels(index.search("côte", prefix=True)) == ["Côte d'Ivoire", "CÔTE D'IVOIRE"]
+    assert index.labels(index.search("germany", prefix=True)) == ["Germany", "GERMANY (former East)"]
+
+
+@pytest.mark.parametrize("prefix", [False, True])
+def test_backspace_and_retyping_start_from_the_full_list(index, prefix):
+    incremental = IncrementalSearch(index, prefix=prefix)
+    for query in ["g", "gu", "gui", "gu", "ge", "", "c", "co", "cô"]:
+        assert incremental.search(query) == brute_force(query, prefix)
+
+
+def test_matches_do_not_span_options(index):
+    # "ab" is an option; "astral" + separator + "ab" must not produce a hit across the two.
+    assert index.search("lab") == []
+
+
+def test_labels_limit(index):
+    ids = index.search("")
+    assert index.labels(ids, limit=3) == OPTIONS[:3]
+    assert len(index.labels(ids)) == len(OPTIONS)
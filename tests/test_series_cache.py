@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from dataset_registry import Dataset
+from panel_alignment import AlignedPanel
+from series_cache import ENTRY_OVERHEAD, INDEXED, LOG, PER_CAPITA, SeriesCache, prepare
+
+
+@pytest.fixture
+def population():
+    years = list(range(2000, 2010))
+    values = np.array([[float(i * 10 + year - 1999) for year in years] for i in range(1, 5)])
+    values[1, 3] = np.nan
+    return Dataset(["Aland", "Borduria", "Carpania", "Dawsbergen"], years, values,
+                   codes=["AAA", "BBB", "CCC", "DDD"])
+
+
+@pytest.fixture
+def panel(population):
+    gdp = Dataset(["Aland"], [2000, 2005], np.array([[100.0, 300.0]]), codes=["AAA"])
+    return AlignedPanel({"population": population, "gdp": gdp})
+
+
+def test_hits_return_the_same_read_only_arrays(population):
+    cache = SeriesCache()
+    first = cache.series(population, "Borduria")
+    assert cache.series(population, "Borduria") is first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    years, values = first
+    assert 2003 not in years.tolist()
+    with pytest.raises(ValueError):
+        values[0] = 0
+
+
+def test_entries_are_copies_counted_by_their_own_bytes(population):
+    cache = SeriesCache()
+    years, values = cache.series(population, "Aland")
+    assert years.base is None and values.base is None
+    assert not np.shares_memory(values, population.values)
+    assert cache.stats()["bytes"] == ENTRY_OVERHEAD + years.nbytes + values.nbytes
+
+
+def test_eviction_by_bytes_keeps_recent_entries(population):
+    entry = ENTRY_OVERHEAD + 2 * 10 * 8
+    cache = SeriesCache(max_bytes=2 * entry)
+    for country in ("Aland", "Carpania", "Dawsbergen"):
+        cache.series(population, country)
+    assert len(cache) == 2 and cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    cache.series(population, "Carpania")
+    assert cache.stats()["hits"] == 1
+    cache.resize(entry)
+    assert len(cache) == 1
+    cache.series(population, "Carpania")
+    assert cache.stats()["hits"] == 2
+
+
+def test_invalidate_one_source(population, panel):
+    cache = SeriesCache()
+    cache.series(population, "Aland")
+    cache.series(panel, "Aland", indicator="gdp")
+    cache.invalidate(population)
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
+
+
+def test_transforms(population, panel):
+    years, values = prepare(population, "Aland", transform=INDEXED, base_year=2001)
+    assert values[1] == 100.0
+    assert prepare(population, "Aland", transform=INDEXED, base_year=1990) is None
+    assert prepare(population, "Aland", transform=LOG)[1][0] == pytest.approx(np.log10(11.0))
+    years, values = prepare(panel, "Aland", indicator="gdp", transform=PER_CAPITA)
+    assert years.tolist() == [2000, 2005]
+    assert values.tolist() == pytest.approx([100.0 / 11.0, 300.0 / 16.0])
+
+
+def test_misuse_is_a_value_error(population):
+    gdp_only = AlignedPanel({"gdp": population})
+    with pytest.raises(ValueError, match="population"):
+        prepare(gdp_only, "Aland", indicator="gdp", transform=PER_CAPITA)
+    with pytest.raises(ValueError):
+        prepare(population, "Aland", transform="cubed")
+    with pytest.raises(ValueError):
+        prepare(population, "Aland", transform=PER_CAPITA)
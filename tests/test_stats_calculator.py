@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_registry import Dataset
+from stats_calculator import (cagr, correlation, growth_rate, per_capita, percentile_rank, percentiles, rank,
+                              rolling_mean, top_n)
+
+YEARS = np.array([2000, 2001, 2002, 2005, 2010, 2015])
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(10, 1, size=(8, len(YEARS)))
+    values[0, 2] = np.nan              # a gap in the middle
+    values[1, :2] = np.nan             # starts late
+    values[2, -1] = np.nan             # stops early
+    values[3] = np.nan                 # never reports
+    values[4, [1, 3, 4]] = np.nan      # sparse
+    values[5, 3] = values[6, 3]        # a tie
+    return values
+
+
+def test_growth_rate_matches_pct_change(values):
+    expected = pd.DataFrame(values).pct_change(axis=1, fill_method=None).to_numpy()
+    np.testing.assert_allclose(growth_rate(values, annualize=False), expected, equal_nan=True)
+
+
+def test_growth_rate_annualizes_uneven_gaps(values):
+    result = growth_rate(values, YEARS)
+    assert np.isnan(result[:, 0]).all()
+    np.testing.assert_allclose(result[0, 4], (values[0, 4] / values[0, 3]) ** (1 / 5) - 1)
+    assert np.isnan(result[0, 2]) and np.isnan(result[0, 3])
+
+
+def test_growth_from_zero_is_missing():
+    assert np.isnan(growth_rate(np.array([[0.0, 5.0]]), annualize=False)[0, 1])
+
+
+def test_cagr_uses_first_and_last_reported_values(values):
+    frame = pd.DataFrame(values, columns=YEARS)
+    expected = []
+    for _, row in frame.iterrows():
+        row = row.dropna()
+        if len(row) < 2:
+            expected.append(np.nan)
+            continue
+        expected.append((row.iloc[-1] / row.iloc[0]) ** (1 / (row.index[-1] - row.index[0])) - 1)
+    np.testing.assert_allclose(cagr(values, YEARS), expected, equal_nan=True)
+
+
+def test_cagr_window(values):
+    result = cagr(values, YEARS, start=2001, end=2010)
+    np.testing.assert_allclose(result[0], (values[0, 4] / values[0, 1]) ** (1 / 9) - 1)
+    assert np.isnan(cagr(values, YEARS, start=2020)).all()
+
+
+@pytest.mark.parametrize("window, min_periods", [(1, 1), (2, 1), (3, 2), (6, 3)])
+def test_rolling_mean_matches_pandas(values, window, min_periods):
+    expected = pd.DataFrame(values.T).rolling(window, min_periods=min_periods).mean().to_numpy().T
+    np.testing.assert_allclose(rolling_mean(values, window, min_periods), expected, equal_nan=True)
+
+
+def test_rank_matches_pandas(values):
+    frame = pd.DataFrame(values)
+    np.testing.assert_array_equal(rank(values), frame.rank(ascending=False, method="first").to_numpy())
+    np.testing.assert_array_equal(rank(values, descending=False), frame.rank(method="first").to_numpy())
+
+
+def test_percentile_rank(values):
+    frame = pd.DataFrame(values)
+    expected = (frame.rank(method="first") - 1) / (frame.count() - 1) * 100
+    np.testing.assert_allclose(percentile_rank(values), expected.to_numpy(), equal_nan=True)
+    assert percentile_rank(np.array([[5.0], [np.nan]]))[0, 0] == 100.0
+
+
+def test_percentiles_match_pandas(values):
+    expected = pd.DataFrame(values).quantile([0.1, 0.5, 0.9]).to_numpy()
+    np.testing.assert_allclose(percentiles(values, (10, 50, 90)), expected)
+    assert np.isnan(percentiles(np.full((2, 2), np.nan))).all()
+
+
+def test_correlation_matches_pairwise_pandas(values):
+    # GDP-sized rows next to small ones: the per-row scaling must not change the result.
+    values = values * np.array([1e12, 1, 1, 1, 1e-3, 1, 1e6, 1])[:, None]
+    expected = pd.DataFrame(values.T).corr(min_periods=3).to_numpy()
+    result = correlation(values)
+    np.testing.assert_allclose(result, expected, atol=1e-9, equal_nan=True)
+    assert np.isnan(result[3]).all()
+
+
+def test_per_capita_aligns_codes_and_years():
+    gdp = Dataset(["Germany", "Aland", "Chad"], [2000, 2001, 2002], np.array([
+        [100.0, np.nan, 300.0], [10.0, 20.0, 30.0], [1.0, 2.0, 3.0]]), codes=["DEU", "ALA", "TCD"])
+    population = Dataset(["Chad", "Deutschland"], [2001, 2002, 2003], np.array([
+        [2.0, 0.0, 9.0], [5.0, 10.0, 15.0]]), codes=["TCD", "DEU"])
+    result = per_capita(gdp, population)
+    assert list(result.names) == ["Germany", "Chad"]
+    assert result.years.tolist() == [2001, 2002]
+    np.testing.assert_allclose(result.values, [[np.nan, 30.0], [1.0, np.nan]], equal_nan=True)
+
+
+def test_per_capita_falls_back_to_names_without_codes():
+    gdp = Dataset(["Chad", "Peru"], [2000], np.array([[10.0], [40.0]]))
+    population = Dataset(["Peru", "Chad"], [2000], np.array([[4.0], [5.0]]), codes=["PER", "TCD"])
+    result = per_capita(gdp, population)
+    assert list(result.names) == ["Chad", "Peru"]
+    np.testing.assert_allclose(result.values[:, 0], [2.0, 10.0])
+
+
+def test_top_n_skips_missing(values):
+    dataset = Dataset([f"C{i}" for i in range(len(values))], YEARS, values)
+    top = top_n(dataset, 2002, n=3)
+    column = pd.Series(values[:, 2], index=dataset.names).dropna().sort_values(ascending=False, kind="stable")
+    assert top == list(column.head(3).items())
+    assert top_n(dataset, 1999) == []
+
+
+def test_top_n_exclude_mask(values):
+    dataset = Dataset([f"C{i}" for i in range(len(values))], YEARS, values)
+    everything = top_n(dataset, 2000, n=None)
+    exclude = [name == everything[0][0] for name in dataset.names]
+    assert top_n(dataset, 2000, n=None, exclude=exclude) == everything[1:]
@@ -0,0 +1,155 @@
+from tkinter import ttk
+from collections import OrderedDict
+
+
+class DataFrameSource:
+    """Row source backed by an in-memory DataFrame."""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = [str(col) for col in df.columns]
+
+    def __len__(self):
+        return len(self.df)
+
+    def rows(self, start, stop):
+        return list(self.df.iloc[start:stop].itertuples(index=False, name=None))
+
+    def frame_rows(self, start, stop):
+        """Rows [start, stop) as a DataFrame view (used by exports to write whole chunks)."""
+        return self.df.iloc[start:stop]
+
+
+class VirtualTable:
+    """Treeview that only holds items for the rows currently on screen.
+
+    Rows are fetched from the source in fixed-size blocks as the user scrolls
+    and a few recent blocks are kept as a buffer, so memory and time to first
+    paint do not depend on how many rows the source has.
+    """
+
+    BLOCK_SIZE = 200
+    MAX_BLOCKS = 8
+    ROW_HEIGHT = 20
+
+    def __init__(self, parent, source, column_width=100):
+        self.source = source
+        self.column_width = column_width
+        self.first = 0
+        self.visible = 0
+        self._blocks = OrderedDict()
+        self._items = []
+        self.row_height = int(float(ttk.Style(parent).lookup("Treeview", "rowheight") or self.ROW_HEIGHT))
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=source.columns, show="headings", selectmode="browse")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.frame.rowconfigure(0, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+
+        self._set_columns(source.columns)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self.scroll(-1) or "break")
+        self.tree.bind("<Down>", lambda event: self.scroll(1) or "break")
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible) or "break")
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible) or "break")
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda event: self.scroll_to(len(self.source)) or "break")
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def _set_columns(self, columns):
+        self.tree.configure(columns=list(columns))
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=self.column_width)
+
+    def set_source(self, source):
+        """Swap in a new row source and jump back to the top."""
+        if list(source.columns) != list(self.source.columns):
+            # Different columns (e.g. a grouped query result): rebuild the headings and item pool.
+            self.tree.delete(*self._items)
+            self._items = []
+            self._set_columns(source.columns)
+        self.source = source
+        self._blocks.clear()
+        self.first = 0
+        self.refresh()
+
+    def _block(self, number):
+        block = self._blocks.get(number)
+        if block is None:
+            start = number * self.BLOCK_SIZE
+            block = self.source.rows(start, start + self.BLOCK_SIZE)
+            # Short blocks may still be growing (streaming sources); fetch them again next time.
+            if len(block) == self.BLOCK_SIZE:
+                self._blocks[number] = block
+            while len(self._blocks) > self.MAX_BLOCKS:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(number)
+        return block
+
+    def fetch(self, start, stop):
+        rows = []
+        for number in range(start // self.BLOCK_SIZE, (max(start, stop - 1)) // self.BLOCK_SIZE + 1):
+            block = self._block(number)
+            offset = number * self.BLOCK_SIZE
+            rows.extend(block[max(start - offset, 0):stop - offset])
+        return rows
+
+    def on_resize(self, event):
+        # One row's worth of height goes to the heading.
+        visible = max(1, (event.height - self.row_height) // self.row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+
+    def refresh(self):
+        """Fill the on-screen items with rows [first, first + visible)."""
+        total = len(self.source)
+        self.first = max(0, min(self.first, total - self.visible))
+        rows = self.fetch(self.first, min(total, self.first + self.visible)) if total else []
+
+        # Reuse the existing items; only add or remove the difference.
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > len(rows):
+            self.tree.delete(self._items.pop())
+        for iid, row in zip(self._items, rows):
+            self.tree.item(iid, values=row)
+
+        if total:
+            self.scrollbar.set(self.first / total, min(total, self.first + len(rows)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, rows):
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, row):
+        row = max(0, min(int(row), len(self.source) - self.visible))
+        if row != self.first:
+            self.first = row
+            self.tree.selection_remove(self.tree.selection())
+            self.refresh()
+
+    def on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * len(self.source))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll(int(amount) * step)
@@ -0,0 +1,199 @@
+"""Lifecycle of the plot windows: close, recycle, cap, and a debug view of what is alive.
+
+Closing a plot window (WM_DELETE_WINDOW) calls its app's release(), which
+empties the plot and drops the dataset and search-index references, and
+then hides the Toplevel so the next window of the same kind can reuse it
+(widgets, Listboxes and figure included) instead of building a new one.
+At most MAX_OPEN_WINDOWS plot windows are open at once; asking for one
+more brings the newest window of that kind (or the newest of any kind) to
+the front and tells the user to close one first, rather than taking away
+a window they may still be reading.
+
+Apps managed here provide release() and reopen().
+"""
+import gc
+import os
+import sys
+import tkinter as tk
+
+MAX_OPEN_WINDOWS = 8
+# Closed windows kept (hidden) per kind for reuse; the rest are destroyed.
+MAX_IDLE_WINDOWS = 1
+
+
+def process_rss():
+    """Resident set size of this process in bytes, or None if it cannot be read."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current, but the best portable fallback (KiB on Linux, bytes on macOS).
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def live_figure_count():
+    """Figures created through figures.embed_figure that have not been garbage collected."""
+    figures = sys.modules.get("figures")
+    return len(figures.live_figures) if figures is not None else 0
+
+
+class WindowPool:
+    """Opens, recycles and caps the analyzer's plot windows."""
+
+    def __init__(self, max_open=MAX_OPEN_WINDOWS, max_idle=MAX_IDLE_WINDOWS):
+        self.max_open = max_open
+        self.max_idle = max_idle
+        self.open_windows = []  # [(kind, toplevel, app)], oldest first
+        self.idle = {}          # kind -> [(toplevel, app)]
+
+    def open(self, parent, kind, factory):
+        """Show a `kind` window, reusing a closed one when possible; returns its app (None at the cap)."""
+        self._prune()
+        if len(self.open_windows) >= self.max_open:
+            self._refuse(parent, kind)
+            return None
+        idle = self.idle.get(kind)
+        if idle:
+            toplevel, app = idle.pop()
+            toplevel.deiconify()
+            toplevel.lift()
+            app.reopen()
+        else:
+            toplevel = tk.Toplevel(parent)
+            app = factory(toplevel)
+            toplevel.protocol("WM_DELETE_WINDOW", lambda: self.close(toplevel))
+        self.open_windows.append((kind, toplevel, app))
+        return app
+
+    def _refuse(self, parent, kind):
+        from tkinter import messagebox
+
+        same_kind = [window for open_kind, window, _ in self.open_windows if open_kind == kind]
+        window = same_kind[-1] if same_kind else self.open_windows[-1][1]
+        window.deiconify()
+        window.lift()
+        messagebox.showinfo("Too many windows", f"{len(self.open_windows)} plot windows are already open. "
+                            "Close one to open another.", parent=window)
+
+    def close(self, toplevel):
+        """Release a window's data, then hide it for reuse or destroy it."""
+        for position, (kind, window, app) in enumerate(self.open_windows):
+            if window is toplevel:
+                del self.open_windows[position]
+                break
+        else:
+            toplevel.destroy()
+            return
+        app.release()
+        idle = self.idle.setdefault(kind, [])
+        if len(idle) < self.max_idle:
+            toplevel.withdraw()
+            idle.append((toplevel, app))
+        else:
+            toplevel.destroy()
+
+    def drop_idle(self):
+        """Destroy every hidden window (frees their widgets and figures too)."""
+        for idle in self.idle.values():
+            for toplevel, _ in idle:
+                toplevel.destroy()
+        self.idle.clear()
+
+    def _prune(self):
+        """Forget windows destroyed behind our back (e.g. with their parent)."""
+        def alive(toplevel):
+            try:
+                return bool(toplevel.winfo_exists())
+            except tk.TclError:
+                return False
+
+        self.open_windows = [entry for entry in self.open_windows if alive(entry[1])]
+        for kind, idle in self.idle.items():
+            self.idle[kind] = [entry for entry in idle if alive(entry[0])]
+
+    def counts(self):
+        self._prune()
+        return {"open": len(self.open_windows), "idle": sum(len(idle) for idle in self.idle.values())}
+
+
+windows = WindowPool()
+
+
+class DebugPanel:
+    """Small always-updating window with live window/figure/dataset counts and RSS."""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, root, pool=None):
+        self.pool = pool or windows
+        self.root = root
+        self.root.title("Debug: Memory and Windows")
+        self.labels = {}
+        for row, name in enumerate(("Plot windows open", "Plot windows idle", "Toplevels", "Figures",
+                                    "Datasets cached", "Series cache", "Resident memory")):
+            tk.Label(self.root, text=f"{name}:", anchor="w").grid(row=row, column=0, sticky="w", padx=6)
+            self.labels[name] = tk.Label(self.root, anchor="e", width=28)
+            self.labels[name].grid(row=row, column=1, sticky="e", padx=6)
+        tk.Button(self.root, text="Free hidden windows", command=self.free_idle).grid(
+            row=7, column=0, columnspan=2, pady=6)
+        self.refresh()
+
+    def refresh(self):
+        try:
+            if not self.root.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        self.update()
+        self.root.after(self.REFRESH_MS, self.refresh)
+
+    def update(self):
+        counts = self.pool.counts()
+        master = self.root.nametowidget(".")
+        registry = sys.modules.get("dataset_registry")
+        series_cache = sys.modules.get("series_cache")
+        cache = series_cache.series_cache.stats() if series_cache is not None else None
+        rss = process_rss()
+        values = {
+            "Plot windows open": counts["open"],
+            "Plot windows idle": counts["idle"],
+            "Toplevels": sum(isinstance(child, tk.Toplevel) for child in master.winfo_children()),
+            "Figures": live_figure_count(),
+            "Datasets cached": len(registry.registry) if registry is not None else 0,
+            "Series cache": (f"{cache['entries']} / {cache['hit_rate']:.0%} hits / {cache['bytes'] / 2 ** 10:,.0f} KB"
+                             if cache is not None else "n/a"),
+            "Resident memory": f"{rss / 2 ** 20:,.1f} MB" if rss is not None else "n/a",
+        }
+        for name, value in values.items():
+            self.labels[name].config(text=str(value))
+
+    def free_idle(self):
+        self.pool.drop_idle()
+        gc.collect()
+        self.update()
+
+
+_debug_panel = None
+
+
+def show_debug_panel(parent):
+    """Open the debug panel, or raise it if it is already open."""
+    global _debug_panel
+    if _debug_panel is not None and _debug_panel.root.winfo_exists():
+        _debug_panel.root.deiconify()
+        _debug_panel.root.lift()
+    else:
+        _debug_panel = DebugPanel(tk.Toplevel(parent))
+    return _debug_panel